@@ -1,15 +1,32 @@
 """
 Delta Exchange India API Client with authentication
 """
+import asyncio
 import hmac
 import hashlib
+import json
 import time
 from typing import Optional, Dict, List, Any
+import importlib.util
 import httpx
 from config.settings import settings
 from utils.logger import bot_logger
 
 
+# HTTP/2 needs the optional h2 package (httpx[http2]); fall back to HTTP/1.1
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+# Connection pool: enough sockets for concurrent order bursts, kept alive
+# across the one-minute trading loop so each tick skips the TLS handshake
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=90.0)
+
+# Most orders the exchange accepts in one batch request
+MAX_BATCH_ORDERS = 50
+
+# Idle pings to the API host, so pooled connections survive quiet periods
+KEEPALIVE_INTERVAL_SECONDS = 30
+
+
 class DeltaExchangeClient:
     """Client for Delta Exchange India API"""
     
@@ -17,7 +34,8 @@ class DeltaExchangeClient:
         self.base_url = settings.DELTA_BASE_URL
         self.api_key = settings.DELTA_API_KEY
         self.api_secret = settings.DELTA_API_SECRET
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = httpx.AsyncClient(timeout=30.0, limits=HTTP_LIMITS, http2=HTTP2_AVAILABLE)
+        self._keepalive_task: Optional[asyncio.Task] = None
     
     def _generate_signature(self, method: str, endpoint: str, payload: str = "") -> Dict[str, str]:
         """Generate HMAC-SHA256 signature for authentication"""
@@ -43,20 +61,19 @@ class DeltaExchangeClient:
         url = f"{self.base_url}{endpoint}"
         headers = {'Content-Type': 'application/json'}
         
+        # Serialize the body once: the signed payload is sent as-is
+        payload = json.dumps(data) if data else ""
+        
         if authenticated:
-            payload = ""
-            if data:
-                import json
-                payload = json.dumps(data)
             headers.update(self._generate_signature(method, endpoint, payload))
         
         try:
             if method == "GET":
                 response = await self.client.get(url, params=params, headers=headers)
             elif method == "POST":
-                response = await self.client.post(url, json=data, headers=headers)
+                response = await self.client.post(url, content=payload or None, headers=headers)
             elif method == "DELETE":
-                response = await self.client.delete(url, headers=headers)
+                response = await self.client.request("DELETE", url, content=payload or None, headers=headers)
             
             response.raise_for_status()
             result = response.json()
@@ -180,6 +197,15 @@ class DeltaExchangeClient:
         response = await self._request("DELETE", f"/v2/orders/{order_id}", authenticated=True)
         return response
     
+    async def batch_cancel_orders(self, product_id: int, order_ids: List[str]) -> Dict:
+        """Cancel up to MAX_BATCH_ORDERS orders of one product in a single request"""
+        data = {
+            'product_id': product_id,
+            'orders': [{'id': order_id} for order_id in order_ids]
+        }
+        response = await self._request("DELETE", "/v2/orders/batch", data=data, authenticated=True)
+        return response
+    
     async def close_position(self, product_id: int) -> Dict:
         """Close a position using market order"""
         positions = await self.get_positions()
@@ -195,8 +221,25 @@ class DeltaExchangeClient:
         
         return {'success': False, 'error': 'Position not found'}
     
+    def start_keepalive(self):
+        """Start pinging the API host so pooled connections stay open between trading ticks"""
+        if self._keepalive_task is None or self._keepalive_task.done():
+            self._keepalive_task = asyncio.create_task(self._keepalive())
+    
+    async def _keepalive(self):
+        """Ping the API host every KEEPALIVE_INTERVAL_SECONDS (any response keeps it warm)"""
+        while True:
+            try:
+                await self.client.head(self.base_url)
+            except Exception as e:
+                bot_logger.debug("Keep-alive ping failed: %s", e)
+            await asyncio.sleep(KEEPALIVE_INTERVAL_SECONDS)
+    
     async def close(self):
         """Close HTTP client"""
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
         await self.client.aclose()
 
 
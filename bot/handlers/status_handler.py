@@ -23,7 +23,7 @@ async def status_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         status_text = "Active" if is_active else "Inactive"
         
         # Get open positions count
-        open_positions = await position_manager.get_open_positions(user_id)
+        open_positions = await position_manager.get_open_positions(user_id, {'_id': 1})
         
         # Get selected assets
         asset_mode = user_settings.get('asset_selection_mode', 'individual')
@@ -2,7 +2,7 @@
 MongoDB data models using Pydantic
 """
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Union
 from datetime import datetime
 from bson import ObjectId
 
@@ -19,6 +19,11 @@ class PyObjectId(ObjectId):
         return ObjectId(v)
 
 
+def as_object_id(document_id: Union[str, ObjectId]) -> ObjectId:
+    """Document ID as an ObjectId, parsing strings once"""
+    return document_id if isinstance(document_id, ObjectId) else ObjectId(document_id)
+
+
 class VRZZone(BaseModel):
     """VRZ Support/Resistance Zone Model"""
     id: Optional[PyObjectId] = Field(alias="_id", default=None)
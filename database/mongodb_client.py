@@ -30,8 +30,16 @@ class MongoDBClient:
         await self.db.vrz_zones.create_index([("symbol", 1), ("status", 1)])
         await self.db.vrz_zones.create_index([("timeframe", 1)])
         await self.db.vrz_zones.create_index([("created_at", -1)])
+        # Nearest-zone lookups: equality fields first, then the bound range-filtered on
+        await self.db.vrz_zones.create_index(
+            [("symbol", 1), ("timeframe", 1), ("status", 1), ("type", 1), ("zone_lower", 1)]
+        )
+        await self.db.vrz_zones.create_index(
+            [("symbol", 1), ("timeframe", 1), ("status", 1), ("type", 1), ("zone_upper", 1)]
+        )
         await self.db.user_settings.create_index([("telegram_user_id", 1)], unique=True)
-        await self.db.trades.create_index([("telegram_user_id", 1), ("status", 1)])
+        # Also serves per-user recent closed trades (sort by exit_time)
+        await self.db.trades.create_index([("telegram_user_id", 1), ("status", 1), ("exit_time", -1)])
         await self.db.trades.create_index([("symbol", 1)])
         await self.db.trades.create_index([("created_at", -1)])
         bot_logger.info("Database indexes created")
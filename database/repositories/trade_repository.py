@@ -1,8 +1,10 @@
 """
 Repository for trade database operations
 """
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 from datetime import datetime, timedelta
+from bson import ObjectId
+from database.models import as_object_id
 from database.mongodb_client import mongodb_client
 from config.settings import settings
 from utils.logger import bot_logger
@@ -39,11 +41,10 @@ class TradeRepository:
             bot_logger.error(f"Error creating trade: {str(e)}", exc_info=True)
             raise
     
-    async def get_trade(self, trade_id: str) -> Optional[Dict]:
+    async def get_trade(self, trade_id: Union[str, ObjectId]) -> Optional[Dict]:
         """Get trade by ID"""
         try:
-            from bson import ObjectId
-            trade = await self.collection.find_one({'_id': ObjectId(trade_id)})
+            trade = await self.collection.find_one({'_id': as_object_id(trade_id)})
             return trade
             
         except Exception as e:
@@ -88,13 +89,11 @@ class TradeRepository:
             bot_logger.error(f"Error getting closed trades: {str(e)}", exc_info=True)
             return []
     
-    async def update_trade(self, trade_id: str, updates: Dict) -> bool:
+    async def update_trade(self, trade_id: Union[str, ObjectId], updates: Dict) -> bool:
         """Update trade"""
         try:
-            from bson import ObjectId
-            
             result = await self.collection.update_one(
-                {'_id': ObjectId(trade_id)},
+                {'_id': as_object_id(trade_id)},
                 {'$set': updates}
             )
             
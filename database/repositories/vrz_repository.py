@@ -1,8 +1,10 @@
 """
 Repository for VRZ zone database operations
 """
-from typing import List, Optional, Dict
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime, timedelta
+import numpy as np
 from database.mongodb_client import mongodb_client
 from database.models import VRZZone
 from config.settings import settings
@@ -14,6 +16,15 @@ class VRZRepository:
     
     def __init__(self):
         self.collection = None
+        # (symbol, timeframe, type) -> (price levels ascending, active zones in
+        # that order, (N, 3) [price_level, zone_lower, zone_upper] array of them)
+        self._active_zone_cache: Dict[Tuple[str, str, str], Tuple[List[float], List[Dict], np.ndarray]] = {}
+    
+    def _invalidate_cache(self, symbol: str, timeframe: Optional[str] = None):
+        """Drop cached active zones for a symbol (optionally one timeframe)"""
+        for key in [k for k in self._active_zone_cache
+                    if k[0] == symbol and (timeframe is None or k[1] == timeframe)]:
+            del self._active_zone_cache[key]
     
     async def initialize(self):
         """Initialize repository"""
@@ -21,11 +32,35 @@ class VRZRepository:
     
     async def create_zone(self, zone: VRZZone) -> str:
         """Insert new VRZ zone"""
-        zone_dict = zone.dict(by_alias=True, exclude={'id'})
+        zone_dict = zone.model_dump(by_alias=True, exclude={'id'})
         result = await self.collection.insert_one(zone_dict)
+        self._invalidate_cache(zone.symbol, zone.timeframe)
         bot_logger.log_vrz_detection(zone.type, zone.price_level, zone.timeframe, zone.symbol)
         return str(result.inserted_id)
     
+    async def bulk_create_zones(self, zones: List[VRZZone]) -> List[Dict]:
+        """
+        Insert several VRZ zones in one round trip
+        
+        Returns the stored documents in input order with '_id' as a string,
+        so callers need not serialize the models a second time.
+        """
+        if not zones:
+            return []
+        
+        documents = [zone.model_dump(by_alias=True, exclude={'id'}) for zone in zones]
+        result = await self.collection.insert_many(documents)
+        for symbol, timeframe in {(zone.symbol, zone.timeframe) for zone in zones}:
+            self._invalidate_cache(symbol, timeframe)
+        
+        for zone in zones:
+            bot_logger.log_vrz_detection(zone.type, zone.price_level, zone.timeframe, zone.symbol)
+        
+        for document, inserted_id in zip(documents, result.inserted_ids):
+            document['_id'] = str(inserted_id)
+        
+        return documents
+    
     async def get_active_zones(self, symbol: str, timeframe: str, 
                                zone_type: Optional[str] = None) -> List[Dict]:
         """Get active VRZ zones for symbol and timeframe"""
@@ -49,12 +84,78 @@ class VRZRepository:
         sorted_zones = sorted(zones, key=lambda x: x['distance'])
         return sorted_zones[:limit]
     
+    async def _sorted_active_zones(self, symbol: str, timeframe: str,
+                                   zone_type: str) -> Tuple[List[float], List[Dict], np.ndarray]:
+        """Active zones of one type sorted by price level, loaded once until a write"""
+        key = (symbol, timeframe, zone_type)
+        cached = self._active_zone_cache.get(key)
+        
+        if cached is None:
+            query = {'symbol': symbol, 'timeframe': timeframe, 'status': 'active', 'type': zone_type}
+            zones = await self.collection.find(query).to_list(length=None)
+            # Stable sort keeps query order among equal levels
+            zones.sort(key=lambda z: z['price_level'])
+            bounds = np.array(
+                [(z['price_level'], z['zone_lower'], z['zone_upper']) for z in zones],
+                dtype=np.float64
+            ).reshape(-1, 3)
+            cached = ([z['price_level'] for z in zones], zones, bounds)
+            self._active_zone_cache[key] = cached
+        
+        return cached
+    
+    async def get_nearest_zones_with_bounds(self, symbol: str, timeframe: str,
+                                            current_price: float, zone_type: str,
+                                            limit: int = 3) -> Tuple[List[Dict], np.ndarray]:
+        """
+        Get nearest active zones lying entirely beyond current price
+        
+        Resistance zones must sit above price (zone_lower > price) and support
+        zones below it (zone_upper < price). Results are ordered by distance
+        from price, same as get_nearest_zones, via a bisect on price level.
+        
+        Returns:
+            Tuple of (zones, (N, 3) [price_level, zone_lower, zone_upper] rows
+            for those zones, taken from the cached array)
+        """
+        levels, zones, bounds = await self._sorted_active_zones(symbol, timeframe, zone_type)
+        nearest = []
+        
+        if zone_type == 'resistance':
+            # zone_lower <= price_level, so candidates all sit right of price
+            for position in range(bisect_right(levels, current_price), len(zones)):
+                if zones[position]['zone_lower'] > current_price:
+                    nearest.append(position)
+                    if len(nearest) == limit:
+                        break
+        else:
+            # Walk down from price one run of equal levels at a time, keeping
+            # query order within a run
+            end = bisect_left(levels, current_price)
+            while end > 0 and len(nearest) < limit:
+                start = bisect_left(levels, levels[end - 1], 0, end)
+                for position in range(start, end):
+                    if zones[position]['zone_upper'] < current_price:
+                        nearest.append(position)
+                        if len(nearest) == limit:
+                            break
+                end = start
+        
+        return (
+            [
+                dict(zones[position], distance=abs(levels[position] - current_price))
+                for position in nearest
+            ],
+            bounds[nearest]
+        )
+    
     async def invalidate_zone(self, zone_id: str, breach_details: Dict):
         """Mark zone as invalidated"""
         await self.collection.update_one(
             {'_id': zone_id},
             {'$set': {'status': 'invalidated', 'breach_details': breach_details}}
         )
+        self._active_zone_cache.clear()
         bot_logger.info(f"VRZ zone invalidated: {zone_id}")
     
     async def check_and_invalidate(self, symbol: str, current_candle: Dict):
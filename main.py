@@ -4,6 +4,7 @@ Main application entry point
 import asyncio
 import signal
 from config.settings import settings
+from api.delta_client import delta_client
 from database.mongodb_client import mongodb_client
 from database.repositories.vrz_repository import vrz_repository
 from database.repositories.user_settings_repository import user_settings_repository
@@ -22,6 +23,9 @@ class TradingBotApp:
         self.running = False
         self.health_server = None
         self.trading_task = None
+        # Per-user entry engines, kept across loop iterations so their
+        # calculators' candle, swing and zone caches carry over between ticks
+        self.entry_engines = {}
         
     async def initialize(self):
         """Initialize all components"""
@@ -89,6 +93,11 @@ class TradingBotApp:
                     # Get all active users
                     active_users = await user_settings_repository.get_all_active_users()
                     
+                    # Drop engines of users who are no longer active
+                    active_ids = {user['telegram_user_id'] for user in active_users}
+                    for stale_id in self.entry_engines.keys() - active_ids:
+                        del self.entry_engines[stale_id]
+                    
                     for user_settings in active_users:
                         user_id = user_settings['telegram_user_id']
                         
@@ -116,16 +125,18 @@ class TradingBotApp:
                         else:  # individual
                             assets = [{'symbol': s} for s in selected_assets]
                         
-                        # Scan for entry signals
-                        entry_engine = EntryEngine(user_settings)
+                        # Scan for entry signals, rebuilding the engine when settings change
+                        entry_engine = self.entry_engines.get(user_id)
+                        if entry_engine is None or entry_engine.user_settings != user_settings:
+                            entry_engine = EntryEngine(user_settings)
+                            self.entry_engines[user_id] = entry_engine
                         
-                        for asset in assets:
-                            symbol = asset['symbol']
-                            product_id = asset.get('product_id')
-                            
-                            # Scan for entry
-                            signal = await entry_engine.scan_for_entry_signals(symbol, product_id)
-                            
+                        # Scan every asset concurrently; entries are then placed in order
+                        signals = await entry_engine.scan_for_entry_signals_batch(
+                            [(asset['symbol'], asset.get('product_id')) for asset in assets]
+                        )
+                        
+                        for signal in signals:
                             if signal:
                                 # Execute entry
                                 order_response = await entry_engine.execute_entry(signal)
@@ -158,15 +169,15 @@ class TradingBotApp:
                                 for action in exit_result.get('actions', []):
                                     if action['action'] in ['partial_exit', 'stop_loss_exit']:
                                         await position_manager.update_position_exit(
-                                            str(position['_id']), action
+                                            position['_id'], action
                                         )
                                     elif action['action'] == 'trail_stop':
                                         await position_manager.update_stop_loss(
-                                            str(position['_id']), action['new_stop_loss']
+                                            position['_id'], action['new_stop_loss']
                                         )
                     
                     # Update health metrics
-                    all_positions = await position_manager.get_open_positions()
+                    all_positions = await position_manager.get_open_positions(projection={'_id': 1})
                     health_checker.update_status(positions=len(all_positions))
                     
                     # Sleep before next iteration
@@ -187,6 +198,9 @@ class TradingBotApp:
             # Start Telegram bot
             await telegram_bot.start()
             
+            # Keep exchange connections warm between trading ticks
+            delta_client.start_keepalive()
+            
             # Start trading loop
             self.trading_task = asyncio.create_task(self.trading_loop())
             
@@ -214,6 +228,9 @@ class TradingBotApp:
             # Stop Telegram bot
             await telegram_bot.stop()
             
+            # Close exchange client
+            await delta_client.close()
+            
             # Close MongoDB
             await mongodb_client.close()
             
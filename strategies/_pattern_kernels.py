@@ -0,0 +1,154 @@
+"""
+Compiled candlestick pattern kernels operating on float64 OHLC columns
+
+pattern_flags_at holds the only definition of the pattern rules; every
+PatternDetector scan goes through it. Without Numba the kernels run as plain
+Python and also accept array('d') or list columns.
+"""
+import numpy as np
+from utils.jit import njit
+
+
+# Flag positions, in strategies.pattern_detector.PATTERN_SPECS order
+BULLISH_ENGULFING = 0
+BEARISH_ENGULFING = 1
+PIERCING_LINE = 2
+DARK_CLOUD_COVER = 3
+BULLISH_HARAMI = 4
+BEARISH_HARAMI = 5
+TWEEZER_BOTTOM = 6
+TWEEZER_TOP = 7
+MORNING_STAR = 8
+EVENING_STAR = 9
+THREE_WHITE_SOLDIERS = 10
+THREE_BLACK_CROWS = 11
+THREE_OUTSIDE_UP = 12
+THREE_OUTSIDE_DOWN = 13
+ABANDONED_BABY_BULLISH = 14
+ABANDONED_BABY_BEARISH = 15
+HAMMER = 16
+INVERTED_HAMMER = 17
+HANGING_MAN = 18
+SHOOTING_STAR = 19
+PATTERN_COUNT = 20
+
+
+@njit(cache=True)
+def _is_strong_body(o, h, l, c):
+    """Both shadows within 30% of the body"""
+    body = abs(c - o)
+    return h - max(o, c) <= body * 0.3 and min(o, c) - l <= body * 0.3
+
+
+@njit(cache=True)
+def pattern_flags_at(o, h, l, c, i):
+    """
+    Evaluate every pattern completing on candle i
+
+    Reads the (up to) three candles involved straight from the columns and
+    computes their shared features once for all patterns.
+
+    Args:
+        o, h, l, c: Open/high/low/close float64 arrays
+        i: Index of the pattern's last candle
+
+    Returns:
+        bool array of PATTERN_COUNT flags
+    """
+    flags = np.zeros(PATTERN_COUNT, dtype=np.bool_)
+
+    # Last candle (z)
+    oz, hz, lz, cz = o[i], h[i], l[i], c[i]
+    body_z = abs(cz - oz)
+    upper_z = hz - max(oz, cz)
+    lower_z = min(oz, cz) - lz
+    range_z = hz - lz
+    small_range = range_z != 0 and body_z / range_z < 0.3
+
+    hammer = lower_z >= body_z * 2 and upper_z < body_z * 0.3 and small_range
+    inverted = upper_z >= body_z * 2 and lower_z < body_z * 0.3 and small_range
+    flags[HAMMER] = hammer
+    flags[HANGING_MAN] = hammer
+    flags[INVERTED_HAMMER] = inverted
+    flags[SHOOTING_STAR] = inverted
+
+    if i < 1:
+        return flags
+
+    # Previous candle (y)
+    oy, hy, ly, cy = o[i - 1], h[i - 1], l[i - 1], c[i - 1]
+    body_y = abs(cy - oy)
+    bull_y = cy > oy
+    bear_y = cy < oy
+    bull_z = cz > oz
+    bear_z = cz < oz
+    mid_y = (oy + cy) / 2
+
+    bear_bull = bear_y and bull_z
+    bull_bear = bull_y and bear_z
+    flags[BULLISH_ENGULFING] = bear_bull and oz <= cy and cz >= oy and body_z > body_y
+    flags[BEARISH_ENGULFING] = bull_bear and oz >= cy and cz <= oy and body_z > body_y
+    flags[PIERCING_LINE] = bear_bull and oz < cy and cz > mid_y and cz < oy
+    flags[DARK_CLOUD_COVER] = bull_bear and oz > cy and cz < mid_y and cz > oy
+    flags[BULLISH_HARAMI] = bear_bull and oz >= cy and cz <= oy and body_z < body_y
+    flags[BEARISH_HARAMI] = bull_bear and oz <= cy and cz >= oy and body_z < body_y
+
+    avg_low = (ly + lz) / 2
+    avg_high = (hy + hz) / 2
+    flags[TWEEZER_BOTTOM] = avg_low != 0 and abs(ly - lz) / avg_low < 0.001
+    flags[TWEEZER_TOP] = avg_high != 0 and abs(hy - hz) / avg_high < 0.001
+
+    if i < 2:
+        return flags
+
+    # First candle (x)
+    ox, hx, lx, cx = o[i - 2], h[i - 2], l[i - 2], c[i - 2]
+    body_x = abs(cx - ox)
+    bull_x = cx > ox
+    bear_x = cx < ox
+    mid_x = (ox + cx) / 2
+    small_star = body_y <= body_x * 0.3
+    range_y = hy - ly
+    doji_y = range_y > 0 and body_y / range_y < 0.1
+
+    flags[MORNING_STAR] = bear_x and small_star and bull_z and cz > mid_x
+    flags[EVENING_STAR] = bull_x and small_star and bear_z and cz < mid_x
+
+    if bull_x and bull_y and bull_z:
+        flags[THREE_WHITE_SOLDIERS] = (
+            ox < oy < cx and oy < oz < cy and cx < cy < cz and
+            _is_strong_body(ox, hx, lx, cx) and
+            _is_strong_body(oy, hy, ly, cy) and
+            _is_strong_body(oz, hz, lz, cz)
+        )
+    if bear_x and bear_y and bear_z:
+        flags[THREE_BLACK_CROWS] = (
+            cx < oy < ox and cy < oz < oy and cz < cy < cx and
+            _is_strong_body(ox, hx, lx, cx) and
+            _is_strong_body(oy, hy, ly, cy) and
+            _is_strong_body(oz, hz, lz, cz)
+        )
+
+    flags[THREE_OUTSIDE_UP] = (bear_x and bull_y and oy <= cx and cy >= ox and
+                               bull_z and cz > cy)
+    flags[THREE_OUTSIDE_DOWN] = (bull_x and bear_y and oy >= cx and cy <= ox and
+                                 bear_z and cz < cy)
+    flags[ABANDONED_BABY_BULLISH] = bear_x and doji_y and bull_z and hy < lx and hy < lz
+    flags[ABANDONED_BABY_BEARISH] = bull_x and doji_y and bear_z and ly > hx and ly > hz
+
+    return flags
+
+
+@njit(cache=True)
+def pattern_matrix(o, h, l, c):
+    """
+    Evaluate every pattern on every candle
+
+    Returns:
+        (N, PATTERN_COUNT) bool matrix; row i is pattern_flags_at(..., i)
+    """
+    n = len(o)
+    out = np.zeros((n, PATTERN_COUNT), dtype=np.bool_)
+    for i in range(n):
+        out[i] = pattern_flags_at(o, h, l, c, i)
+    return out
@@ -0,0 +1,66 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True, language_level=3
+"""
+Cython swing pivot kernel
+
+Optional: SwingDetector imports this when a compiled module is present and
+otherwise uses the Numba / NumPy paths. Build in place with:
+
+    cythonize -i -3 strategies/_swing.pyx
+"""
+import numpy as np
+cimport numpy as cnp
+
+cnp.import_array()
+
+ctypedef fused price_t:
+    float
+    double
+
+
+cdef inline bint _is_pivot(const price_t[::1] values, Py_ssize_t i,
+                           Py_ssize_t left, Py_ssize_t right, price_t sign) nogil:
+    """True when sign * values[i] strictly exceeds sign * every neighbour"""
+    cdef price_t pivot = sign * values[i]
+    cdef Py_ssize_t j
+    
+    for j in range(i - left, i):
+        if sign * values[j] >= pivot:
+            return False
+    for j in range(i + 1, i + right + 1):
+        if sign * values[j] >= pivot:
+            return False
+    return True
+
+
+def scan_swings(const price_t[::1] highs, const price_t[::1] lows, int left, int right):
+    """
+    Scan for swing highs and lows in a single loop
+    
+    Args:
+        highs: Candle highs (float32 or float64, contiguous)
+        lows: Candle lows (same dtype as highs)
+        left: Bars to check before pivot
+        right: Bars to check after pivot
+    
+    Returns:
+        Tuple of (swing_high_indices, swing_low_indices) as int64 arrays
+    """
+    cdef Py_ssize_t n = highs.shape[0]
+    cdef Py_ssize_t i
+    cdef Py_ssize_t n_high = 0
+    cdef Py_ssize_t n_low = 0
+    cdef cnp.ndarray[cnp.int64_t, ndim=1] high_idx = np.empty(n, dtype=np.int64)
+    cdef cnp.ndarray[cnp.int64_t, ndim=1] low_idx = np.empty(n, dtype=np.int64)
+    cdef cnp.int64_t[::1] high_out = high_idx
+    cdef cnp.int64_t[::1] low_out = low_idx
+    
+    with nogil:
+        for i in range(left, n - right):
+            if _is_pivot(highs, i, left, right, 1.0):
+                high_out[n_high] = i
+                n_high += 1
+            if _is_pivot(lows, i, left, right, -1.0):
+                low_out[n_low] = i
+                n_low += 1
+    
+    return high_idx[:n_high], low_idx[:n_low]
@@ -0,0 +1,52 @@
+"""
+Compiled swing pivot kernels operating on contiguous float32/float64 columns
+"""
+import numpy as np
+from utils.jit import njit
+
+
+@njit(cache=True)
+def scan_swings(highs, lows, left, right):
+    """
+    Scan for swing highs and lows in a single loop
+    
+    A bar is a swing high when no high within `left` bars before or `right`
+    bars after reaches its high; swing lows mirror this on lows.
+    
+    Args:
+        highs: Candle highs (float32 or float64, contiguous)
+        lows: Candle lows (same dtype as highs)
+        left: Bars to check before pivot
+        right: Bars to check after pivot
+    
+    Returns:
+        Tuple of (swing_high_indices, swing_low_indices) as int64 arrays
+    """
+    n = highs.shape[0]
+    high_idx = np.empty(n, dtype=np.int64)
+    low_idx = np.empty(n, dtype=np.int64)
+    n_high = 0
+    n_low = 0
+    
+    for i in range(left, n - right):
+        pivot_high = highs[i]
+        is_high = True
+        for j in range(i - left, i + right + 1):
+            if j != i and highs[j] >= pivot_high:
+                is_high = False
+                break
+        if is_high:
+            high_idx[n_high] = i
+            n_high += 1
+        
+        pivot_low = lows[i]
+        is_low = True
+        for j in range(i - left, i + right + 1):
+            if j != i and lows[j] <= pivot_low:
+                is_low = False
+                break
+        if is_low:
+            low_idx[n_low] = i
+            n_low += 1
+    
+    return high_idx[:n_high], low_idx[:n_low]
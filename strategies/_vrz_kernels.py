@@ -0,0 +1,28 @@
+"""
+Compiled VRZ zone kernels
+"""
+import numpy as np
+from utils.jit import njit
+
+
+@njit(cache=True)
+def compute_zone_bounds(prices, buffer_fraction):
+    """
+    Calculate buffered zone bounds around each price level
+    
+    Args:
+        prices: Zone center prices (float64, contiguous)
+        buffer_fraction: Buffer as a fraction of price (buffer_percent / 100)
+    
+    Returns:
+        (n, 2) array of [zone_lower, zone_upper] rows
+    """
+    n = prices.shape[0]
+    out = np.empty((n, 2), dtype=np.float64)
+    
+    for i in range(n):
+        buffer = prices[i] * buffer_fraction
+        out[i, 0] = prices[i] - buffer
+        out[i, 1] = prices[i] + buffer
+    
+    return out
@@ -1,8 +1,62 @@
 """
 Candlestick pattern detection for entry signals
 """
-from typing import List, Dict, Optional
+from array import array
+from typing import List, Dict, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+from strategies._pattern_kernels import PATTERN_COUNT, pattern_flags_at, pattern_matrix
+from utils.jit import NUMBA_AVAILABLE
 from utils.logger import bot_logger
+from utils.ohlc import OHLCFrame, as_frame
+
+
+# Pattern metadata in scan order:
+# (pattern_name, direction, confidence, span, high_offsets, low_offsets)
+# high/low offsets count back from the pattern's last candle; pattern_high is
+# the max high over those candles and pattern_low the min low.
+PATTERN_SPECS = (
+    # Two-candle patterns
+    ('bullish_engulfing', 'bullish', 0.75, 2, (0,), (0, 1)),
+    ('bearish_engulfing', 'bearish', 0.75, 2, (0, 1), (0,)),
+    ('piercing_line', 'bullish', 0.70, 2, (0,), (0, 1)),
+    ('dark_cloud_cover', 'bearish', 0.70, 2, (0, 1), (0,)),
+    ('bullish_harami', 'bullish', 0.65, 2, (1,), (1,)),
+    ('bearish_harami', 'bearish', 0.65, 2, (1,), (1,)),
+    ('tweezer_bottom', 'bullish', 0.60, 2, (0, 1), (0, 1)),
+    ('tweezer_top', 'bearish', 0.60, 2, (0, 1), (0, 1)),
+    # Three-candle patterns
+    ('morning_star', 'bullish', 0.80, 3, (0,), (0, 1, 2)),
+    ('evening_star', 'bearish', 0.80, 3, (0, 1, 2), (0,)),
+    ('three_white_soldiers', 'bullish', 0.85, 3, (0,), (0, 1, 2)),
+    ('three_black_crows', 'bearish', 0.85, 3, (0, 1, 2), (0,)),
+    ('three_outside_up', 'bullish', 0.78, 3, (0,), (0, 1, 2)),
+    ('three_outside_down', 'bearish', 0.78, 3, (0, 1, 2), (0,)),
+    ('abandoned_baby_bullish', 'bullish', 0.90, 3, (0,), (1,)),
+    ('abandoned_baby_bearish', 'bearish', 0.90, 3, (1,), (0,)),
+    # Single-candle patterns
+    ('hammer', 'bullish', 0.70, 1, (0,), (0,)),
+    ('inverted_hammer', 'bullish', 0.65, 1, (0,), (0,)),
+    ('hanging_man', 'bearish', 0.70, 1, (0,), (0,)),
+    ('shooting_star', 'bearish', 0.70, 1, (0,), (0,)),
+)
+
+_PATTERN_COLUMNS = {spec[0]: k for k, spec in enumerate(PATTERN_SPECS)}
+assert len(PATTERN_SPECS) == PATTERN_COUNT
+
+_PATTERN_CONFIDENCE = np.array([spec[2] for spec in PATTERN_SPECS])
+
+# Pattern columns by descending confidence (ties keep scan order), so the
+# first hit in this order is the best pattern
+_PATTERN_PRIORITY = tuple(sorted(range(len(PATTERN_SPECS)), key=lambda k: -PATTERN_SPECS[k][2]))
+
+# Best-pattern-per-candle records produced by scan_best_patterns
+PATTERN_DTYPE = np.dtype([('index', 'i8'), ('pattern_id', 'i2'), ('confidence', 'f8')])
+
+
+def _kernel_column(values: List[float]):
+    """Float column for the pattern kernels (a NumPy array only when they are compiled)"""
+    return np.array(values, dtype=np.float64) if NUMBA_AVAILABLE else array('d', values)
 
 
 class PatternDetector:
@@ -11,847 +65,321 @@ class PatternDetector:
     def __init__(self):
         self.min_body_size = 0.0001  # Minimum body size threshold
     
-    def _get_body_size(self, candle: Dict) -> float:
-        """Calculate candle body size"""
-        return abs(candle['close'] - candle['open'])
-    
-    def _is_bullish(self, candle: Dict) -> bool:
-        """Check if candle is bullish"""
-        return candle['close'] > candle['open']
-    
-    def _is_bearish(self, candle: Dict) -> bool:
-        """Check if candle is bearish"""
-        return candle['close'] < candle['open']
-    
-    def _get_upper_shadow(self, candle: Dict) -> float:
-        """Get upper shadow length"""
-        return candle['high'] - max(candle['open'], candle['close'])
-    
-    def _get_lower_shadow(self, candle: Dict) -> float:
-        """Get lower shadow length"""
-        return min(candle['open'], candle['close']) - candle['low']
-    
-    def _is_doji(self, candle: Dict) -> bool:
-        """Check if candle is a doji (very small body)"""
-        body_size = self._get_body_size(candle)
-        total_range = candle['high'] - candle['low']
-        return body_size / total_range < 0.1 if total_range > 0 else False
+    def _detect(self, candles: Union[List[Dict], OHLCFrame], index: int, name: str) -> Optional[Dict]:
+        """Pattern dictionary for the named pattern completing at index, or None"""
+        k = _PATTERN_COLUMNS[name]
+        flags = self._flags_at(candles, index)
+        return self._materialize_pattern(candles, index, k) if flags and flags[k] else None
     
     # ==================== TWO-CANDLE PATTERNS ====================
     
     def detect_bullish_engulfing(self, candles: List[Dict], index: int) -> Optional[Dict]:
-        """
-        Detect Bullish Engulfing pattern
-        
-        Pattern: Small bearish candle followed by larger bullish candle that engulfs it
-        Signal: Strong bullish reversal
-        """
-        if index < 1:
-            return None
-        
-        prev_candle = candles[index - 1]
-        curr_candle = candles[index]
-        
-        # Previous candle is bearish, current is bullish
-        if not self._is_bearish(prev_candle) or not self._is_bullish(curr_candle):
-            return None
-        
-        # Current candle engulfs previous candle body
-        if (curr_candle['open'] <= prev_candle['close'] and 
-            curr_candle['close'] >= prev_candle['open'] and
-            self._get_body_size(curr_candle) > self._get_body_size(prev_candle)):
-            
-            return {
-                'detected': True,
-                'pattern_name': 'bullish_engulfing',
-                'direction': 'bullish',
-                'confidence': 0.75,
-                'candles_involved': [prev_candle, curr_candle],
-                'pattern_high': curr_candle['high'],
-                'pattern_low': min(prev_candle['low'], curr_candle['low'])
-            }
-        
-        return None
+        """Small bearish candle followed by a larger bullish candle that engulfs it"""
+        return self._detect(candles, index, 'bullish_engulfing')
     
     def detect_bearish_engulfing(self, candles: List[Dict], index: int) -> Optional[Dict]:
-        """
-        Detect Bearish Engulfing pattern
-        
-        Pattern: Small bullish candle followed by larger bearish candle that engulfs it
-        Signal: Strong bearish reversal
-        """
-        if index < 1:
-            return None
-        
-        prev_candle = candles[index - 1]
-        curr_candle = candles[index]
-        
-        # Previous candle is bullish, current is bearish
-        if not self._is_bullish(prev_candle) or not self._is_bearish(curr_candle):
-            return None
-        
-        # Current candle engulfs previous candle body
-        if (curr_candle['open'] >= prev_candle['close'] and 
-            curr_candle['close'] <= prev_candle['open'] and
-            self._get_body_size(curr_candle) > self._get_body_size(prev_candle)):
-            
-            return {
-                'detected': True,
-                'pattern_name': 'bearish_engulfing',
-                'direction': 'bearish',
-                'confidence': 0.75,
-                'candles_involved': [prev_candle, curr_candle],
-                'pattern_high': max(prev_candle['high'], curr_candle['high']),
-                'pattern_low': curr_candle['low']
-            }
-        
-        return None
+        """Small bullish candle followed by a larger bearish candle that engulfs it"""
+        return self._detect(candles, index, 'bearish_engulfing')
     
     def detect_piercing_line(self, candles: List[Dict], index: int) -> Optional[Dict]:
-        """
-        Detect Piercing Line pattern (bullish)
-        
-        Pattern: Bearish candle followed by bullish candle that opens below and closes above midpoint
-        Signal: Bullish reversal
-        """
-        if index < 1:
-            return None
-        
-        prev_candle = candles[index - 1]
-        curr_candle = candles[index]
-        
-        if not self._is_bearish(prev_candle) or not self._is_bullish(curr_candle):
-            return None
-        
-        # Current opens below previous close and closes above midpoint
-        prev_midpoint = (prev_candle['open'] + prev_candle['close']) / 2
-        
-        if (curr_candle['open'] < prev_candle['close'] and
-            curr_candle['close'] > prev_midpoint and
-            curr_candle['close'] < prev_candle['open']):
-            
-            return {
-                'detected': True,
-                'pattern_name': 'piercing_line',
-                'direction': 'bullish',
-                'confidence': 0.70,
-                'candles_involved': [prev_candle, curr_candle],
-                'pattern_high': curr_candle['high'],
-                'pattern_low': min(prev_candle['low'], curr_candle['low'])
-            }
-        
-        return None
+        """Bearish candle followed by a bullish candle opening below and closing above its midpoint"""
+        return self._detect(candles, index, 'piercing_line')
     
     def detect_dark_cloud_cover(self, candles: List[Dict], index: int) -> Optional[Dict]:
-        """
-        Detect Dark Cloud Cover pattern (bearish)
-        
-        Pattern: Bullish candle followed by bearish candle that opens above and closes below midpoint
-        Signal: Bearish reversal
-        """
-        if index < 1:
-            return None
-        
-        prev_candle = candles[index - 1]
-        curr_candle = candles[index]
-        
-        if not self._is_bullish(prev_candle) or not self._is_bearish(curr_candle):
-            return None
-        
-        # Current opens above previous close and closes below midpoint
-        prev_midpoint = (prev_candle['open'] + prev_candle['close']) / 2
-        
-        if (curr_candle['open'] > prev_candle['close'] and
-            curr_candle['close'] < prev_midpoint and
-            curr_candle['close'] > prev_candle['open']):
-            
-            return {
-                'detected': True,
-                'pattern_name': 'dark_cloud_cover',
-                'direction': 'bearish',
-                'confidence': 0.70,
-                'candles_involved': [prev_candle, curr_candle],
-                'pattern_high': max(prev_candle['high'], curr_candle['high']),
-                'pattern_low': curr_candle['low']
-            }
-        
-        return None
+        """Bullish candle followed by a bearish candle opening above and closing below its midpoint"""
+        return self._detect(candles, index, 'dark_cloud_cover')
     
     def detect_bullish_harami(self, candles: List[Dict], index: int) -> Optional[Dict]:
-        """
-        Detect Bullish Harami pattern
-        
-        Pattern: Large bearish candle followed by small bullish candle contained within
-        Signal: Bullish reversal (moderate strength)
-        """
-        if index < 1:
-            return None
-        
-        prev_candle = candles[index - 1]
-        curr_candle = candles[index]
-        
-        if not self._is_bearish(prev_candle) or not self._is_bullish(curr_candle):
-            return None
-        
-        # Current candle body is within previous candle body
-        if (curr_candle['open'] >= prev_candle['close'] and
-            curr_candle['close'] <= prev_candle['open'] and
-            self._get_body_size(curr_candle) < self._get_body_size(prev_candle)):
-            
-            return {
-                'detected': True,
-                'pattern_name': 'bullish_harami',
-                'direction': 'bullish',
-                'confidence': 0.65,
-                'candles_involved': [prev_candle, curr_candle],
-                'pattern_high': prev_candle['high'],
-                'pattern_low': prev_candle['low']
-            }
-        
-        return None
+        """Large bearish candle followed by a small bullish candle contained within"""
+        return self._detect(candles, index, 'bullish_harami')
     
     def detect_bearish_harami(self, candles: List[Dict], index: int) -> Optional[Dict]:
-        """
-        Detect Bearish Harami pattern
-        
-        Pattern: Large bullish candle followed by small bearish candle contained within
-        Signal: Bearish reversal (moderate strength)
-        """
-        if index < 1:
-            return None
-        
-        prev_candle = candles[index - 1]
-        curr_candle = candles[index]
-        
-        if not self._is_bullish(prev_candle) or not self._is_bearish(curr_candle):
-            return None
-        
-        # Current candle body is within previous candle body
-        if (curr_candle['open'] <= prev_candle['close'] and
-            curr_candle['close'] >= prev_candle['open'] and
-            self._get_body_size(curr_candle) < self._get_body_size(prev_candle)):
-            
-            return {
-                'detected': True,
-                'pattern_name': 'bearish_harami',
-                'direction': 'bearish',
-                'confidence': 0.65,
-                'candles_involved': [prev_candle, curr_candle],
-                'pattern_high': prev_candle['high'],
-                'pattern_low': prev_candle['low']
-            }
-        
-        return None
+        """Large bullish candle followed by a small bearish candle contained within"""
+        return self._detect(candles, index, 'bearish_harami')
     
     def detect_tweezer_bottom(self, candles: List[Dict], index: int) -> Optional[Dict]:
-        """
-        Detect Tweezer Bottom pattern (bullish)
-        
-        Pattern: Two candles with nearly identical lows
-        Signal: Support level, bullish reversal
-        """
-        if index < 1:
-            return None
-        
-        prev_candle = candles[index - 1]
-        curr_candle = candles[index]
-        
-        # Both candles have nearly identical lows
-        low_diff = abs(prev_candle['low'] - curr_candle['low'])
-        avg_low = (prev_candle['low'] + curr_candle['low']) / 2
-        
-        if low_diff / avg_low < 0.001:  # Within 0.1% tolerance
-            return {
-                'detected': True,
-                'pattern_name': 'tweezer_bottom',
-                'direction': 'bullish',
-                'confidence': 0.60,
-                'candles_involved': [prev_candle, curr_candle],
-                'pattern_high': max(prev_candle['high'], curr_candle['high']),
-                'pattern_low': min(prev_candle['low'], curr_candle['low'])
-            }
-        
-        return None
+        """Two candles with nearly identical lows"""
+        return self._detect(candles, index, 'tweezer_bottom')
     
     def detect_tweezer_top(self, candles: List[Dict], index: int) -> Optional[Dict]:
-        """
-        Detect Tweezer Top pattern (bearish)
-        
-        Pattern: Two candles with nearly identical highs
-        Signal: Resistance level, bearish reversal
-        """
-        if index < 1:
-            return None
-        
-        prev_candle = candles[index - 1]
-        curr_candle = candles[index]
-        
-        # Both candles have nearly identical highs
-        high_diff = abs(prev_candle['high'] - curr_candle['high'])
-        avg_high = (prev_candle['high'] + curr_candle['high']) / 2
-        
-        if high_diff / avg_high < 0.001:  # Within 0.1% tolerance
-            return {
-                'detected': True,
-                'pattern_name': 'tweezer_top',
-                'direction': 'bearish',
-                'confidence': 0.60,
-                'candles_involved': [prev_candle, curr_candle],
-                'pattern_high': max(prev_candle['high'], curr_candle['high']),
-                'pattern_low': min(prev_candle['low'], curr_candle['low'])
-            }
-        
-        return None
-
+        """Two candles with nearly identical highs"""
+        return self._detect(candles, index, 'tweezer_top')
+    
     # ==================== THREE-CANDLE PATTERNS ====================
     
     def detect_morning_star(self, candles: List[Dict], index: int) -> Optional[Dict]:
-        """
-        Detect Morning Star pattern (bullish)
-        
-        Pattern: Bearish candle, small-bodied star, bullish candle
-        Signal: Strong bullish reversal
-        """
-        if index < 2:
-            return None
-        
-        candle1 = candles[index - 2]
-        candle2 = candles[index - 1]  # Star
-        candle3 = candles[index]
-        
-        # First candle is bearish
-        if not self._is_bearish(candle1):
-            return None
-        
-        # Star has small body
-        if self._get_body_size(candle2) > self._get_body_size(candle1) * 0.3:
-            return None
-        
-        # Third candle is bullish
-        if not self._is_bullish(candle3):
-            return None
-        
-        # Third candle closes well into first candle body
-        if candle3['close'] > (candle1['open'] + candle1['close']) / 2:
-            return {
-                'detected': True,
-                'pattern_name': 'morning_star',
-                'direction': 'bullish',
-                'confidence': 0.80,
-                'candles_involved': [candle1, candle2, candle3],
-                'pattern_high': candle3['high'],
-                'pattern_low': min(candle1['low'], candle2['low'], candle3['low'])
-            }
-        
-        return None
+        """Bearish candle, small-bodied star, bullish candle"""
+        return self._detect(candles, index, 'morning_star')
     
     def detect_evening_star(self, candles: List[Dict], index: int) -> Optional[Dict]:
-        """
-        Detect Evening Star pattern (bearish)
-        
-        Pattern: Bullish candle, small-bodied star, bearish candle
-        Signal: Strong bearish reversal
-        """
-        if index < 2:
-            return None
-        
-        candle1 = candles[index - 2]
-        candle2 = candles[index - 1]  # Star
-        candle3 = candles[index]
-        
-        # First candle is bullish
-        if not self._is_bullish(candle1):
-            return None
-        
-        # Star has small body
-        if self._get_body_size(candle2) > self._get_body_size(candle1) * 0.3:
-            return None
-        
-        # Third candle is bearish
-        if not self._is_bearish(candle3):
-            return None
-        
-        # Third candle closes well into first candle body
-        if candle3['close'] < (candle1['open'] + candle1['close']) / 2:
-            return {
-                'detected': True,
-                'pattern_name': 'evening_star',
-                'direction': 'bearish',
-                'confidence': 0.80,
-                'candles_involved': [candle1, candle2, candle3],
-                'pattern_high': max(candle1['high'], candle2['high'], candle3['high']),
-                'pattern_low': candle3['low']
-            }
-        
-        return None
+        """Bullish candle, small-bodied star, bearish candle"""
+        return self._detect(candles, index, 'evening_star')
     
     def detect_three_white_soldiers(self, candles: List[Dict], index: int) -> Optional[Dict]:
-        """
-        Detect Three White Soldiers pattern (bullish)
-        
-        Pattern: Three consecutive long bullish candles
-        Signal: Strong bullish trend
-        """
-        if index < 2:
-            return None
-        
-        candle1 = candles[index - 2]
-        candle2 = candles[index - 1]
-        candle3 = candles[index]
-        
-        # All three candles must be bullish
-        if not (self._is_bullish(candle1) and self._is_bullish(candle2) and self._is_bullish(candle3)):
-            return None
-        
-        # Each candle opens within previous body and closes higher
-        if not (candle2['open'] > candle1['open'] and candle2['open'] < candle1['close']):
-            return None
-        if not (candle3['open'] > candle2['open'] and candle3['open'] < candle2['close']):
-            return None
-        
-        # Each candle closes progressively higher
-        if not (candle2['close'] > candle1['close'] and candle3['close'] > candle2['close']):
-            return None
-        
-        # Check for minimal shadows (strong bodies)
-        for candle in [candle1, candle2, candle3]:
-            body_size = self._get_body_size(candle)
-            upper_shadow = self._get_upper_shadow(candle)
-            lower_shadow = self._get_lower_shadow(candle)
-            
-            if upper_shadow > body_size * 0.3 or lower_shadow > body_size * 0.3:
-                return None
-        
-        return {
-            'detected': True,
-            'pattern_name': 'three_white_soldiers',
-            'direction': 'bullish',
-            'confidence': 0.85,
-            'candles_involved': [candle1, candle2, candle3],
-            'pattern_high': candle3['high'],
-            'pattern_low': min(candle1['low'], candle2['low'], candle3['low'])
-        }
+        """Three consecutive long bullish candles"""
+        return self._detect(candles, index, 'three_white_soldiers')
     
     def detect_three_black_crows(self, candles: List[Dict], index: int) -> Optional[Dict]:
-        """
-        Detect Three Black Crows pattern (bearish)
-        
-        Pattern: Three consecutive long bearish candles
-        Signal: Strong bearish trend
-        """
-        if index < 2:
-            return None
-        
-        candle1 = candles[index - 2]
-        candle2 = candles[index - 1]
-        candle3 = candles[index]
-        
-        # All three candles must be bearish
-        if not (self._is_bearish(candle1) and self._is_bearish(candle2) and self._is_bearish(candle3)):
-            return None
-        
-        # Each candle opens within previous body and closes lower
-        if not (candle2['open'] < candle1['open'] and candle2['open'] > candle1['close']):
-            return None
-        if not (candle3['open'] < candle2['open'] and candle3['open'] > candle2['close']):
-            return None
-        
-        # Each candle closes progressively lower
-        if not (candle2['close'] < candle1['close'] and candle3['close'] < candle2['close']):
-            return None
-        
-        # Check for minimal shadows (strong bodies)
-        for candle in [candle1, candle2, candle3]:
-            body_size = self._get_body_size(candle)
-            upper_shadow = self._get_upper_shadow(candle)
-            lower_shadow = self._get_lower_shadow(candle)
-            
-            if upper_shadow > body_size * 0.3 or lower_shadow > body_size * 0.3:
-                return None
-        
-        return {
-            'detected': True,
-            'pattern_name': 'three_black_crows',
-            'direction': 'bearish',
-            'confidence': 0.85,
-            'candles_involved': [candle1, candle2, candle3],
-            'pattern_high': max(candle1['high'], candle2['high'], candle3['high']),
-            'pattern_low': candle3['low']
-        }
+        """Three consecutive long bearish candles"""
+        return self._detect(candles, index, 'three_black_crows')
     
     def detect_three_outside_up(self, candles: List[Dict], index: int) -> Optional[Dict]:
-        """
-        Detect Three Outside Up pattern (bullish)
-        
-        Pattern: Bearish candle, bullish engulfing, continuation bullish
-        Signal: Strong bullish reversal
-        """
-        if index < 2:
-            return None
-        
-        candle1 = candles[index - 2]
-        candle2 = candles[index - 1]
-        candle3 = candles[index]
-        
-        # First candle bearish
-        if not self._is_bearish(candle1):
-            return None
-        
-        # Second candle engulfs first (bullish engulfing)
-        if not (self._is_bullish(candle2) and 
-                candle2['open'] <= candle1['close'] and 
-                candle2['close'] >= candle1['open']):
-            return None
-        
-        # Third candle closes higher than second
-        if not (self._is_bullish(candle3) and candle3['close'] > candle2['close']):
-            return None
-        
-        return {
-            'detected': True,
-            'pattern_name': 'three_outside_up',
-            'direction': 'bullish',
-            'confidence': 0.78,
-            'candles_involved': [candle1, candle2, candle3],
-            'pattern_high': candle3['high'],
-            'pattern_low': min(candle1['low'], candle2['low'], candle3['low'])
-        }
+        """Bearish candle, bullish engulfing, continuation bullish"""
+        return self._detect(candles, index, 'three_outside_up')
     
     def detect_three_outside_down(self, candles: List[Dict], index: int) -> Optional[Dict]:
-        """
-        Detect Three Outside Down pattern (bearish)
-        
-        Pattern: Bullish candle, bearish engulfing, continuation bearish
-        Signal: Strong bearish reversal
-        """
-        if index < 2:
-            return None
-        
-        candle1 = candles[index - 2]
-        candle2 = candles[index - 1]
-        candle3 = candles[index]
-        
-        # First candle bullish
-        if not self._is_bullish(candle1):
-            return None
-        
-        # Second candle engulfs first (bearish engulfing)
-        if not (self._is_bearish(candle2) and 
-                candle2['open'] >= candle1['close'] and 
-                candle2['close'] <= candle1['open']):
-            return None
-        
-        # Third candle closes lower than second
-        if not (self._is_bearish(candle3) and candle3['close'] < candle2['close']):
-            return None
-        
-        return {
-            'detected': True,
-            'pattern_name': 'three_outside_down',
-            'direction': 'bearish',
-            'confidence': 0.78,
-            'candles_involved': [candle1, candle2, candle3],
-            'pattern_high': max(candle1['high'], candle2['high'], candle3['high']),
-            'pattern_low': candle3['low']
-        }
+        """Bullish candle, bearish engulfing, continuation bearish"""
+        return self._detect(candles, index, 'three_outside_down')
     
     def detect_abandoned_baby_bullish(self, candles: List[Dict], index: int) -> Optional[Dict]:
-        """
-        Detect Abandoned Baby Bullish pattern
-        
-        Pattern: Bearish candle, gap down doji, gap up bullish candle
-        Signal: Very strong bullish reversal (rare)
-        """
-        if index < 2:
-            return None
-        
-        candle1 = candles[index - 2]
-        candle2 = candles[index - 1]  # Doji
-        candle3 = candles[index]
-        
-        # First candle bearish
-        if not self._is_bearish(candle1):
-            return None
-        
-        # Middle candle is doji
-        if not self._is_doji(candle2):
-            return None
-        
-        # Third candle bullish
-        if not self._is_bullish(candle3):
-            return None
-        
-        # Check for gaps (no shadow overlap)
-        if candle2['high'] >= candle1['low'] or candle2['high'] >= candle3['low']:
-            return None
-        
-        return {
-            'detected': True,
-            'pattern_name': 'abandoned_baby_bullish',
-            'direction': 'bullish',
-            'confidence': 0.90,
-            'candles_involved': [candle1, candle2, candle3],
-            'pattern_high': candle3['high'],
-            'pattern_low': candle2['low']
-        }
+        """Bearish candle, gap down doji, gap up bullish candle"""
+        return self._detect(candles, index, 'abandoned_baby_bullish')
     
     def detect_abandoned_baby_bearish(self, candles: List[Dict], index: int) -> Optional[Dict]:
-        """
-        Detect Abandoned Baby Bearish pattern
-        
-        Pattern: Bullish candle, gap up doji, gap down bearish candle
-        Signal: Very strong bearish reversal (rare)
-        """
-        if index < 2:
-            return None
-        
-        candle1 = candles[index - 2]
-        candle2 = candles[index - 1]  # Doji
-        candle3 = candles[index]
-        
-        # First candle bullish
-        if not self._is_bullish(candle1):
-            return None
-        
-        # Middle candle is doji
-        if not self._is_doji(candle2):
-            return None
-        
-        # Third candle bearish
-        if not self._is_bearish(candle3):
-            return None
-        
-        # Check for gaps (no shadow overlap)
-        if candle2['low'] <= candle1['high'] or candle2['low'] <= candle3['high']:
-            return None
-        
-        return {
-            'detected': True,
-            'pattern_name': 'abandoned_baby_bearish',
-            'direction': 'bearish',
-            'confidence': 0.90,
-            'candles_involved': [candle1, candle2, candle3],
-            'pattern_high': candle2['high'],
-            'pattern_low': candle3['low']
-        }
+        """Bullish candle, gap up doji, gap down bearish candle"""
+        return self._detect(candles, index, 'abandoned_baby_bearish')
     
     # ==================== SINGLE CANDLE PATTERNS ====================
     
     def detect_hammer(self, candles: List[Dict], index: int) -> Optional[Dict]:
+        """Small body at top, long lower shadow, minimal upper shadow"""
+        return self._detect(candles, index, 'hammer')
+    
+    def detect_inverted_hammer(self, candles: List[Dict], index: int) -> Optional[Dict]:
+        """Small body at bottom, long upper shadow, minimal lower shadow"""
+        return self._detect(candles, index, 'inverted_hammer')
+    
+    def detect_hanging_man(self, candles: List[Dict], index: int) -> Optional[Dict]:
+        """Hammer shape read as a bearish reversal"""
+        return self._detect(candles, index, 'hanging_man')
+    
+    def detect_shooting_star(self, candles: List[Dict], index: int) -> Optional[Dict]:
+        """Inverted hammer shape read as a bearish reversal"""
+        return self._detect(candles, index, 'shooting_star')
+    
+    # ==================== VECTORIZED DETECTORS ====================
+    
+    def _pattern_matrix(self, o: np.ndarray, h: np.ndarray,
+                        l: np.ndarray, c: np.ndarray) -> np.ndarray:
         """
-        Detect Hammer pattern (bullish)
+        Evaluate every pattern over full OHLC columns
+        
+        Args:
+            o, h, l, c: Open/high/low/close float arrays of equal length
         
-        Pattern: Small body at top, long lower shadow, minimal upper shadow
-        Signal: Bullish reversal at support
+        Returns:
+            (N, len(PATTERN_SPECS)) bool matrix; column k is PATTERN_SPECS[k]
+            completing on candle i
         """
-        if index < 0:
-            return None
+        if NUMBA_AVAILABLE:
+            return pattern_matrix(*(np.ascontiguousarray(column, dtype=np.float64) for column in (o, h, l, c)))
         
-        candle = candles[index]
+        # The plain-Python kernel indexes Python floats much faster than NumPy scalars
+        return pattern_matrix(o.tolist(), h.tolist(), l.tolist(), c.tolist())
+    
+    def _materialize_pattern(self, candles: Union[List[Dict], OHLCFrame], index: int, k: int) -> Dict:
+        """Build the pattern dictionary for PATTERN_SPECS[k] completing at index"""
+        name, direction, confidence, span, high_offsets, low_offsets = PATTERN_SPECS[k]
         
-        body_size = self._get_body_size(candle)
-        lower_shadow = self._get_lower_shadow(candle)
-        upper_shadow = self._get_upper_shadow(candle)
-        total_range = candle['high'] - candle['low']
+        if isinstance(candles, OHLCFrame):
+            involved = candles.to_dicts(index - span + 1, index + 1)
+            pattern_high = max(float(candles.h[index - j]) for j in high_offsets)
+            pattern_low = min(float(candles.l[index - j]) for j in low_offsets)
+        else:
+            involved = candles[index - span + 1:index + 1]
+            pattern_high = max(candles[index - j]['high'] for j in high_offsets)
+            pattern_low = min(candles[index - j]['low'] for j in low_offsets)
         
-        # Lower shadow at least 2x body size
-        # Upper shadow very small
-        # Body in upper part of range
-        if (lower_shadow >= body_size * 2 and 
-            upper_shadow < body_size * 0.3 and
-            body_size / total_range < 0.3):
-            
-            return {
-                'detected': True,
-                'pattern_name': 'hammer',
-                'direction': 'bullish',
-                'confidence': 0.70,
-                'candles_involved': [candle],
-                'pattern_high': candle['high'],
-                'pattern_low': candle['low']
-            }
-        
-        return None
+        return {
+            'detected': True,
+            'pattern_name': name,
+            'direction': direction,
+            'confidence': confidence,
+            'candles_involved': involved,
+            'pattern_high': pattern_high,
+            'pattern_low': pattern_low
+        }
     
-    def detect_inverted_hammer(self, candles: List[Dict], index: int) -> Optional[Dict]:
-        """
-        Detect Inverted Hammer pattern (bullish)
+    @staticmethod
+    def _ohlc_columns(data: Union[pd.DataFrame, OHLCFrame]) -> Tuple[np.ndarray, ...]:
+        """Float64 (open, high, low, close) columns; zero-copy for float64 inputs"""
+        if isinstance(data, OHLCFrame):
+            return data.o, data.h, data.l, data.c
         
-        Pattern: Small body at bottom, long upper shadow, minimal lower shadow
-        Signal: Potential bullish reversal
+        return tuple(
+            data[name].to_numpy(dtype=np.float64, copy=False)
+            for name in ('open', 'high', 'low', 'close')
+        )
+    
+    def scan_dataframe(self, df: Union[pd.DataFrame, OHLCFrame]) -> pd.DataFrame:
         """
-        if index < 0:
-            return None
+        Scan a full OHLC DataFrame for all patterns in one vectorized pass
         
-        candle = candles[index]
+        Args:
+            df: DataFrame with 'open', 'high', 'low', 'close' columns, or OHLCFrame
         
-        body_size = self._get_body_size(candle)
-        lower_shadow = self._get_lower_shadow(candle)
-        upper_shadow = self._get_upper_shadow(candle)
-        total_range = candle['high'] - candle['low']
+        Returns:
+            DataFrame with one row per detection (index, pattern_name, direction,
+            confidence, pattern_high, pattern_low), ordered by candle then scan order
+        """
+        o, h, l, c = self._ohlc_columns(df)
+        matrix = self._pattern_matrix(o, h, l, c)
+        
+        frames = []
+        for k, (name, direction, confidence, _span, high_offsets, low_offsets) in enumerate(PATTERN_SPECS):
+            idx = np.flatnonzero(matrix[:, k])
+            if not len(idx):
+                continue
+            frames.append(pd.DataFrame({
+                'index': idx,
+                'pattern_name': name,
+                'direction': direction,
+                'confidence': confidence,
+                'pattern_high': np.max([h[idx - k] for k in high_offsets], axis=0),
+                'pattern_low': np.min([l[idx - k] for k in low_offsets], axis=0)
+            }))
+        
+        columns = ['index', 'pattern_name', 'direction', 'confidence', 'pattern_high', 'pattern_low']
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        
+        detections = pd.concat(frames, ignore_index=True)
+        # Stable sort keeps scan order for patterns completing on the same candle
+        return detections.sort_values('index', kind='mergesort').reset_index(drop=True)
+    
+    def scan_best_patterns(self, df: Union[pd.DataFrame, OHLCFrame]) -> np.ndarray:
+        """
+        Find the highest confidence pattern on every candle of an OHLC DataFrame
         
-        # Upper shadow at least 2x body size
-        # Lower shadow very small
-        # Body in lower part of range
-        if (upper_shadow >= body_size * 2 and 
-            lower_shadow < body_size * 0.3 and
-            body_size / total_range < 0.3):
-            
-            return {
-                'detected': True,
-                'pattern_name': 'inverted_hammer',
-                'direction': 'bullish',
-                'confidence': 0.65,
-                'candles_involved': [candle],
-                'pattern_high': candle['high'],
-                'pattern_low': candle['low']
-            }
-        
-        return None
-    
-    def detect_hanging_man(self, candles: List[Dict], index: int) -> Optional[Dict]:
-        """
-        Detect Hanging Man pattern (bearish)
+        Args:
+            df: DataFrame with 'open', 'high', 'low', 'close' columns, or OHLCFrame
         
-        Pattern: Small body at top, long lower shadow (same as hammer but in uptrend)
-        Signal: Bearish reversal at resistance
+        Returns:
+            PATTERN_DTYPE array with one record per candle that has a pattern;
+            pattern_id indexes PATTERN_SPECS
         """
-        if index < 0:
-            return None
-        
-        candle = candles[index]
+        matrix = self._pattern_matrix(*self._ohlc_columns(df))
         
-        body_size = self._get_body_size(candle)
-        lower_shadow = self._get_lower_shadow(candle)
-        upper_shadow = self._get_upper_shadow(candle)
-        total_range = candle['high'] - candle['low']
+        rows = np.flatnonzero(matrix.any(axis=1))
+        scores = np.where(matrix[rows], _PATTERN_CONFIDENCE, -1.0)
+        # argmax returns the first maximum, matching scan-order tie breaking
+        best = scores.argmax(axis=1)
         
-        if (lower_shadow >= body_size * 2 and 
-            upper_shadow < body_size * 0.3 and
-            body_size / total_range < 0.3):
-            
-            return {
-                'detected': True,
-                'pattern_name': 'hanging_man',
-                'direction': 'bearish',
-                'confidence': 0.70,
-                'candles_involved': [candle],
-                'pattern_high': candle['high'],
-                'pattern_low': candle['low']
-            }
-        
-        return None
+        result = np.empty(len(rows), dtype=PATTERN_DTYPE)
+        result['index'] = rows
+        result['pattern_id'] = best
+        result['confidence'] = _PATTERN_CONFIDENCE[best]
+        return result
     
-    def detect_shooting_star(self, candles: List[Dict], index: int) -> Optional[Dict]:
+    def scan_all_patterns_range(self, candles: Union[List[Dict], OHLCFrame],
+                                start: int = 0, end: Optional[int] = None) -> np.ndarray:
         """
-        Detect Shooting Star pattern (bearish)
+        Evaluate every pattern on candles[start:end] in one vectorized pass
         
-        Pattern: Small body at bottom, long upper shadow (same as inverted hammer but in uptrend)
-        Signal: Bearish reversal at resistance
-        """
-        if index < 0:
-            return None
+        Args:
+            candles: List of OHLC candles or OHLCFrame
+            start: First index to scan
+            end: Index after the last one to scan (defaults to len(candles))
         
-        candle = candles[index]
+        Returns:
+            (end - start, len(PATTERN_SPECS)) bool matrix; row i is the
+            scan_all_patterns hit set at index start + i
+        """
+        frame = as_frame(candles)
+        start, end, _ = slice(start, end).indices(len(frame))
+        end = max(start, end)
         
-        body_size = self._get_body_size(candle)
-        lower_shadow = self._get_lower_shadow(candle)
-        upper_shadow = self._get_upper_shadow(candle)
-        total_range = candle['high'] - candle['low']
+        # Include the two preceding candles so three-candle patterns at start are seen
+        lead = min(start, 2)
+        window = slice(start - lead, end)
+        matrix = self._pattern_matrix(frame.o[window], frame.h[window], frame.l[window], frame.c[window])
         
-        if (upper_shadow >= body_size * 2 and 
-            lower_shadow < body_size * 0.3 and
-            body_size / total_range < 0.3):
-            
-            return {
-                'detected': True,
-                'pattern_name': 'shooting_star',
-                'direction': 'bearish',
-                'confidence': 0.70,
-                'candles_involved': [candle],
-                'pattern_high': candle['high'],
-                'pattern_low': candle['low']
-            }
-        
-        return None
+        return matrix[lead:]
     
     # ==================== PATTERN SCANNING ====================
     
-    def scan_all_patterns(self, candles: List[Dict], index: int) -> List[Dict]:
+    def scan_all_patterns(self, candles: Union[List[Dict], OHLCFrame], index: int,
+                          direction: Optional[str] = None, min_confidence: float = 0.0) -> List[Dict]:
         """
         Scan for all pattern types at given index
         
         Args:
-            candles: List of OHLC candles
+            candles: List of OHLC candles or OHLCFrame
             index: Index to scan for patterns
+            direction: Only return 'bullish' or 'bearish' patterns (default all)
+            min_confidence: Only return patterns with at least this confidence
         
         Returns:
             List of detected patterns
         """
-        detected_patterns = []
-        
-        # Two-candle patterns
-        two_candle_detectors = [
-            self.detect_bullish_engulfing,
-            self.detect_bearish_engulfing,
-            self.detect_piercing_line,
-            self.detect_dark_cloud_cover,
-            self.detect_bullish_harami,
-            self.detect_bearish_harami,
-            self.detect_tweezer_bottom,
-            self.detect_tweezer_top
-        ]
+        flags = self._flags_at(candles, index)
         
-        # Three-candle patterns
-        three_candle_detectors = [
-            self.detect_morning_star,
-            self.detect_evening_star,
-            self.detect_three_white_soldiers,
-            self.detect_three_black_crows,
-            self.detect_three_outside_up,
-            self.detect_three_outside_down,
-            self.detect_abandoned_baby_bullish,
-            self.detect_abandoned_baby_bearish
+        return [
+            self._materialize_pattern(candles, index, k)
+            for k, hit in enumerate(flags)
+            if hit and (direction is None or PATTERN_SPECS[k][1] == direction)
+            and PATTERN_SPECS[k][2] >= min_confidence
         ]
+    
+    def _flags_at(self, candles: Union[List[Dict], OHLCFrame], index: int) -> List[bool]:
+        """Pattern hit flags (PATTERN_SPECS order) for the candle at index"""
+        if index < 0 or index >= len(candles):
+            return []
         
-        # Single-candle patterns
-        single_candle_detectors = [
-            self.detect_hammer,
-            self.detect_inverted_hammer,
-            self.detect_hanging_man,
-            self.detect_shooting_star
-        ]
+        try:
+            if NUMBA_AVAILABLE and isinstance(candles, OHLCFrame) and candles.c.dtype == np.float64:
+                # Compiled kernel reads the frame's columns in place
+                return pattern_flags_at(candles.o, candles.h, candles.l, candles.c, index).tolist()
+            
+            # Pack the (up to) three candles involved into float columns once
+            start = max(index - 2, 0)
+            if isinstance(candles, OHLCFrame):
+                rows = slice(start, index + 1)
+                columns = [column[rows].tolist() for column in (candles.o, candles.h, candles.l, candles.c)]
+            else:
+                window = candles[start:index + 1]
+                columns = [[candle[key] for candle in window] for key in ('open', 'high', 'low', 'close')]
+            
+            o, h, l, c = (_kernel_column(values) for values in columns)
+            return pattern_flags_at(o, h, l, c, index - start).tolist()
+        except Exception as e:
+            bot_logger.error(f"Pattern detection error: {str(e)}")
+            return []
+    
+    def find_best_pattern(self, candles: Union[List[Dict], OHLCFrame], index: int) -> Optional[Dict]:
+        """
+        Highest confidence pattern at index (first in scan order on ties), without logging
+        
+        Args:
+            candles: List of OHLC candles or OHLCFrame
+            index: Index to scan
         
-        # Run all detectors
-        for detector in two_candle_detectors + three_candle_detectors + single_candle_detectors:
-            try:
-                result = detector(candles, index)
-                if result and result.get('detected'):
-                    detected_patterns.append(result)
-            except Exception as e:
-                bot_logger.error(f"Pattern detection error in {detector.__name__}: {str(e)}")
+        Returns:
+            Pattern dictionary or None
+        """
+        flags = self._flags_at(candles, index)
         
-        return detected_patterns
+        # Only the winning pattern is materialized
+        best = next((k for k in _PATTERN_PRIORITY if flags[k]), None) if flags else None
+        
+        return self._materialize_pattern(candles, index, best) if best is not None else None
     
-    def get_best_pattern(self, candles: List[Dict], index: int) -> Optional[Dict]:
+    def get_best_pattern(self, candles: Union[List[Dict], OHLCFrame], index: int) -> Optional[Dict]:
         """
         Get the highest confidence pattern at given index
         
         Args:
-            candles: List of OHLC candles
+            candles: List of OHLC candles or OHLCFrame
             index: Index to scan
         
         Returns:
             Pattern with highest confidence or None
         """
-        patterns = self.scan_all_patterns(candles, index)
+        best_pattern = self.find_best_pattern(candles, index)
         
-        if not patterns:
+        if best_pattern is None:
             return None
         
-        # Sort by confidence and return best
-        best_pattern = max(patterns, key=lambda p: p['confidence'])
-        
         bot_logger.log_pattern_detection(
             best_pattern['pattern_name'],
             "symbol",  # Will be filled by caller
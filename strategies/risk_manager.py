@@ -1,12 +1,73 @@
 """
 Risk Management and Risk-Reward Ratio Calculator
 """
-from typing import Dict, List, Optional, Tuple
+import logging
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
 from config.settings import settings
-from config.constants import SIDE_BUY, SIDE_SELL
+from config.constants import SIDE_BUY, SIDE_SELL, PARTIAL_EXIT_PERCENTAGES
 from utils.logger import bot_logger
 
 
+# Placement failure reasons keyed by is_buy
+_STOP_LOSS_REASONS = {
+    True: "Stop loss must be below entry for long positions",
+    False: "Stop loss must be above entry for short positions"
+}
+_TARGET_REASONS = {
+    True: "Target must be above entry for long positions",
+    False: "Target must be below entry for short positions"
+}
+
+
+# ==================== CACHED PRICE MATH ====================
+
+@lru_cache(maxsize=4096)
+def _rr_ratio(entry_price: float, stop_loss: float, target_price: float) -> float:
+    """Reward/risk ratio for an (entry, SL, target) triple"""
+    risk = abs(entry_price - stop_loss)
+    
+    if risk == 0:
+        return 0.0
+    
+    return abs(target_price - entry_price) / risk
+
+
+@lru_cache(maxsize=4096)
+def _target_by_rr(entry_price: float, stop_loss: float, is_buy: bool, rr_ratio: float) -> float:
+    """Target price at rr_ratio times the entry/SL distance"""
+    reward = abs(entry_price - stop_loss) * rr_ratio
+    return entry_price + reward if is_buy else entry_price - reward
+
+
+# Exit fractions for all but the last target, per number of targets
+_EXIT_FRACTIONS = {
+    num_targets: np.array(percentages[:-1], dtype=np.float64) / 100
+    for num_targets, percentages in PARTIAL_EXIT_PERCENTAGES.items()
+}
+_EXIT_FRACTIONS_DEFAULT = np.empty(0, dtype=np.float64)
+
+
+@lru_cache(maxsize=64)
+def _exit_percentages(num_targets: int) -> Tuple[int, ...]:
+    """Exit percentage per target level; levels past the table exit 100%"""
+    percentages = tuple(PARTIAL_EXIT_PERCENTAGES.get(num_targets, [100])[:num_targets])
+    return percentages + (100,) * (num_targets - len(percentages))
+
+
+@lru_cache(maxsize=256)
+def _partial_exits(position_size: int, num_targets: int) -> Tuple[int, ...]:
+    """Contracts to exit at each target; the last target takes the remainder"""
+    fractions = _EXIT_FRACTIONS.get(num_targets, _EXIT_FRACTIONS_DEFAULT)
+    
+    # Every target but the last exits its share (at least 1 contract)
+    quantities = np.maximum(1, np.trunc(position_size * fractions)).astype(np.int64)
+    remaining_size = position_size - int(quantities.sum())
+    
+    return tuple(quantities.tolist()) + (remaining_size,)
+
+
 class RiskManager:
     """
     Risk management and RR ratio calculation for trade signals
@@ -20,6 +81,7 @@ class RiskManager:
             min_risk_reward: Minimum acceptable risk-reward ratio
         """
         self.min_risk_reward = min_risk_reward or settings.MIN_RISK_REWARD_RATIO
+        self._sl_fns: Dict[Tuple[bool, int], Callable[[float, float, float], float]] = {}
         bot_logger.info(f"Risk Manager initialized - Min RR: 1:{self.min_risk_reward}")
     
     def calculate_stop_loss(self, 
@@ -41,23 +103,48 @@ class RiskManager:
         Returns:
             Stop loss price
         """
-        # Calculate pip value (assuming price scale)
-        pip_value = entry_price * 0.0001 * stop_pips
+        stop_loss = self.build_sl_fn(side, stop_pips)(entry_price, pattern_high, pattern_low)
         
-        if side == SIDE_BUY:
-            # For long entries, SL below pattern low
-            stop_loss = pattern_low - pip_value
-        else:  # SIDE_SELL
-            # For short entries, SL above pattern high
-            stop_loss = pattern_high + pip_value
-        
-        bot_logger.debug(
-            f"Calculated SL: {stop_loss:.2f} for {side} entry at {entry_price:.2f} "
-            f"({stop_pips} pips beyond pattern)"
-        )
+        if bot_logger.isEnabledFor(logging.DEBUG):
+            bot_logger.debug(
+                "Calculated SL: %.2f for %s entry at %.2f (%s pips beyond pattern)",
+                stop_loss, side, entry_price, stop_pips
+            )
         
         return stop_loss
     
+    def build_sl_fn(self, side: str, stop_pips: int) -> Callable[[float, float, float], float]:
+        """
+        Get a stop loss function specialized for a side and pip distance
+        
+        Args:
+            side: 'buy' or 'sell'
+            stop_pips: Number of pips beyond pattern
+        
+        Returns:
+            Function (entry_price, pattern_high, pattern_low) -> stop loss price
+        """
+        is_buy = side == SIDE_BUY
+        key = (is_buy, stop_pips)
+        sl_fn = self._sl_fns.get(key)
+        
+        if sl_fn is None:
+            # Pip value as a fraction of entry price (assuming price scale)
+            pip_scale = 0.0001 * stop_pips
+            
+            if is_buy:
+                # For long entries, SL below pattern low
+                def sl_fn(entry_price, pattern_high, pattern_low):
+                    return pattern_low - entry_price * pip_scale
+            else:  # SIDE_SELL
+                # For short entries, SL above pattern high
+                def sl_fn(entry_price, pattern_high, pattern_low):
+                    return pattern_high + entry_price * pip_scale
+            
+            self._sl_fns[key] = sl_fn
+        
+        return sl_fn
+    
     def calculate_risk(self, entry_price: float, stop_loss: float) -> float:
         """
         Calculate risk amount per unit
@@ -88,15 +175,7 @@ class RiskManager:
         Returns:
             Target price
         """
-        risk = self.calculate_risk(entry_price, stop_loss)
-        reward = risk * rr_ratio
-        
-        if side == SIDE_BUY:
-            target = entry_price + reward
-        else:  # SIDE_SELL
-            target = entry_price - reward
-        
-        return target
+        return _target_by_rr(entry_price, stop_loss, side == SIDE_BUY, rr_ratio)
     
     def calculate_rr_ratio(self, 
                           entry_price: float, 
@@ -113,13 +192,13 @@ class RiskManager:
         Returns:
             Risk-reward ratio
         """
-        risk = abs(entry_price - stop_loss)
-        reward = abs(target_price - entry_price)
-        
-        if risk == 0:
-            return 0.0
-        
-        return reward / risk
+        return _rr_ratio(entry_price, stop_loss, target_price)
+    
+    def clear_cache(self):
+        """Clear memoized RR / target calculations"""
+        _rr_ratio.cache_clear()
+        _target_by_rr.cache_clear()
+        _partial_exits.cache_clear()
     
     def calculate_target_by_zone(self, 
                                 entry_price: float, 
@@ -169,46 +248,53 @@ class RiskManager:
         targets = []
         
         if target_type == 'rr' and target_levels:
-            # RR-based targets
-            from config.constants import PARTIAL_EXIT_PERCENTAGES
+            # RR-based targets: every level scales the same risk distance
+            sign = 1.0 if side == SIDE_BUY else -1.0
+            levels = np.asarray(target_levels, dtype=np.float64)
+            prices = entry_price + sign * abs(entry_price - stop_loss) * levels
+            exit_percentages = _exit_percentages(len(target_levels))
             
-            num_targets = len(target_levels)
-            exit_percentages = PARTIAL_EXIT_PERCENTAGES.get(num_targets, [100])
-            
-            for i, rr_level in enumerate(target_levels):
-                target_price = self.calculate_target_by_rr(
-                    entry_price, stop_loss, side, rr_level
-                )
-                
-                targets.append({
+            targets = [
+                {
                     'level': i + 1,
                     'type': 'rr',
                     'rr_ratio': rr_level,
                     'price': target_price,
-                    'exit_percentage': exit_percentages[i] if i < len(exit_percentages) else 100
-                })
+                    'exit_percentage': exit_percentage
+                }
+                for i, (rr_level, target_price, exit_percentage) in enumerate(
+                    zip(target_levels, prices.tolist(), exit_percentages)
+                )
+            ]
         
         elif target_type == 'zone' and vrz_zones:
-            # Zone-based targets
-            from config.constants import PARTIAL_EXIT_PERCENTAGES
+            # Zone-based targets: long targets resistance lower bounds,
+            # short targets support upper bounds
+            bound = 'zone_lower' if side == SIDE_BUY else 'zone_upper'
+            prices = np.array([zone[bound] for zone in vrz_zones], dtype=np.float64)
+            
+            # Calculate RR for every zone at once
+            risk = abs(entry_price - stop_loss)
+            if risk == 0:
+                rr_ratios = np.zeros(len(prices))
+            else:
+                rr_ratios = np.abs(prices - entry_price) / risk
             
-            num_targets = len(vrz_zones)
-            exit_percentages = PARTIAL_EXIT_PERCENTAGES.get(num_targets, [100])
+            exit_percentages = _exit_percentages(len(vrz_zones))
             
-            for i, zone in enumerate(vrz_zones):
-                target_price = self.calculate_target_by_zone(entry_price, side, zone)
-                
-                # Calculate RR for this zone
-                rr_ratio = self.calculate_rr_ratio(entry_price, stop_loss, target_price)
-                
-                targets.append({
+            targets = [
+                {
                     'level': i + 1,
                     'type': 'zone',
                     'zone_price': zone['price_level'],
                     'price': target_price,
                     'rr_ratio': rr_ratio,
-                    'exit_percentage': exit_percentages[i] if i < len(exit_percentages) else 100
-                })
+                    'exit_percentage': exit_percentage
+                }
+                for i, (zone, target_price, rr_ratio, exit_percentage) in enumerate(
+                    zip(vrz_zones, prices.tolist(), rr_ratios.tolist(), exit_percentages)
+                )
+            ]
         
         return targets
     
@@ -229,8 +315,18 @@ class RiskManager:
         Returns:
             Tuple of (is_valid, reason, rr_ratio)
         """
-        # Calculate RR ratio
-        rr_ratio = self.calculate_rr_ratio(entry_price, stop_loss, target_price)
+        # Signed risk/reward: sign folds long and short into one pair of
+        # comparisons, and both are positive for a correctly placed setup
+        is_buy = side == SIDE_BUY
+        sign = 1.0 if is_buy else -1.0
+        risk = (entry_price - stop_loss) * sign
+        reward = (target_price - entry_price) * sign
+        
+        # Calculate RR ratio (abs form only for misplaced setups)
+        if risk > 0 and reward > 0:
+            rr_ratio = reward / risk
+        else:
+            rr_ratio = self.calculate_rr_ratio(entry_price, stop_loss, target_price)
         
         # Check if RR meets minimum
         if rr_ratio < self.min_risk_reward:
@@ -240,20 +336,48 @@ class RiskManager:
                 rr_ratio
             )
         
-        # Validate stop loss placement
-        if side == SIDE_BUY:
-            if stop_loss >= entry_price:
-                return (False, "Stop loss must be below entry for long positions", rr_ratio)
-            if target_price <= entry_price:
-                return (False, "Target must be above entry for long positions", rr_ratio)
-        else:  # SIDE_SELL
-            if stop_loss <= entry_price:
-                return (False, "Stop loss must be above entry for short positions", rr_ratio)
-            if target_price >= entry_price:
-                return (False, "Target must be below entry for short positions", rr_ratio)
+        # Validate stop loss / target placement
+        if risk <= 0:
+            return (False, _STOP_LOSS_REASONS[is_buy], rr_ratio)
+        if reward <= 0:
+            return (False, _TARGET_REASONS[is_buy], rr_ratio)
         
         return (True, "Trade setup valid", rr_ratio)
     
+    def validate_batch(self,
+                       entries: Sequence[float],
+                       stop_losses: Sequence[float],
+                       targets: Sequence[float],
+                       sides: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Validate many trade setups at once (same rules as validate_trade_setup)
+        
+        Args:
+            entries: Entry prices
+            stop_losses: Stop loss prices
+            targets: Target prices
+            sides: 'buy' or 'sell' per setup
+        
+        Returns:
+            Tuple of (valid_mask, rr_ratios) arrays
+        """
+        entries = np.asarray(entries, dtype=np.float64)
+        stop_losses = np.asarray(stop_losses, dtype=np.float64)
+        targets = np.asarray(targets, dtype=np.float64)
+        sign = np.where(np.asarray(sides) == SIDE_BUY, 1.0, -1.0)
+        
+        risk = (entries - stop_losses) * sign
+        reward = (targets - entries) * sign
+        
+        abs_risk = np.abs(risk)
+        rr_ratios = np.divide(
+            np.abs(reward), abs_risk,
+            out=np.zeros_like(abs_risk), where=abs_risk != 0
+        )
+        
+        valid = (risk > 0) & (reward > 0) & (rr_ratios >= self.min_risk_reward)
+        return valid, rr_ratios
+    
     def calculate_position_size(self, 
                                account_balance: float, 
                                risk_percentage: float, 
@@ -285,11 +409,12 @@ class RiskManager:
         # Ensure at least 1 contract
         position_size = max(1, position_size)
         
-        bot_logger.debug(
-            f"Position Size Calculation: Balance={account_balance}, "
-            f"Risk%={risk_percentage}, Risk/Unit={risk_per_unit:.2f}, "
-            f"Size={position_size} contracts"
-        )
+        if bot_logger.isEnabledFor(logging.DEBUG):
+            bot_logger.debug(
+                "Position Size Calculation: Balance=%s, Risk%%=%s, Risk/Unit=%.2f, "
+                "Size=%s contracts",
+                account_balance, risk_percentage, risk_per_unit, position_size
+            )
         
         return position_size
     
@@ -306,24 +431,7 @@ class RiskManager:
         Returns:
             List of quantities to exit at each target
         """
-        from config.constants import PARTIAL_EXIT_PERCENTAGES
-        
-        percentages = PARTIAL_EXIT_PERCENTAGES.get(num_targets, [100])
-        exit_quantities = []
-        remaining_size = position_size
-        
-        for i, percentage in enumerate(percentages):
-            if i == len(percentages) - 1:
-                # Last target gets all remaining
-                exit_quantities.append(remaining_size)
-            else:
-                # Calculate quantity for this target
-                qty = int(position_size * (percentage / 100))
-                qty = max(1, qty)  # At least 1 contract
-                exit_quantities.append(qty)
-                remaining_size -= qty
-        
-        return exit_quantities
+        return list(_partial_exits(position_size, num_targets))
     
     def get_nearest_opposite_zone(self, 
                                  entry_price: float, 
@@ -340,19 +448,28 @@ class RiskManager:
         Returns:
             Nearest opposite zone or None
         """
+        if not vrz_zones:
+            return None
+        
+        # Columns: zone_lower, zone_upper, price_level
+        bounds = np.array(
+            [(z['zone_lower'], z['zone_upper'], z['price_level']) for z in vrz_zones],
+            dtype=np.float64
+        )
+        
         if side == SIDE_BUY:
             # For long, find nearest resistance above entry
-            valid_zones = [z for z in vrz_zones if z['zone_lower'] > entry_price]
+            candidates = np.flatnonzero(bounds[:, 0] > entry_price)
         else:  # SIDE_SELL
             # For short, find nearest support below entry
-            valid_zones = [z for z in vrz_zones if z['zone_upper'] < entry_price]
+            candidates = np.flatnonzero(bounds[:, 1] < entry_price)
         
-        if not valid_zones:
+        if not len(candidates):
             return None
         
-        # Sort by distance and return nearest
-        valid_zones.sort(key=lambda z: abs(z['price_level'] - entry_price))
-        return valid_zones[0]
+        # argmin picks the first of equally distant zones, as a stable sort would
+        nearest = np.argmin(np.abs(bounds[candidates, 2] - entry_price))
+        return vrz_zones[candidates[nearest]]
     
     def format_risk_summary(self, 
                            entry_price: float, 
@@ -376,24 +493,31 @@ class RiskManager:
         risk = self.calculate_risk(entry_price, stop_loss)
         risk_percentage = (risk / entry_price) * 100
         
-        summary = f"\n{'='*50}\n"
-        summary += f"RISK MANAGEMENT SUMMARY\n"
-        summary += f"{'='*50}\n"
-        summary += f"Side: {side.upper()}\n"
-        summary += f"Entry Price: {entry_price:.2f}\n"
-        summary += f"Stop Loss: {stop_loss:.2f}\n"
-        summary += f"Risk per Unit: {risk:.2f} ({risk_percentage:.2f}%)\n"
-        summary += f"Position Size: {position_size} contracts\n"
-        summary += f"\nTargets:\n"
-        
-        for target in targets:
-            summary += f"  T{target['level']}: {target['price']:.2f} "
-            summary += f"(RR: 1:{target['rr_ratio']:.2f}, "
-            summary += f"Exit: {target['exit_percentage']}%)\n"
+        separator = '=' * 50
+        lines = [
+            "",
+            separator,
+            "RISK MANAGEMENT SUMMARY",
+            separator,
+            f"Side: {side.upper()}",
+            f"Entry Price: {entry_price:.2f}",
+            f"Stop Loss: {stop_loss:.2f}",
+            f"Risk per Unit: {risk:.2f} ({risk_percentage:.2f}%)",
+            f"Position Size: {position_size} contracts",
+            "",
+            "Targets:"
+        ]
+        
+        lines.extend(
+            f"  T{target['level']}: {target['price']:.2f} "
+            f"(RR: 1:{target['rr_ratio']:.2f}, Exit: {target['exit_percentage']}%)"
+            for target in targets
+        )
         
-        summary += f"{'='*50}\n"
+        lines.append(separator)
+        lines.append("")
         
-        return summary
+        return "\n".join(lines)
 
 
 # Global risk manager instance
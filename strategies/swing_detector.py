@@ -1,8 +1,88 @@
 """
 Swing high/low detection for VRZ calculation
 """
-from typing import List, Tuple, Dict
+from dataclasses import dataclass, field
+from typing import List, Tuple, Dict, Union
+import numpy as np
+from strategies._swing_kernels import scan_swings
+from utils.jit import NUMBA_AVAILABLE
 from utils.logger import bot_logger
+from utils.ohlc import CandleListCache, OHLCFrame, as_frame
+
+try:
+    # Optional Cython build of the pivot kernel (see strategies/_swing.pyx)
+    from strategies._swing import scan_swings as _compiled_scan_swings
+except ImportError:
+    _compiled_scan_swings = scan_swings if NUMBA_AVAILABLE else None
+
+
+# Swing pivot records returned by SwingDetector.detect_swing_arrays
+SWING_DTYPE = np.dtype([('price', 'f8'), ('index', 'i8'), ('timestamp', 'i8')])
+
+# Candle lists with incremental swing results kept per detector
+_SWING_CACHE_SIZE = 8
+
+
+@dataclass
+class SwingDetectorState:
+    """Last candle window and its swings for one polled candle stream"""
+    
+    times: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    highs: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    lows: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    swing_highs: List[Dict] = field(default_factory=list)
+    swing_lows: List[Dict] = field(default_factory=list)
+
+
+def swings_to_dicts(swings: np.ndarray) -> List[Dict]:
+    """
+    Convert SWING_DTYPE records to swing dictionaries
+    
+    Args:
+        swings: SWING_DTYPE array
+    
+    Returns:
+        List of {'price', 'index', 'timestamp'} dicts with Python scalars
+    """
+    return [
+        {'price': price, 'index': index, 'timestamp': timestamp}
+        for price, index, timestamp in swings.tolist()
+    ]
+
+
+def _price_array(values: np.ndarray) -> np.ndarray:
+    """Contiguous float32/float64 view of values for the compiled kernels"""
+    values = np.asarray(values)
+    if values.dtype not in (np.float32, np.float64):
+        values = values.astype(np.float64)
+    return np.ascontiguousarray(values)
+
+
+def _sliding_max(values: np.ndarray, width: int) -> np.ndarray:
+    """
+    Running maximum over every window of `width` consecutive values
+    
+    Uses the van Herk/Gil-Werman block prefix/suffix sweep, so the cost is
+    O(N) regardless of window width.
+    
+    Args:
+        values: 1-D float array (len >= width >= 1)
+        width: Window width
+    
+    Returns:
+        Array of len(values) - width + 1 maxima; entry j covers values[j:j + width]
+    """
+    n = len(values)
+    blocks = -(-n // width)
+    padded = np.full(blocks * width, -np.inf, dtype=values.dtype)
+    padded[:n] = values
+    padded = padded.reshape(blocks, width)
+    
+    prefix = np.maximum.accumulate(padded, axis=1).ravel()
+    suffix = np.maximum.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    
+    count = n - width + 1
+    return np.maximum(suffix[:count], prefix[width - 1:width - 1 + count])
 
 
 class SwingDetector:
@@ -18,8 +98,10 @@ class SwingDetector:
         """
         self.left_bars = left_bars
         self.right_bars = right_bars
+        # Candle list (+ left_bars, right_bars) -> (swing_highs, swing_lows)
+        self._cache = CandleListCache(_SWING_CACHE_SIZE)
     
-    def is_valid_swing_high(self, candles: List[Dict], index: int) -> Tuple[bool, float, int]:
+    def is_valid_swing_high(self, candles: Union[List[Dict], OHLCFrame], index: int) -> Tuple[bool, float, int]:
         """
         Check if candle at index is a valid swing high (resistance)
         
@@ -29,31 +111,30 @@ class SwingDetector:
         - Represents a lower high in downtrend
         
         Args:
-            candles: List of OHLC candles
+            candles: List of OHLC candles or OHLCFrame
             index: Index to check for swing high
         
         Returns:
             Tuple of (is_valid, price_level, bar_index)
         """
+        frame = as_frame(candles)
+        
         # Check boundaries
-        if index < self.left_bars or index >= len(candles) - self.right_bars:
+        if index < self.left_bars or index >= len(frame) - self.right_bars:
             return (False, 0.0, index)
         
-        pivot_high = candles[index]['high']
-        
-        # Check left bars - no high should exceed pivot
-        for i in range(index - self.left_bars, index):
-            if candles[i]['high'] >= pivot_high:
-                return (False, 0.0, index)
+        values = frame.h
+        pivot_high = values[index]
         
-        # Check right bars - no high should exceed pivot
-        for i in range(index + 1, index + self.right_bars + 1):
-            if candles[i]['high'] >= pivot_high:
-                return (False, 0.0, index)
+        # Check left and right bars - no high should exceed pivot
+        if (values[index - self.left_bars:index] >= pivot_high).any():
+            return (False, 0.0, index)
+        if (values[index + 1:index + self.right_bars + 1] >= pivot_high).any():
+            return (False, 0.0, index)
         
-        return (True, pivot_high, index)
+        return (True, float(pivot_high), index)
     
-    def is_valid_swing_low(self, candles: List[Dict], index: int) -> Tuple[bool, float, int]:
+    def is_valid_swing_low(self, candles: Union[List[Dict], OHLCFrame], index: int) -> Tuple[bool, float, int]:
         """
         Check if candle at index is a valid swing low (support)
         
@@ -63,66 +144,119 @@ class SwingDetector:
         - Represents a higher low in uptrend
         
         Args:
-            candles: List of OHLC candles
+            candles: List of OHLC candles or OHLCFrame
             index: Index to check for swing low
         
         Returns:
             Tuple of (is_valid, price_level, bar_index)
         """
+        frame = as_frame(candles)
+        
         # Check boundaries
-        if index < self.left_bars or index >= len(candles) - self.right_bars:
+        if index < self.left_bars or index >= len(frame) - self.right_bars:
             return (False, 0.0, index)
         
-        pivot_low = candles[index]['low']
+        values = frame.l
+        pivot_low = values[index]
         
-        # Check left bars - no low should be below pivot
-        for i in range(index - self.left_bars, index):
-            if candles[i]['low'] <= pivot_low:
-                return (False, 0.0, index)
+        # Check left and right bars - no low should be below pivot
+        if (values[index - self.left_bars:index] <= pivot_low).any():
+            return (False, 0.0, index)
+        if (values[index + 1:index + self.right_bars + 1] <= pivot_low).any():
+            return (False, 0.0, index)
+        
+        return (True, float(pivot_low), index)
+    
+    def _strict_pivots(self, values: np.ndarray) -> np.ndarray:
+        """
+        Find indices whose value strictly exceeds every value within
+        left_bars before and right_bars after (same rule as is_valid_swing_high)
         
-        # Check right bars - no low should be below pivot
-        for i in range(index + 1, index + self.right_bars + 1):
-            if candles[i]['low'] <= pivot_low:
-                return (False, 0.0, index)
+        Args:
+            values: Price array (pass negated lows to find swing lows)
+        
+        Returns:
+            Sorted array of pivot indices
+        """
+        left, right = self.left_bars, self.right_bars
+        window = left + right + 1
+        
+        if len(values) < window:
+            return np.empty(0, dtype=np.int64)
+        
+        # Candidates are values[left : n - right]; compare each against the
+        # running max of the bars before and after it
+        n = len(values)
+        center = values[left:n - right]
+        is_pivot = np.ones(len(center), dtype=bool)
+        
+        if left:
+            is_pivot &= center > _sliding_max(values, left)[:n - right - left]
+        if right:
+            is_pivot &= center > _sliding_max(values, right)[left + 1:]
+        
+        return np.flatnonzero(is_pivot) + left
+    
+    def _pivot_indices(self, highs: np.ndarray, lows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Swing high and swing low indices using the fastest available kernel"""
+        if _compiled_scan_swings is not None:
+            return _compiled_scan_swings(
+                _price_array(highs), _price_array(lows),
+                self.left_bars, self.right_bars
+            )
         
-        return (True, pivot_low, index)
+        return self._strict_pivots(highs), self._strict_pivots(-lows)
     
-    def detect_all_swings(self, candles: List[Dict]) -> Dict[str, List[Dict]]:
+    def _swings_from_columns(self, highs: np.ndarray, lows: np.ndarray, times: np.ndarray,
+                             offset: int = 0) -> Tuple[List[Dict], List[Dict]]:
         """
-        Detect all swing highs and lows in candle data
+        Build swing high/low dictionaries from column arrays
+        
+        Args:
+            highs: Candle highs
+            lows: Candle lows
+            times: Candle timestamps
+            offset: Candle index of the first array element
+        
+        Returns:
+            Tuple of (swing_highs, swing_lows) lists
+        """
+        high_idx, low_idx = self._pivot_indices(highs, lows)
+        
+        return (
+            self._swing_dicts(highs, high_idx, times, offset),
+            self._swing_dicts(lows, low_idx, times, offset)
+        )
+    
+    @staticmethod
+    def _swing_dicts(values: np.ndarray, indices: np.ndarray, times: np.ndarray,
+                     offset: int = 0) -> List[Dict]:
+        """Swing dictionaries for the pivots at indices (shifted by offset)"""
+        return [
+            {'price': price, 'index': index + offset, 'timestamp': timestamp}
+            for price, index, timestamp in zip(
+                values[indices].tolist(), indices.tolist(), times[indices].tolist()
+            )
+        ]
+    
+    def detect_all_swings_np(self, highs: np.ndarray, lows: np.ndarray,
+                             times: np.ndarray) -> Dict[str, List[Dict]]:
+        """
+        Detect all swing highs and lows from OHLC column arrays
         
         Args:
-            candles: List of OHLC candles
+            highs: Candle highs
+            lows: Candle lows
+            times: Candle timestamps
         
         Returns:
             Dictionary with 'resistance_zones' and 'support_zones' lists
         """
-        swing_highs = []
-        swing_lows = []
-        
-        # Iterate through valid range
-        for i in range(self.left_bars, len(candles) - self.right_bars):
-            # Check for swing high
-            is_high, high_price, high_idx = self.is_valid_swing_high(candles, i)
-            if is_high:
-                swing_highs.append({
-                    'price': high_price,
-                    'index': high_idx,
-                    'timestamp': candles[i]['time']
-                })
-            
-            # Check for swing low
-            is_low, low_price, low_idx = self.is_valid_swing_low(candles, i)
-            if is_low:
-                swing_lows.append({
-                    'price': low_price,
-                    'index': low_idx,
-                    'timestamp': candles[i]['time']
-                })
+        swing_highs, swing_lows = self._swings_from_columns(highs, lows, times)
         
         bot_logger.debug(
-            f"Swing Detection Complete: {len(swing_highs)} resistance zones, "
-            f"{len(swing_lows)} support zones detected"
+            "Swing Detection Complete: %d resistance zones, %d support zones detected",
+            len(swing_highs), len(swing_lows)
         )
         
         return {
@@ -130,12 +264,153 @@ class SwingDetector:
             'support_zones': swing_lows
         }
     
-    def get_recent_swings(self, candles: List[Dict], count: int = 5) -> Dict[str, List[Dict]]:
+    def detect_all_swings(self, candles: Union[List[Dict], OHLCFrame]) -> Dict[str, List[Dict]]:
+        """
+        Detect all swing highs and lows in candle data
+        
+        Args:
+            candles: List of OHLC candles or OHLCFrame
+        
+        Returns:
+            Dictionary with 'resistance_zones' and 'support_zones' lists
+        """
+        if isinstance(candles, OHLCFrame):
+            return self.detect_all_swings_np(candles.h, candles.l, candles.time)
+        
+        left, right = self.left_bars, self.right_bars
+        count = len(candles)
+        key = (left, right)
+        cached = self._cache.get(candles, key)
+        
+        # Candle lists only grow by appending; a list seen before with its
+        # last scanned candle unchanged only needs the new tail scanned
+        if cached is not None:
+            scanned, (swing_highs, swing_lows) = cached
+            
+            if scanned < count:
+                # Pivots below scanned - right_bars were already confirmed
+                start = max(left, scanned - right) - left
+                tail = candles[start:]
+                new_highs, new_lows = self._swings_from_columns(
+                    np.fromiter((c['high'] for c in tail), dtype=np.float64, count=len(tail)),
+                    np.fromiter((c['low'] for c in tail), dtype=np.float64, count=len(tail)),
+                    np.array([c['time'] for c in tail]),
+                    offset=start
+                )
+                swing_highs = swing_highs + new_highs
+                swing_lows = swing_lows + new_lows
+            
+            bot_logger.debug(
+                "Swing Detection Complete: %d resistance zones, %d support zones detected",
+                len(swing_highs), len(swing_lows)
+            )
+        else:
+            frame = as_frame(candles)
+            swings = self.detect_all_swings_np(frame.h, frame.l, frame.time)
+            swing_highs, swing_lows = swings['resistance_zones'], swings['support_zones']
+        
+        self._cache.put(candles, (swing_highs, swing_lows), key)
+        
+        return {
+            'resistance_zones': list(swing_highs),
+            'support_zones': list(swing_lows)
+        }
+    
+    def detect_incremental(self, state: SwingDetectorState,
+                           candles: Union[List[Dict], OHLCFrame]) -> Dict[str, List[Dict]]:
+        """
+        Detect swings in a sliding candle window, reusing the previous poll
+        
+        Gives the same result as detect_all_swings(candles). Pivots whose whole
+        left/right neighbourhood matches the previous window (same times,
+        highs and lows) are carried over; only the bars after that, which
+        include new and still-forming candles, are scanned.
+        
+        Args:
+            state: State of this candle stream, updated in place
+            candles: Current candle window in ascending time order
+        
+        Returns:
+            Dictionary with 'resistance_zones' and 'support_zones' lists
+        """
+        frame = as_frame(candles)
+        left, right = self.left_bars, self.right_bars
+        count = len(frame)
+        times = frame.time.astype(np.int64)
+        
+        # Align the previous window on this window's first candle and find
+        # how many leading candles are unchanged
+        shift = int(np.searchsorted(state.times, times[0])) if count else 0
+        stable = 0
+        if count and shift < len(state.times) and state.times[shift] == times[0]:
+            overlap = min(len(state.times) - shift, count)
+            same = ((state.times[shift:shift + overlap] == times[:overlap])
+                    & (state.highs[shift:shift + overlap] == frame.h[:overlap])
+                    & (state.lows[shift:shift + overlap] == frame.l[:overlap]))
+            stable = overlap if same.all() else int(same.argmin())
+        
+        # Pivots confirmed before rescan_from only look at stable candles
+        rescan_from = max(left, stable - right)
+        
+        def carried(swings: List[Dict]) -> List[Dict]:
+            return [
+                dict(swing, index=swing['index'] - shift) for swing in swings
+                if left <= swing['index'] - shift < rescan_from
+            ]
+        
+        start = rescan_from - left
+        new_highs, new_lows = self._swings_from_columns(
+            frame.h[start:], frame.l[start:], frame.time[start:], offset=start
+        )
+        
+        state.swing_highs = carried(state.swing_highs) + new_highs
+        state.swing_lows = carried(state.swing_lows) + new_lows
+        state.times, state.highs, state.lows = times, frame.h, frame.l
+        
+        bot_logger.debug(
+            "Swing Detection Complete: %d resistance zones, %d support zones detected",
+            len(state.swing_highs), len(state.swing_lows)
+        )
+        
+        return {
+            'resistance_zones': list(state.swing_highs),
+            'support_zones': list(state.swing_lows)
+        }
+    
+    def detect_swing_arrays(self, candles: Union[List[Dict], OHLCFrame]) -> Dict[str, np.ndarray]:
+        """
+        Detect all swing highs and lows as structured arrays
+        
+        Avoids a dict per pivot; use swings_to_dicts() where dictionaries
+        are needed.
+        
+        Args:
+            candles: List of OHLC candles or OHLCFrame
+        
+        Returns:
+            Dictionary with 'resistance_zones' and 'support_zones' SWING_DTYPE arrays
+        """
+        frame = as_frame(candles)
+        high_idx, low_idx = self._pivot_indices(frame.h, frame.l)
+        
+        def records(values: np.ndarray, indices: np.ndarray) -> np.ndarray:
+            swings = np.empty(len(indices), dtype=SWING_DTYPE)
+            swings['price'] = values[indices]
+            swings['index'] = indices
+            swings['timestamp'] = frame.time[indices]
+            return swings
+        
+        return {
+            'resistance_zones': records(frame.h, high_idx),
+            'support_zones': records(frame.l, low_idx)
+        }
+    
+    def get_recent_swings(self, candles: Union[List[Dict], OHLCFrame], count: int = 5) -> Dict[str, List[Dict]]:
         """
         Get most recent swing highs and lows
         
         Args:
-            candles: List of OHLC candles
+            candles: List of OHLC candles or OHLCFrame
             count: Number of recent swings to return
         
         Returns:
@@ -1,20 +1,85 @@
 """
 VRZ (Value Rejection Zone) Calculator for Support/Resistance Detection
 """
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta
+from collections import deque
+from typing import List, Dict, Optional, Tuple
+import asyncio
 import time
+import numpy as np
 from config.settings import settings
 from config.constants import ZONE_TYPE_RESISTANCE, ZONE_TYPE_SUPPORT
-from strategies.swing_detector import SwingDetector
+from strategies.swing_detector import SwingDetector, SwingDetectorState
+from strategies._vrz_kernels import compute_zone_bounds
 from database.models import VRZZone
 from database.repositories.vrz_repository import vrz_repository
 from api.delta_client import delta_client
+from utils.jit import NUMBA_AVAILABLE
 from utils.logger import bot_logger
+from utils.ohlc import resample_candles
 from utils.timeframe_converter import TimeframeConverter
 from utils.timezone_helper import TimezoneHelper
 
 
+# Identical candle requests within this many seconds (and the same bar)
+# are served from memory; the forming bar keeps changing, so keep it short
+CANDLE_CACHE_TTL_SECONDS = 5
+
+# (symbol, timeframe, bars) -> (bar_bucket, fetched_at seconds, candles),
+# shared by every calculator so users scanning the same symbol reuse a fetch
+_CANDLE_CACHE: Dict[Tuple[str, str, int], Tuple[int, float, List[Dict]]] = {}
+
+# Lookback of the base and entry timeframe zone calculations, in bars
+BASE_VRZ_BARS = 150
+ENTRY_VRZ_BARS = 200
+
+# Largest single candle request used when deriving base candles from the
+# trading timeframe (the exchange caps candles per history request)
+MAX_FUSED_FETCH_BARS = 2000
+
+# Base timeframes above this are not aligned to epoch multiples by the
+# exchange (weeks, months), so they are never resampled locally
+MAX_RESAMPLE_SECONDS = 86400
+
+# Entry timeframe zone results kept per (symbol, product, bar)
+ENTRY_ZONE_MEMO_SIZE = 512
+
+# How many recently stored zone keys update_zones_continuous remembers
+RECENT_ZONE_KEYS_SIZE = 512
+
+
+def zones_to_array(zones: List[Dict]) -> np.ndarray:
+    """
+    Pack zone dictionaries into an (N, 3) [price_level, zone_lower, zone_upper] array
+    
+    Args:
+        zones: VRZ zone dictionaries
+    
+    Returns:
+        float64 array with one row per zone
+    """
+    arr = np.empty((len(zones), 3), dtype=np.float64)
+    for row, zone in enumerate(zones):
+        arr[row] = (zone['price_level'], zone['zone_lower'], zone['zone_upper'])
+    return arr
+
+
+def is_prices_near_zones(prices, zones_arr: np.ndarray, proximity_percent: float = 0.5) -> np.ndarray:
+    """
+    Vectorized is_price_near_zone over many zones (and optionally many prices)
+    
+    Args:
+        prices: Price scalar or 1-D array of prices
+        zones_arr: (N, 3) array from zones_to_array
+        proximity_percent: Additional proximity buffer percentage
+    
+    Returns:
+        Boolean mask of shape (N,) for a scalar price, (M, N) for M prices
+    """
+    prices = np.asarray(prices, dtype=np.float64)[..., None]
+    proximity_buffer = zones_arr[:, 0] * (proximity_percent / 100)
+    return (zones_arr[:, 1] - proximity_buffer <= prices) & (prices <= zones_arr[:, 2] + proximity_buffer)
+
+
 class VRZCalculator:
     """
     VRZ Support/Resistance Zone Calculator using Multi-Timeframe Analysis
@@ -46,35 +111,69 @@ class VRZCalculator:
             self.base_timeframe = base_timeframe
         
         self.buffer_percent = buffer_percent or settings.VRZ_BUFFER_PERCENT
+        self._buffer_ratio = self.buffer_percent / 100
+        
+        # Bar lengths for the timeframes this calculator fetches
+        self._tf_seconds = {
+            tf: TimeframeConverter.timeframe_to_seconds(tf)
+            for tf in (self.base_timeframe, self.trading_timeframe)
+        }
         
         # Initialize swing detector
         left_bars = swing_left_bars or settings.DEFAULT_SWING_LEFT_BARS
         right_bars = swing_right_bars or settings.DEFAULT_SWING_RIGHT_BARS
         self.swing_detector = SwingDetector(left_bars, right_bars)
         
+        # (symbol, timeframe, swing timestamp, type) of zones stored by the
+        # background task; the deque evicts the oldest keys from the set
+        self._recent_zone_keys: set = set()
+        self._recent_zone_keys_fifo: deque = deque()
+        
+        # (symbol, product_id, trading bar) -> entry timeframe zones, oldest first
+        self._entry_zone_memo: Dict[Tuple[str, int, int], Dict[str, List[Dict]]] = {}
+        
+        # Per-symbol swing state of the background task's polled window
+        self._swing_states: Dict[str, SwingDetectorState] = {}
+        
         bot_logger.info(
             f"VRZ Calculator initialized - Base TF: {self.base_timeframe}, "
             f"Trading TF: {self.trading_timeframe}, Buffer: {self.buffer_percent}%"
         )
     
-    async def fetch_candles(self, symbol: str, timeframe: str, bars: int = 150) -> List[Dict]:
+    async def fetch_candles(self, symbol: str, timeframe: str, bars: int = 150,
+                            now: Optional[int] = None) -> List[Dict]:
         """
         Fetch OHLC candles from Delta Exchange
         
+        The returned list is shared: repeat fetches within the same bar (by any
+        calculator) get the same object, and as_frame and SwingDetector cache results by its id().
+        Treat it and its candles as read-only; copy before editing.
+        
         Args:
             symbol: Trading symbol
             timeframe: Candle timeframe
             bars: Number of bars to fetch
+            now: Current epoch seconds, read once per tick by polling callers
         
         Returns:
-            List of OHLC candles
+            List of OHLC candles (read-only)
         """
         try:
             # Calculate time range
-            now = int(time.time())
-            seconds_per_bar = TimeframeConverter.timeframe_to_seconds(timeframe)
+            if now is None:
+                now = time.time_ns() // 1_000_000_000
+            seconds_per_bar = (self._tf_seconds.get(timeframe)
+                               or TimeframeConverter.timeframe_to_seconds(timeframe))
             start = now - (bars * seconds_per_bar)
             
+            # Reuse a very recent identical fetch within the same bar
+            key = (symbol, timeframe, bars)
+            bucket = now // seconds_per_bar
+            cached = _CANDLE_CACHE.get(key)
+            if (cached is not None and cached[0] == bucket
+                    and now - cached[1] < CANDLE_CACHE_TTL_SECONDS):
+                return cached[2]
+            
             bot_logger.debug(f"Fetching {bars} candles for {symbol} on {timeframe}")
             
             candles = await delta_client.get_ohlc_candles(
@@ -85,6 +184,10 @@ class VRZCalculator:
             )
             
             bot_logger.info(f"Fetched {len(candles)} candles for {symbol} ({timeframe})")
+            
+            if candles:
+                _CANDLE_CACHE[key] = (bucket, now, candles)
+            
             return candles
             
         except Exception as e:
@@ -101,26 +204,102 @@ class VRZCalculator:
         Returns:
             Tuple of (zone_lower, zone_upper)
         """
-        buffer = price_level * (self.buffer_percent / 100)
+        buffer = price_level * self._buffer_ratio
         zone_upper = price_level + buffer
         zone_lower = price_level - buffer
         
         return (zone_lower, zone_upper)
     
-    async def calculate_vrz_zones(self, symbol: str, product_id: int) -> Dict[str, List[Dict]]:
+    def _calculate_zone_bounds_vec(self, prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate zone lower and upper bounds for many price levels at once
+        
+        Args:
+            prices: Center prices of zones
+        
+        Returns:
+            Tuple of (zone_lowers, zone_uppers) arrays
+        """
+        if NUMBA_AVAILABLE:
+            bounds = compute_zone_bounds(np.ascontiguousarray(prices, dtype=np.float64),
+                                         self._buffer_ratio)
+            return (bounds[:, 0], bounds[:, 1])
+        
+        buffers = prices * self._buffer_ratio
+        return (prices - buffers, prices + buffers)
+    
+    def _build_zones(self, symbol: str, product_id: int, swings: List[Dict],
+                     zone_type: str, timeframe: str) -> List[VRZZone]:
+        """
+        Build VRZ zone models for detected swings
+        
+        Args:
+            symbol: Trading symbol
+            product_id: Delta Exchange product ID
+            swings: Swing dictionaries from SwingDetector
+            zone_type: ZONE_TYPE_RESISTANCE or ZONE_TYPE_SUPPORT
+            timeframe: Timeframe the swings were detected on
+        
+        Returns:
+            List of VRZZone models, one per swing
+        """
+        if not swings:
+            return []
+        
+        prices = np.fromiter((swing['price'] for swing in swings), dtype=np.float64, count=len(swings))
+        zone_lowers, zone_uppers = self._calculate_zone_bounds_vec(prices)
+        
+        # Epoch seconds -> naive UTC datetimes in one pass (same convention
+        # as the models' utcnow timestamps)
+        timestamps = np.array([swing['timestamp'] for swing in swings], dtype='datetime64[s]').tolist()
+        
+        rows = zip(swings, zone_lowers.tolist(), zone_uppers.tolist(), timestamps)
+        swing, zone_lower, zone_upper, timestamp = next(rows)
+        
+        # Validate the first zone fully and use it as the template for the
+        # rest: copies share its coerced constant fields (and batch
+        # created_at) and only take the already typed per-swing values
+        first_zone = VRZZone(
+            symbol=symbol,
+            product_id=product_id,
+            type=zone_type,
+            price_level=swing['price'],
+            zone_upper=zone_upper,
+            zone_lower=zone_lower,
+            bar_index=swing['index'],
+            timestamp=timestamp,
+            timeframe=timeframe,
+            status='active'
+        )
+        
+        return [first_zone] + [
+            first_zone.model_copy(update={
+                'price_level': swing['price'],
+                'zone_upper': zone_upper,
+                'zone_lower': zone_lower,
+                'bar_index': swing['index'],
+                'timestamp': timestamp
+            })
+            for swing, zone_lower, zone_upper, timestamp in rows
+        ]
+    
+    async def calculate_vrz_zones(self, symbol: str, product_id: int,
+                                  candles: Optional[List[Dict]] = None) -> Dict[str, List[Dict]]:
         """
         Calculate VRZ Support and Resistance zones on base timeframe
         
         Args:
             symbol: Trading symbol
             product_id: Delta Exchange product ID
+            candles: Base timeframe candles (fetched when not given)
         
         Returns:
             Dictionary with 'resistance_zones' and 'support_zones' lists
         """
         try:
             # Fetch candles for base timeframe
-            candles = await self.fetch_candles(symbol, self.base_timeframe, bars=150)
+            if candles is None:
+                candles = await self.fetch_candles(symbol, self.base_timeframe, bars=BASE_VRZ_BARS)
             
             if not candles:
                 bot_logger.warning(f"No candles received for {symbol}")
@@ -129,60 +308,17 @@ class VRZCalculator:
             # Detect swing highs and lows
             swings = self.swing_detector.detect_all_swings(candles)
             
-            resistance_zones = []
-            support_zones = []
+            # Build zones for swing highs (resistance) and swing lows (support)
+            resistance_models = self._build_zones(symbol, product_id, swings['resistance_zones'],
+                                                  ZONE_TYPE_RESISTANCE, self.base_timeframe)
+            support_models = self._build_zones(symbol, product_id, swings['support_zones'],
+                                               ZONE_TYPE_SUPPORT, self.base_timeframe)
             
-            # Process resistance zones (swing highs)
-            for swing_high in swings['resistance_zones']:
-                price_level = swing_high['price']
-                zone_lower, zone_upper = self._calculate_zone_bounds(price_level)
-                
-                # Create VRZ zone model
-                vrz_zone = VRZZone(
-                    symbol=symbol,
-                    product_id=product_id,
-                    type=ZONE_TYPE_RESISTANCE,
-                    price_level=price_level,
-                    zone_upper=zone_upper,
-                    zone_lower=zone_lower,
-                    bar_index=swing_high['index'],
-                    timestamp=datetime.fromtimestamp(swing_high['timestamp']),
-                    timeframe=self.base_timeframe,
-                    status='active'
-                )
-                
-                # Store in database
-                zone_id = await vrz_repository.create_zone(vrz_zone)
-                
-                zone_dict = vrz_zone.dict(by_alias=True)
-                zone_dict['_id'] = zone_id
-                resistance_zones.append(zone_dict)
-            
-            # Process support zones (swing lows)
-            for swing_low in swings['support_zones']:
-                price_level = swing_low['price']
-                zone_lower, zone_upper = self._calculate_zone_bounds(price_level)
-                
-                # Create VRZ zone model
-                vrz_zone = VRZZone(
-                    symbol=symbol,
-                    product_id=product_id,
-                    type=ZONE_TYPE_SUPPORT,
-                    price_level=price_level,
-                    zone_upper=zone_upper,
-                    zone_lower=zone_lower,
-                    bar_index=swing_low['index'],
-                    timestamp=datetime.fromtimestamp(swing_low['timestamp']),
-                    timeframe=self.base_timeframe,
-                    status='active'
-                )
-                
-                # Store in database
-                zone_id = await vrz_repository.create_zone(vrz_zone)
-                
-                zone_dict = vrz_zone.dict(by_alias=True)
-                zone_dict['_id'] = zone_id
-                support_zones.append(zone_dict)
+            # Store in database with a single insert
+            zone_models = resistance_models + support_models
+            zone_dicts = await vrz_repository.bulk_create_zones(zone_models)
+            resistance_zones = zone_dicts[:len(resistance_models)]
+            support_zones = zone_dicts[len(resistance_models):]
             
             bot_logger.info(
                 f"VRZ Calculation Complete for {symbol}: "
@@ -198,20 +334,32 @@ class VRZCalculator:
             bot_logger.error(f"Error calculating VRZ zones: {str(e)}", exc_info=True)
             return {'resistance_zones': [], 'support_zones': []}
     
-    async def calculate_entry_timeframe_vrz(self, symbol: str, product_id: int) -> Dict[str, List[Dict]]:
+    async def calculate_entry_timeframe_vrz(self, symbol: str, product_id: int,
+                                            candles: Optional[List[Dict]] = None) -> Dict[str, List[Dict]]:
         """
         Calculate VRZ zones on entry/trading timeframe for exit targets
         
         Args:
             symbol: Trading symbol
             product_id: Delta Exchange product ID
+            candles: Trading timeframe candles (fetched when not given)
         
         Returns:
             Dictionary with entry timeframe VRZ zones
         """
         try:
-            # Fetch candles for trading timeframe
-            candles = await self.fetch_candles(symbol, self.trading_timeframe, bars=200)
+            memo_key = None
+            
+            # Fetch candles for trading timeframe; fetched results are reused
+            # for the rest of the current trading bar
+            if candles is None:
+                bar = time.time_ns() // 1_000_000_000 // self._tf_seconds[self.trading_timeframe]
+                memo_key = (symbol, product_id, bar)
+                memoized = self._entry_zone_memo.get(memo_key)
+                if memoized is not None:
+                    return memoized
+                
+                candles = await self.fetch_candles(symbol, self.trading_timeframe, bars=ENTRY_VRZ_BARS)
             
             if not candles:
                 return {'resistance_zones': [], 'support_zones': []}
@@ -219,69 +367,95 @@ class VRZCalculator:
             # Detect swing highs and lows
             swings = self.swing_detector.detect_all_swings(candles)
             
-            resistance_zones = []
-            support_zones = []
-            
-            # Process resistance zones
-            for swing_high in swings['resistance_zones']:
-                price_level = swing_high['price']
-                zone_lower, zone_upper = self._calculate_zone_bounds(price_level)
-                
-                vrz_zone = VRZZone(
-                    symbol=symbol,
-                    product_id=product_id,
-                    type=ZONE_TYPE_RESISTANCE,
-                    price_level=price_level,
-                    zone_upper=zone_upper,
-                    zone_lower=zone_lower,
-                    bar_index=swing_high['index'],
-                    timestamp=datetime.fromtimestamp(swing_high['timestamp']),
-                    timeframe=self.trading_timeframe,
-                    status='active'
-                )
-                
-                zone_id = await vrz_repository.create_zone(vrz_zone)
-                zone_dict = vrz_zone.dict(by_alias=True)
-                zone_dict['_id'] = zone_id
-                resistance_zones.append(zone_dict)
+            # Build zones for swing highs (resistance) and swing lows (support)
+            resistance_models = self._build_zones(symbol, product_id, swings['resistance_zones'],
+                                                  ZONE_TYPE_RESISTANCE, self.trading_timeframe)
+            support_models = self._build_zones(symbol, product_id, swings['support_zones'],
+                                               ZONE_TYPE_SUPPORT, self.trading_timeframe)
             
-            # Process support zones
-            for swing_low in swings['support_zones']:
-                price_level = swing_low['price']
-                zone_lower, zone_upper = self._calculate_zone_bounds(price_level)
-                
-                vrz_zone = VRZZone(
-                    symbol=symbol,
-                    product_id=product_id,
-                    type=ZONE_TYPE_SUPPORT,
-                    price_level=price_level,
-                    zone_upper=zone_upper,
-                    zone_lower=zone_lower,
-                    bar_index=swing_low['index'],
-                    timestamp=datetime.fromtimestamp(swing_low['timestamp']),
-                    timeframe=self.trading_timeframe,
-                    status='active'
-                )
-                
-                zone_id = await vrz_repository.create_zone(vrz_zone)
-                zone_dict = vrz_zone.dict(by_alias=True)
-                zone_dict['_id'] = zone_id
-                support_zones.append(zone_dict)
+            # Store in database with a single insert
+            zone_models = resistance_models + support_models
+            zone_dicts = await vrz_repository.bulk_create_zones(zone_models)
+            resistance_zones = zone_dicts[:len(resistance_models)]
+            support_zones = zone_dicts[len(resistance_models):]
             
             bot_logger.info(
                 f"Entry TF VRZ Calculation for {symbol} ({self.trading_timeframe}): "
                 f"{len(resistance_zones)} resistance, {len(support_zones)} support zones"
             )
             
-            return {
+            result = {
                 'resistance_zones': resistance_zones,
                 'support_zones': support_zones
             }
             
+            if memo_key is not None:
+                if len(self._entry_zone_memo) >= ENTRY_ZONE_MEMO_SIZE:
+                    self._entry_zone_memo.pop(next(iter(self._entry_zone_memo)))
+                self._entry_zone_memo[memo_key] = result
+            
+            return result
+            
         except Exception as e:
             bot_logger.error(f"Error calculating entry timeframe VRZ: {str(e)}", exc_info=True)
             return {'resistance_zones': [], 'support_zones': []}
     
+    def _base_to_trading_ratio(self) -> Optional[int]:
+        """Trading bars per base bar when base candles can be resampled locally, else None"""
+        trading_seconds = self._tf_seconds[self.trading_timeframe]
+        base_seconds = self._tf_seconds[self.base_timeframe]
+        
+        if (base_seconds <= trading_seconds or base_seconds % trading_seconds
+                or base_seconds > MAX_RESAMPLE_SECONDS):
+            return None
+        
+        ratio = base_seconds // trading_seconds
+        if BASE_VRZ_BARS * ratio > MAX_FUSED_FETCH_BARS:
+            return None
+        return ratio
+    
+    async def calculate_all_vrz(self, symbol: str, product_id: int) -> Dict[str, Dict[str, List[Dict]]]:
+        """
+        Calculate base and entry timeframe VRZ zones concurrently
+        
+        When the base timeframe is a whole multiple of the trading timeframe,
+        one trading timeframe fetch covering the base lookback feeds both
+        calculations and base candles are resampled locally. Otherwise the
+        two calculations fetch their own candles with overlapping requests.
+        
+        Args:
+            symbol: Trading symbol
+            product_id: Delta Exchange product ID
+        
+        Returns:
+            Dictionary with 'base' and 'entry' zone results
+        """
+        base_candles = entry_candles = None
+        ratio = self._base_to_trading_ratio()
+        
+        if ratio:
+            try:
+                candles = await self.fetch_candles(
+                    symbol, self.trading_timeframe, bars=max(ENTRY_VRZ_BARS, BASE_VRZ_BARS * ratio)
+                )
+                base_candles = resample_candles(
+                    candles, self._tf_seconds[self.trading_timeframe], self._tf_seconds[self.base_timeframe]
+                )
+                entry_candles = candles[-ENTRY_VRZ_BARS:]
+            except Exception as e:
+                bot_logger.error(f"Error resampling base candles: {str(e)}", exc_info=True)
+                base_candles = entry_candles = None
+        
+        base_zones, entry_zones = await asyncio.gather(
+            self.calculate_vrz_zones(symbol, product_id, candles=base_candles),
+            self.calculate_entry_timeframe_vrz(symbol, product_id, candles=entry_candles)
+        )
+        
+        return {
+            'base': base_zones,
+            'entry': entry_zones
+        }
+    
     async def invalidate_zones(self, symbol: str, current_candle: Dict):
         """
         Monitor and invalidate breached VRZ zones
@@ -307,11 +481,12 @@ class VRZCalculator:
             max_zones: Maximum number of zones to return per type
         
         Returns:
-            Dictionary with nearest active zones
+            Dictionary with nearest active zones, plus 'resistance_bounds' and
+            'support_bounds' zones_to_array-style arrays for them
         """
         try:
             # Get nearest resistance zones (above current price)
-            resistance_zones = await vrz_repository.get_nearest_zones(
+            resistance_zones, resistance_bounds = await vrz_repository.get_nearest_zones_with_bounds(
                 symbol=symbol,
                 timeframe=self.base_timeframe,
                 current_price=current_price,
@@ -319,14 +494,8 @@ class VRZCalculator:
                 limit=max_zones
             )
             
-            # Filter only zones above current price
-            resistance_zones = [
-                z for z in resistance_zones 
-                if z['zone_lower'] > current_price
-            ][:max_zones]
-            
             # Get nearest support zones (below current price)
-            support_zones = await vrz_repository.get_nearest_zones(
+            support_zones, support_bounds = await vrz_repository.get_nearest_zones_with_bounds(
                 symbol=symbol,
                 timeframe=self.base_timeframe,
                 current_price=current_price,
@@ -334,21 +503,38 @@ class VRZCalculator:
                 limit=max_zones
             )
             
-            # Filter only zones below current price
-            support_zones = [
-                z for z in support_zones 
-                if z['zone_upper'] < current_price
-            ][:max_zones]
-            
             return {
                 'resistance_zones': resistance_zones,
-                'support_zones': support_zones
+                'support_zones': support_zones,
+                'resistance_bounds': resistance_bounds,
+                'support_bounds': support_bounds
             }
             
         except Exception as e:
             bot_logger.error(f"Error getting active zones: {str(e)}", exc_info=True)
             return {'resistance_zones': [], 'support_zones': []}
     
+    def _unseen_swings(self, symbol: str, swings: List[Dict], zone_type: str) -> List[Dict]:
+        """
+        Drop swings whose zones were recently stored by the background task
+        
+        Swings are keyed by timestamp because the candle window slides
+        between polls and shifts every swing index.
+        """
+        return [
+            swing for swing in swings
+            if (symbol, self.base_timeframe, swing['timestamp'], zone_type) not in self._recent_zone_keys
+        ]
+    
+    def _remember_swings(self, symbol: str, swings: List[Dict], zone_type: str):
+        """Record swings whose zones were stored, evicting the oldest beyond RECENT_ZONE_KEYS_SIZE"""
+        for swing in swings:
+            key = (symbol, self.base_timeframe, swing['timestamp'], zone_type)
+            if len(self._recent_zone_keys_fifo) >= RECENT_ZONE_KEYS_SIZE:
+                self._recent_zone_keys.discard(self._recent_zone_keys_fifo.popleft())
+            self._recent_zone_keys.add(key)
+            self._recent_zone_keys_fifo.append(key)
+    
     def is_price_near_zone(self, price: float, zone: Dict, proximity_percent: float = 0.5) -> bool:
         """
         Check if price is near a VRZ zone
@@ -371,17 +557,19 @@ class VRZCalculator:
         
         return extended_lower <= price <= extended_upper
     
-    async def update_zones_continuous(self, symbol: str, product_id: int):
+    async def update_zones_continuous(self, symbol: str, product_id: int,
+                                      now: Optional[int] = None):
         """
         Continuously update VRZ zones (for background task)
         
         Args:
             symbol: Trading symbol
             product_id: Delta Exchange product ID
+            now: Current epoch seconds for this tick (read here when not given)
         """
         try:
             # Fetch latest candle
-            candles = await self.fetch_candles(symbol, self.base_timeframe, bars=10)
+            candles = await self.fetch_candles(symbol, self.base_timeframe, bars=10, now=now)
             
             if candles:
                 latest_candle = candles[-1]
@@ -390,46 +578,27 @@ class VRZCalculator:
                 await self.invalidate_zones(symbol, latest_candle)
                 
                 # Detect new VRZ zones in recent candles
-                recent_swings = self.swing_detector.detect_all_swings(candles)
+                recent_swings = self.swing_detector.detect_incremental(
+                    self._swing_states.setdefault(symbol, SwingDetectorState()), candles
+                )
                 
-                # Store any new zones (check if they already exist)
-                for swing_high in recent_swings['resistance_zones'][-3:]:
-                    price_level = swing_high['price']
-                    zone_lower, zone_upper = self._calculate_zone_bounds(price_level)
-                    
-                    vrz_zone = VRZZone(
-                        symbol=symbol,
-                        product_id=product_id,
-                        type=ZONE_TYPE_RESISTANCE,
-                        price_level=price_level,
-                        zone_upper=zone_upper,
-                        zone_lower=zone_lower,
-                        bar_index=swing_high['index'],
-                        timestamp=datetime.fromtimestamp(swing_high['timestamp']),
-                        timeframe=self.base_timeframe,
-                        status='active'
-                    )
-                    
-                    await vrz_repository.create_zone(vrz_zone)
+                # Store only zones not already written by a previous poll
+                resistance_swings = self._unseen_swings(
+                    symbol, recent_swings['resistance_zones'][-3:], ZONE_TYPE_RESISTANCE
+                )
+                support_swings = self._unseen_swings(
+                    symbol, recent_swings['support_zones'][-3:], ZONE_TYPE_SUPPORT
+                )
+                new_zones = (
+                    self._build_zones(symbol, product_id, resistance_swings,
+                                      ZONE_TYPE_RESISTANCE, self.base_timeframe) +
+                    self._build_zones(symbol, product_id, support_swings,
+                                      ZONE_TYPE_SUPPORT, self.base_timeframe)
+                )
                 
-                for swing_low in recent_swings['support_zones'][-3:]:
-                    price_level = swing_low['price']
-                    zone_lower, zone_upper = self._calculate_zone_bounds(price_level)
-                    
-                    vrz_zone = VRZZone(
-                        symbol=symbol,
-                        product_id=product_id,
-                        type=ZONE_TYPE_SUPPORT,
-                        price_level=price_level,
-                        zone_upper=zone_upper,
-                        zone_lower=zone_lower,
-                        bar_index=swing_low['index'],
-                        timestamp=datetime.fromtimestamp(swing_low['timestamp']),
-                        timeframe=self.base_timeframe,
-                        status='active'
-                    )
-                    
-                    await vrz_repository.create_zone(vrz_zone)
+                await vrz_repository.bulk_create_zones(new_zones)
+                self._remember_swings(symbol, resistance_swings, ZONE_TYPE_RESISTANCE)
+                self._remember_swings(symbol, support_swings, ZONE_TYPE_SUPPORT)
                 
                 bot_logger.debug(f"VRZ zones updated for {symbol}")
             
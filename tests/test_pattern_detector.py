@@ -0,0 +1,215 @@
+"""
+Differential test: PatternDetector scans against the original per-candle rules
+
+REFERENCE_RULES is a frozen copy of the dict-based detectors the bot shipped
+with. Every scan path (single index, range, DataFrame, best pattern) must
+report exactly what those detectors report on random OHLC series, so any
+drift in strategies/_pattern_kernels.py fails here.
+
+Run with: python -m unittest discover tests
+"""
+import random
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from strategies.pattern_detector import PATTERN_SPECS, PatternDetector
+from utils.ohlc import as_frame
+
+
+def _body(c):
+    return abs(c['close'] - c['open'])
+
+
+def _bull(c):
+    return c['close'] > c['open']
+
+
+def _bear(c):
+    return c['close'] < c['open']
+
+
+def _upper(c):
+    return c['high'] - max(c['open'], c['close'])
+
+
+def _lower(c):
+    return min(c['open'], c['close']) - c['low']
+
+
+def _doji(c):
+    total_range = c['high'] - c['low']
+    return _body(c) / total_range < 0.1 if total_range > 0 else False
+
+
+def _strong(c):
+    return _upper(c) <= _body(c) * 0.3 and _lower(c) <= _body(c) * 0.3
+
+
+def _two(rule):
+    """Two-candle rule (prev, curr) -> bool, guarded like the original detectors"""
+    return lambda candles, i: i >= 1 and rule(candles[i - 1], candles[i])
+
+
+def _three(rule):
+    """Three-candle rule (first, star, last) -> bool"""
+    return lambda candles, i: i >= 2 and rule(candles[i - 2], candles[i - 1], candles[i])
+
+
+def _one(rule):
+    return lambda candles, i: i >= 0 and rule(candles[i])
+
+
+def _hammer(c):
+    return (_lower(c) >= _body(c) * 2 and _upper(c) < _body(c) * 0.3 and
+            _body(c) / (c['high'] - c['low']) < 0.3)
+
+
+def _inverted(c):
+    return (_upper(c) >= _body(c) * 2 and _lower(c) < _body(c) * 0.3 and
+            _body(c) / (c['high'] - c['low']) < 0.3)
+
+
+REFERENCE_RULES = {
+    'bullish_engulfing': _two(lambda p, q: _bear(p) and _bull(q) and q['open'] <= p['close'] and
+                              q['close'] >= p['open'] and _body(q) > _body(p)),
+    'bearish_engulfing': _two(lambda p, q: _bull(p) and _bear(q) and q['open'] >= p['close'] and
+                              q['close'] <= p['open'] and _body(q) > _body(p)),
+    'piercing_line': _two(lambda p, q: _bear(p) and _bull(q) and q['open'] < p['close'] and
+                          q['close'] > (p['open'] + p['close']) / 2 and q['close'] < p['open']),
+    'dark_cloud_cover': _two(lambda p, q: _bull(p) and _bear(q) and q['open'] > p['close'] and
+                             q['close'] < (p['open'] + p['close']) / 2 and q['close'] > p['open']),
+    'bullish_harami': _two(lambda p, q: _bear(p) and _bull(q) and q['open'] >= p['close'] and
+                           q['close'] <= p['open'] and _body(q) < _body(p)),
+    'bearish_harami': _two(lambda p, q: _bull(p) and _bear(q) and q['open'] <= p['close'] and
+                           q['close'] >= p['open'] and _body(q) < _body(p)),
+    'tweezer_bottom': _two(lambda p, q: abs(p['low'] - q['low']) / ((p['low'] + q['low']) / 2) < 0.001),
+    'tweezer_top': _two(lambda p, q: abs(p['high'] - q['high']) / ((p['high'] + q['high']) / 2) < 0.001),
+    'morning_star': _three(lambda x, y, z: _bear(x) and _body(y) <= _body(x) * 0.3 and _bull(z) and
+                           z['close'] > (x['open'] + x['close']) / 2),
+    'evening_star': _three(lambda x, y, z: _bull(x) and _body(y) <= _body(x) * 0.3 and _bear(z) and
+                           z['close'] < (x['open'] + x['close']) / 2),
+    'three_white_soldiers': _three(lambda x, y, z: _bull(x) and _bull(y) and _bull(z) and
+                                   x['open'] < y['open'] < x['close'] and
+                                   y['open'] < z['open'] < y['close'] and
+                                   x['close'] < y['close'] < z['close'] and
+                                   _strong(x) and _strong(y) and _strong(z)),
+    'three_black_crows': _three(lambda x, y, z: _bear(x) and _bear(y) and _bear(z) and
+                                x['close'] < y['open'] < x['open'] and
+                                y['close'] < z['open'] < y['open'] and
+                                z['close'] < y['close'] < x['close'] and
+                                _strong(x) and _strong(y) and _strong(z)),
+    'three_outside_up': _three(lambda x, y, z: _bear(x) and _bull(y) and y['open'] <= x['close'] and
+                               y['close'] >= x['open'] and _bull(z) and z['close'] > y['close']),
+    'three_outside_down': _three(lambda x, y, z: _bull(x) and _bear(y) and y['open'] >= x['close'] and
+                                 y['close'] <= x['open'] and _bear(z) and z['close'] < y['close']),
+    'abandoned_baby_bullish': _three(lambda x, y, z: _bear(x) and _doji(y) and _bull(z) and
+                                     y['high'] < x['low'] and y['high'] < z['low']),
+    'abandoned_baby_bearish': _three(lambda x, y, z: _bull(x) and _doji(y) and _bear(z) and
+                                     y['low'] > x['high'] and y['low'] > z['high']),
+    'hammer': _one(_hammer),
+    'inverted_hammer': _one(_inverted),
+    'hanging_man': _one(_hammer),
+    'shooting_star': _one(_inverted),
+}
+
+
+def reference_hits(candles, index):
+    """Pattern names the original detectors report at index, in scan order"""
+    hits = []
+    for name, *_ in PATTERN_SPECS:
+        try:
+            if REFERENCE_RULES[name](candles, index):
+                hits.append(name)
+        except ZeroDivisionError:
+            # The original detectors logged and skipped these
+            pass
+    return hits
+
+
+def random_candles(rng, count):
+    """Random walk with coarse prices so ties, gaps, dojis and stars all occur"""
+    candles = []
+    price = 100.0
+    for i in range(count):
+        open_price = round(price + rng.choice([-1, 1]) * rng.random() * 3, 1)
+        close_price = round(open_price + rng.gauss(0, 2), 1)
+        if rng.random() < 0.1:
+            close_price = open_price
+        high = round(max(open_price, close_price) + abs(rng.gauss(0, 1.5)) * (rng.random() < 0.7), 1)
+        low = round(min(open_price, close_price) - abs(rng.gauss(0, 1.5)) * (rng.random() < 0.7), 1)
+        candles.append({'time': 1_700_000_000 + 900 * i, 'open': open_price,
+                        'high': high, 'low': low, 'close': close_price, 'volume': 1.0})
+        price = close_price
+    return candles
+
+
+class PatternDetectorDifferentialTest(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = PatternDetector()
+        rng = random.Random(20240611)
+        self.series = [random_candles(rng, 400) for _ in range(5)]
+        # Strong-bodied runs are too rare in a random walk; splice some in
+        runs = [(100, 110.5, 99.5, 110), (105, 120.5, 104.5, 120), (115, 130.5, 114.5, 130),
+                (130, 130.5, 119.5, 120), (125, 125.5, 109.5, 110), (115, 115.5, 99.5, 100)]
+        self.series.append(random_candles(rng, 50) + [
+            {'time': 0, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': 1.0}
+            for o, h, l, c in runs
+        ] + random_candles(rng, 50))
+
+    def test_series_cover_every_pattern(self):
+        seen = {name for candles in self.series
+                for i in range(len(candles)) for name in reference_hits(candles, i)}
+        self.assertEqual(seen, {spec[0] for spec in PATTERN_SPECS})
+
+    def test_scan_all_patterns_matches_reference(self):
+        for candles in self.series:
+            frame = as_frame(candles)
+            for i in range(len(candles)):
+                expected = reference_hits(candles, i)
+                for data in (candles, frame):
+                    found = self.detector.scan_all_patterns(data, i)
+                    self.assertEqual([p['pattern_name'] for p in found], expected, (i, type(data)))
+
+    def test_detect_wrappers_match_reference(self):
+        candles = self.series[0]
+        for i in range(len(candles)):
+            expected = set(reference_hits(candles, i))
+            for name, *_ in PATTERN_SPECS:
+                result = getattr(self.detector, f'detect_{name}')(candles, i)
+                self.assertEqual(result is not None, name in expected, (i, name))
+
+    def test_find_best_pattern_matches_reference(self):
+        confidence = {spec[0]: spec[2] for spec in PATTERN_SPECS}
+        for candles in self.series:
+            for i in range(len(candles)):
+                expected = reference_hits(candles, i)
+                best = self.detector.find_best_pattern(candles, i)
+                if not expected:
+                    self.assertIsNone(best)
+                else:
+                    self.assertEqual(best['pattern_name'], max(expected, key=confidence.get))
+
+    def test_range_and_dataframe_scans_match_reference(self):
+        names = [spec[0] for spec in PATTERN_SPECS]
+        for candles in self.series:
+            expected = np.array([[name in reference_hits(candles, i) for name in names]
+                                 for i in range(len(candles))])
+
+            np.testing.assert_array_equal(self.detector.scan_all_patterns_range(candles), expected)
+            np.testing.assert_array_equal(self.detector.scan_all_patterns_range(candles, 57, 211),
+                                          expected[57:211])
+
+            detections = self.detector.scan_dataframe(pd.DataFrame(candles))
+            found = set(zip(detections['index'], detections['pattern_name']))
+            rows, cols = np.nonzero(expected)
+            self.assertEqual(found, {(i, names[k]) for i, k in zip(rows, cols)})
+
+            best = self.detector.scan_best_patterns(pd.DataFrame(candles))
+            self.assertEqual(best['index'].tolist(), np.flatnonzero(expected.any(axis=1)).tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
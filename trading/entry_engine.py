@@ -1,24 +1,42 @@
 """
 Entry Engine - Scans for entry signals and generates trade setups
 """
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import asyncio
+import logging
 from datetime import datetime
+import numpy as np
 from config.settings import settings
 from config.constants import SIDE_BUY, SIDE_SELL, ZONE_TYPE_RESISTANCE, ZONE_TYPE_SUPPORT
 from strategies.pattern_detector import PatternDetector
-from strategies.vrz_calculator import VRZCalculator
+from strategies.vrz_calculator import VRZCalculator, is_prices_near_zones, zones_to_array
 from strategies.risk_manager import risk_manager
 from api.delta_client import delta_client
 from utils.logger import bot_logger
 
 
+# Pattern direction -> (signal builder, zone type to enter at, zone type for targets)
+SIGNAL_ROUTES = {
+    'bullish': ('_create_long_signal', ZONE_TYPE_SUPPORT, ZONE_TYPE_RESISTANCE),
+    'bearish': ('_create_short_signal', ZONE_TYPE_RESISTANCE, ZONE_TYPE_SUPPORT)
+}
+
+# Symbols scanned at once by scan_for_entry_signals_batch, so a large asset
+# list ('all' mode) doesn't burst the exchange with candle requests
+MAX_CONCURRENT_SCANS = 16
+
+
 class EntryEngine:
     """
     Entry signal generation engine
     Monitors trading timeframe for entry patterns near VRZ zones
     """
     
+    __slots__ = (
+        'user_settings', 'max_vrz_zones', 'stop_pips', 'target_type', 'target_levels',
+        'lot_size', 'order_type', 'pattern_detector', 'vrz_calculator'
+    )
+    
     def __init__(self, user_settings: Dict):
         """
         Initialize Entry Engine
@@ -27,6 +45,14 @@ class EntryEngine:
             user_settings: User configuration dictionary
         """
         self.user_settings = user_settings
+        
+        # Settings read on every scan, unpacked once
+        self.max_vrz_zones = user_settings.get('max_vrz_zones', 3)
+        self.stop_pips = user_settings.get('stop_loss_pips', 10)
+        self.target_type = user_settings.get('target_type', 'rr')
+        self.target_levels = tuple(user_settings.get('target_levels', (1.5, 2.0, 2.5)) or ())
+        self.lot_size = user_settings.get('lot_size', 1)
+        self.order_type = user_settings.get('order_type', 'market_order')
         self.pattern_detector = PatternDetector()
         self.vrz_calculator = VRZCalculator(
             base_timeframe=user_settings.get('base_timeframe', 'auto'),
@@ -35,9 +61,7 @@ class EntryEngine:
             swing_right_bars=user_settings.get('swing_right_bars', 3)
         )
         
-        bot_logger.info(
-            f"Entry Engine initialized for user {user_settings.get('telegram_user_id')}"
-        )
+        bot_logger.info("Entry Engine initialized for user %s", user_settings.get('telegram_user_id'))
     
     async def scan_for_entry_signals(self, symbol: str, product_id: int) -> Optional[Dict]:
         """
@@ -51,7 +75,7 @@ class EntryEngine:
             Entry signal dictionary or None
         """
         try:
-            bot_logger.info(f"Scanning for entry signals: {symbol}")
+            bot_logger.info("Scanning for entry signals: %s", symbol)
             
             # 1. Fetch trading timeframe candles
             candles = await self.vrz_calculator.fetch_candles(
@@ -61,7 +85,7 @@ class EntryEngine:
             )
             
             if len(candles) < 10:
-                bot_logger.warning(f"Insufficient candles for {symbol}")
+                bot_logger.warning("Insufficient candles for %s", symbol)
                 return None
             
             # 2. Get current price
@@ -71,35 +95,37 @@ class EntryEngine:
             vrz_zones = await self.vrz_calculator.get_active_zones(
                 symbol, 
                 current_price, 
-                max_zones=self.user_settings.get('max_vrz_zones', 3)
+                max_zones=self.max_vrz_zones
             )
             
             resistance_zones = vrz_zones['resistance_zones']
             support_zones = vrz_zones['support_zones']
             
             bot_logger.debug(
-                f"Active zones for {symbol}: {len(resistance_zones)} resistance, "
-                f"{len(support_zones)} support"
+                "Active zones for %s: %d resistance, %d support",
+                symbol, len(resistance_zones), len(support_zones)
             )
             
             # 4. Check if price is near any zone
-            near_resistance = self._find_nearby_zone(current_price, resistance_zones)
-            near_support = self._find_nearby_zone(current_price, support_zones)
+            near_resistance = self._find_nearby_zone(
+                current_price, resistance_zones, vrz_zones.get('resistance_bounds')
+            )
+            near_support = self._find_nearby_zone(
+                current_price, support_zones, vrz_zones.get('support_bounds')
+            )
             
             if not near_resistance and not near_support:
-                bot_logger.debug(f"Price not near any VRZ zone for {symbol}")
+                bot_logger.debug("Price not near any VRZ zone for %s", symbol)
                 return None
             
-            # 5. Detect candlestick patterns at current candle
-            patterns = self.pattern_detector.scan_all_patterns(candles, len(candles) - 1)
+            # 5-6. Find the best candlestick pattern at current candle; only
+            # the winner is built
+            best_pattern = self.pattern_detector.find_best_pattern(candles, len(candles) - 1)
             
-            if not patterns:
-                bot_logger.debug(f"No patterns detected for {symbol}")
+            if best_pattern is None:
+                bot_logger.debug("No patterns detected for %s", symbol)
                 return None
             
-            # 6. Find best pattern
-            best_pattern = max(patterns, key=lambda p: p['confidence'])
-            
             bot_logger.log_pattern_detection(
                 best_pattern['pattern_name'],
                 symbol,
@@ -107,22 +133,24 @@ class EntryEngine:
                 best_pattern['confidence']
             )
             
-            # 7. Validate pattern direction with zone
+            # 7. Validate pattern direction with zone: bullish near support is
+            # a potential long, bearish near resistance a potential short
             entry_signal = None
-            
-            if best_pattern['direction'] == 'bullish' and near_support:
-                # Bullish pattern near support - potential long entry
-                entry_signal = await self._create_long_signal(
-                    symbol, product_id, current_price, best_pattern, 
-                    near_support, support_zones, resistance_zones
-                )
-            
-            elif best_pattern['direction'] == 'bearish' and near_resistance:
-                # Bearish pattern near resistance - potential short entry
-                entry_signal = await self._create_short_signal(
-                    symbol, product_id, current_price, best_pattern, 
-                    near_resistance, resistance_zones, support_zones
-                )
+            route = SIGNAL_ROUTES.get(best_pattern['direction'])
+            
+            if route:
+                builder, entry_type, target_type = route
+                zones_by_type = {
+                    ZONE_TYPE_SUPPORT: (near_support, support_zones),
+                    ZONE_TYPE_RESISTANCE: (near_resistance, resistance_zones)
+                }
+                entry_zone, entry_zones = zones_by_type[entry_type]
+                
+                if entry_zone:
+                    entry_signal = await getattr(self, builder)(
+                        symbol, product_id, current_price, best_pattern,
+                        entry_zone, entry_zones, zones_by_type[target_type][1]
+                    )
             
             if entry_signal:
                 bot_logger.log_entry_signal(entry_signal)
@@ -130,24 +158,82 @@ class EntryEngine:
             return entry_signal
             
         except Exception as e:
-            bot_logger.error(f"Error scanning for entry signals: {str(e)}", exc_info=True)
+            bot_logger.error("Error scanning for entry signals: %s", e, exc_info=bot_logger.isEnabledFor(logging.DEBUG))
             return None
     
-    def _find_nearby_zone(self, price: float, zones: List[Dict]) -> Optional[Dict]:
+    async def scan_for_entry_signals_batch(self, items: List[Tuple[str, int]]) -> List[Optional[Dict]]:
+        """
+        Scan several symbols concurrently (at most MAX_CONCURRENT_SCANS at once)
+        
+        Args:
+            items: (symbol, product_id) pairs
+        
+        Returns:
+            Entry signal or None per item, in input order
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SCANS)
+        
+        async def scan(symbol: str, product_id: int) -> Optional[Dict]:
+            async with semaphore:
+                return await self.scan_for_entry_signals(symbol, product_id)
+        
+        results = await asyncio.gather(
+            *(scan(symbol, product_id) for symbol, product_id in items),
+            return_exceptions=True
+        )
+        
+        signals = []
+        for (symbol, _), result in zip(items, results):
+            if isinstance(result, BaseException):
+                bot_logger.error("Error scanning %s for entry signals: %s", symbol, result)
+                result = None
+            signals.append(result)
+        return signals
+    
+    def _find_nearby_zone(self, price: float, zones: List[Dict],
+                          bounds: Optional[np.ndarray] = None) -> Optional[Dict]:
         """
         Find if price is near any zone
         
         Args:
             price: Current price
             zones: List of VRZ zones
+            bounds: zones_to_array(zones) if already available
         
         Returns:
             Nearby zone or None
         """
-        for zone in zones:
-            if self.vrz_calculator.is_price_near_zone(price, zone, proximity_percent=0.5):
-                return zone
-        return None
+        if not zones:
+            return None
+        
+        if bounds is None:
+            bounds = zones_to_array(zones)
+        near = is_prices_near_zones(price, bounds, proximity_percent=0.5)
+        return zones[int(near.argmax())] if near.any() else None
+    
+    def _assign_exit_quantities(self, targets: List[Dict]) -> List[Dict]:
+        """
+        Fix the contracts to exit at each target
+        
+        Each target exits at least 1 contract and the total never exceeds
+        lot_size; when the lots run out, the remaining targets are dropped.
+        
+        Args:
+            targets: Targets from risk_manager.calculate_multiple_targets
+        
+        Returns:
+            Targets that received contracts, each with 'exit_qty' set
+        """
+        exit_quantities = risk_manager.calculate_partial_exits(self.lot_size, len(targets))
+        unallocated = self.lot_size
+        kept = []
+        for target, exit_qty in zip(targets, exit_quantities):
+            if unallocated < 1:
+                break
+            target['exit_qty'] = max(1, min(exit_qty, unallocated))
+            unallocated -= target['exit_qty']
+            kept.append(target)
+        return kept
     
     async def _create_long_signal(self, 
                                   symbol: str, 
@@ -179,20 +265,13 @@ class EntryEngine:
                 side=SIDE_BUY,
                 pattern_high=pattern['pattern_high'],
                 pattern_low=pattern['pattern_low'],
-                stop_pips=self.user_settings.get('stop_loss_pips', 10)
-            )
-            
-            # Get entry timeframe VRZ zones for targets
-            entry_tf_zones = await self.vrz_calculator.calculate_entry_timeframe_vrz(
-                symbol, product_id
+                stop_pips=self.stop_pips
             )
             
-            target_type = self.user_settings.get('target_type', 'rr')
-            
             # Calculate targets
-            if target_type == 'zone':
+            if self.target_type == 'zone':
                 # Use resistance zones as targets
-                target_zones = resistance_zones[:self.user_settings.get('max_vrz_zones', 3)]
+                target_zones = resistance_zones[:self.max_vrz_zones]
                 targets = risk_manager.calculate_multiple_targets(
                     entry_price=current_price,
                     stop_loss=stop_loss,
@@ -201,15 +280,15 @@ class EntryEngine:
                     vrz_zones=target_zones
                 )
             else:  # RR-based
-                target_levels = self.user_settings.get('target_levels', [1.5, 2.0, 2.5])
                 targets = risk_manager.calculate_multiple_targets(
                     entry_price=current_price,
                     stop_loss=stop_loss,
                     side=SIDE_BUY,
                     target_type='rr',
-                    target_levels=target_levels
+                    target_levels=self.target_levels
                 )
             
+            targets = self._assign_exit_quantities(targets)
             if not targets:
                 bot_logger.warning("No valid targets calculated")
                 return None
@@ -224,7 +303,7 @@ class EntryEngine:
             )
             
             if not is_valid:
-                bot_logger.info(f"Trade setup invalid: {reason}")
+                bot_logger.info("Trade setup invalid: %s", reason)
                 return None
             
             # Create entry signal
@@ -234,6 +313,7 @@ class EntryEngine:
                 'side': SIDE_BUY,
                 'entry_price': current_price,
                 'stop_loss': stop_loss,
+                'stop_loss_str': str(stop_loss),
                 'targets': targets,
                 'risk_reward': rr_ratio,
                 'pattern': pattern['pattern_name'],
@@ -241,8 +321,8 @@ class EntryEngine:
                 'entry_zone': entry_zone,
                 'timeframe': self.vrz_calculator.trading_timeframe,
                 'timestamp': datetime.utcnow(),
-                'lot_size': self.user_settings.get('lot_size', 1),
-                'order_type': self.user_settings.get('order_type', 'market_order')
+                'lot_size': self.lot_size,
+                'order_type': self.order_type
             }
             
             # Log risk summary
@@ -258,7 +338,7 @@ class EntryEngine:
             return signal
             
         except Exception as e:
-            bot_logger.error(f"Error creating long signal: {str(e)}", exc_info=True)
+            bot_logger.error("Error creating long signal: %s", e, exc_info=bot_logger.isEnabledFor(logging.DEBUG))
             return None
     
     async def _create_short_signal(self, 
@@ -291,20 +371,13 @@ class EntryEngine:
                 side=SIDE_SELL,
                 pattern_high=pattern['pattern_high'],
                 pattern_low=pattern['pattern_low'],
-                stop_pips=self.user_settings.get('stop_loss_pips', 10)
+                stop_pips=self.stop_pips
             )
             
-            # Get entry timeframe VRZ zones for targets
-            entry_tf_zones = await self.vrz_calculator.calculate_entry_timeframe_vrz(
-                symbol, product_id
-            )
-            
-            target_type = self.user_settings.get('target_type', 'rr')
-            
             # Calculate targets
-            if target_type == 'zone':
+            if self.target_type == 'zone':
                 # Use support zones as targets
-                target_zones = support_zones[:self.user_settings.get('max_vrz_zones', 3)]
+                target_zones = support_zones[:self.max_vrz_zones]
                 targets = risk_manager.calculate_multiple_targets(
                     entry_price=current_price,
                     stop_loss=stop_loss,
@@ -313,15 +386,15 @@ class EntryEngine:
                     vrz_zones=target_zones
                 )
             else:  # RR-based
-                target_levels = self.user_settings.get('target_levels', [1.5, 2.0, 2.5])
                 targets = risk_manager.calculate_multiple_targets(
                     entry_price=current_price,
                     stop_loss=stop_loss,
                     side=SIDE_SELL,
                     target_type='rr',
-                    target_levels=target_levels
+                    target_levels=self.target_levels
                 )
             
+            targets = self._assign_exit_quantities(targets)
             if not targets:
                 bot_logger.warning("No valid targets calculated")
                 return None
@@ -336,7 +409,7 @@ class EntryEngine:
             )
             
             if not is_valid:
-                bot_logger.info(f"Trade setup invalid: {reason}")
+                bot_logger.info("Trade setup invalid: %s", reason)
                 return None
             
             # Create entry signal
@@ -346,6 +419,7 @@ class EntryEngine:
                 'side': SIDE_SELL,
                 'entry_price': current_price,
                 'stop_loss': stop_loss,
+                'stop_loss_str': str(stop_loss),
                 'targets': targets,
                 'risk_reward': rr_ratio,
                 'pattern': pattern['pattern_name'],
@@ -353,8 +427,8 @@ class EntryEngine:
                 'entry_zone': entry_zone,
                 'timeframe': self.vrz_calculator.trading_timeframe,
                 'timestamp': datetime.utcnow(),
-                'lot_size': self.user_settings.get('lot_size', 1),
-                'order_type': self.user_settings.get('order_type', 'market_order')
+                'lot_size': self.lot_size,
+                'order_type': self.order_type
             }
             
             # Log risk summary
@@ -370,7 +444,7 @@ class EntryEngine:
             return signal
             
         except Exception as e:
-            bot_logger.error(f"Error creating short signal: {str(e)}", exc_info=True)
+            bot_logger.error("Error creating short signal: %s", e, exc_info=bot_logger.isEnabledFor(logging.DEBUG))
             return None
     
     async def execute_entry(self, signal: Dict) -> Optional[Dict]:
@@ -384,12 +458,12 @@ class EntryEngine:
             Order response or None
         """
         try:
-            bot_logger.info(f"Executing entry: {signal['symbol']} {signal['side']}")
+            bot_logger.info("Executing entry: %s %s", signal['symbol'], signal['side'])
             
             # Prepare stop loss order
             stop_loss_order = {
                 'order_type': 'stop_market_order',
-                'stop_price': str(signal['stop_loss']),
+                'stop_price': signal.get('stop_loss_str') or str(signal['stop_loss']),
                 'trail_amount': '0'
             }
             
@@ -404,13 +478,13 @@ class EntryEngine:
             )
             
             if order_response.get('success'):
-                bot_logger.info(f"Entry order placed successfully: {signal['symbol']}")
+                bot_logger.info("Entry order placed successfully: %s", signal['symbol'])
                 return order_response
             else:
-                bot_logger.error(f"Entry order failed: {order_response}")
+                bot_logger.error("Entry order failed: %s", order_response)
                 return None
             
         except Exception as e:
-            bot_logger.error(f"Error executing entry: {str(e)}", exc_info=True)
+            bot_logger.error("Error executing entry: %s", e, exc_info=bot_logger.isEnabledFor(logging.DEBUG))
             return None
           
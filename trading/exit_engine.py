@@ -1,20 +1,30 @@
 """
 Exit Engine - Manages trade exits, targets, and stop loss trailing
 """
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime
+import asyncio
+import logging
+import math
 from config.constants import SIDE_BUY, SIDE_SELL
 from api.delta_client import delta_client
 from database.repositories.vrz_repository import vrz_repository
 from utils.logger import bot_logger
 
 
+# Order side that closes a position, and the sign of its PnL per unit move
+_EXIT_SIDE = {SIDE_BUY: SIDE_SELL, SIDE_SELL: SIDE_BUY}
+_PNL_SIGN = {SIDE_BUY: 1, SIDE_SELL: -1}
+
+
 class ExitEngine:
     """
     Exit management engine
     Handles partial exits at targets and stop loss trailing
     """
     
+    __slots__ = ()
+    
     def __init__(self):
         bot_logger.info("Exit Engine initialized")
     
@@ -30,28 +40,68 @@ class ExitEngine:
             Updated trade dictionary with exit actions
         """
         try:
-            bot_logger.debug(f"Managing exits for {trade['symbol']}: Price={current_price}")
+            bot_logger.debug("Managing exits for %s: Price=%s", trade['symbol'], current_price)
             
+            # One timestamp for every action taken on this tick
+            now = datetime.utcnow()
             actions = []
             
-            # Check if any targets are hit
-            for target in trade['targets']:
-                if target['level'] not in [e['target_level'] for e in trade.get('exit_details', [])]:
-                    # Target not yet hit
-                    if self._is_target_hit(current_price, target, trade['side']):
-                        # Execute partial exit
-                        exit_action = await self._execute_partial_exit(trade, target, current_price)
-                        if exit_action:
-                            actions.append(exit_action)
+            # Check if any targets not yet exited are hit
+            exited_levels = {e['target_level'] for e in trade.get('exit_details', ())}
+            
+            # Most ticks fall between the stop and the nearest trigger: nothing to do
+            down_trigger, up_trigger = self._exit_triggers(trade, exited_levels)
+            if down_trigger < current_price * _PNL_SIGN[trade['side']] < up_trigger:
+                return {'trade_id': trade.get('_id'), 'actions': [], 'timestamp': now}
             
-            # Check if stop loss is hit
-            if self._is_stop_loss_hit(current_price, trade['stop_loss'], trade['side']):
-                exit_action = await self._execute_stop_loss_exit(trade, current_price)
+            hit_targets = [
+                target for target in trade['targets']
+                if target['level'] not in exited_levels
+                and self._is_target_hit(current_price, target, trade['side'])
+            ]
+            
+            # Size each hit target against what the earlier ones leave open
+            exits = []
+            unallocated = trade['remaining_size']
+            for target in hit_targets:
+                order = self._prepare_partial_exit(trade, target, current_price, unallocated)
+                if order is None:
+                    break
+                unallocated -= order['size']
+                exits.append((target, order))
+            
+            # Submit all partial exit orders together
+            responses = await asyncio.gather(
+                *(delta_client.place_order(**order) for _, order in exits),
+                return_exceptions=True
+            )
+            
+            # Reconcile the open size from the orders that actually filled
+            remaining_size = trade['remaining_size']
+            for (target, order), order_response in zip(exits, responses):
+                if isinstance(order_response, BaseException):
+                    bot_logger.error(
+                        "Error executing partial exit: %s", order_response,
+                        exc_info=bot_logger.isEnabledFor(logging.DEBUG) and order_response
+                    )
+                    continue
+                exit_action = self._finalize_partial_exit(
+                    trade, target, current_price, order, order_response,
+                    remaining_size - order['size'], now
+                )
+                if exit_action:
+                    remaining_size = exit_action['remaining_quantity']
+                    actions.append(exit_action)
+            
+            # Check if stop loss is hit (closing only what the partial exits left)
+            if remaining_size > 0 and self._is_stop_loss_hit(current_price, trade['stop_loss'], trade['side']):
+                exit_action = await self._execute_stop_loss_exit(trade, current_price, remaining_size, now)
                 if exit_action:
+                    remaining_size = 0
                     actions.append(exit_action)
             
             # Trail stop loss after first target
-            if self._should_trail_stop(trade):
+            if remaining_size > 0 and self._should_trail_stop(trade):
                 new_stop = self._calculate_trailing_stop(trade, current_price)
                 if new_stop:
                     actions.append({
@@ -62,13 +112,42 @@ class ExitEngine:
             return {
                 'trade_id': trade.get('_id'),
                 'actions': actions,
-                'timestamp': datetime.utcnow()
+                'timestamp': now
             }
             
         except Exception as e:
-            bot_logger.error(f"Error managing exits: {str(e)}", exc_info=True)
+            bot_logger.error("Error managing exits: %s", e, exc_info=bot_logger.isEnabledFor(logging.DEBUG))
             return {'trade_id': trade.get('_id'), 'actions': [], 'error': str(e)}
     
+    def _exit_triggers(self, trade: Dict, exited_levels: Set) -> Tuple[float, float]:
+        """
+        Band of side-signed prices (price * PnL sign) where no exit can fire
+        
+        While down < signed price < up, no pending target, stop loss or
+        breakeven trail is triggered on this tick.
+        
+        Args:
+            trade: Trade dictionary from database
+            exited_levels: Target levels already exited
+        
+        Returns:
+            (down, up) signed trigger prices
+        """
+        sign = _PNL_SIGN[trade['side']]
+        up = min(
+            (sign * target['price'] for target in trade['targets']
+             if target['level'] not in exited_levels),
+            default=math.inf
+        )
+        down = sign * trade['stop_loss']
+        entry = sign * trade['entry_price']
+        
+        # Breakeven trail fires once price moves past entry
+        if down < entry and self._should_trail_stop(trade):
+            up = min(up, entry)
+        
+        return down, up
+    
     def _is_target_hit(self, current_price: float, target: Dict, side: str) -> bool:
         """Check if target price is hit"""
         target_price = target['price']
@@ -87,102 +166,113 @@ class ExitEngine:
         else:  # SIDE_SELL
             return current_price >= stop_loss
     
-    async def _execute_partial_exit(self, trade: Dict, target: Dict, current_price: float) -> Optional[Dict]:
-        """Execute partial exit at target"""
+    def _prepare_partial_exit(self, trade: Dict, target: Dict, current_price: float,
+                              remaining_size: int) -> Optional[Dict]:
+        """
+        Order parameters for a partial exit at target
+        
+        Args:
+            trade: Trade dictionary from database
+            target: Target being exited
+            current_price: Current market price
+            remaining_size: Contracts still open after earlier exits on this tick
+        
+        Returns:
+            place_order keyword arguments, or None when nothing is left to exit
+        """
+        if remaining_size < 1:
+            return None
+        
+        # Exit quantity is fixed per target when the signal is built
+        exit_quantity = target.get('exit_qty')
+        if exit_quantity is None:
+            # Trades opened before exit quantities were stored on targets
+            exit_quantity = int(trade['remaining_size'] * (target['exit_percentage'] / 100))
+        exit_quantity = max(1, min(exit_quantity, remaining_size))  # At least 1 contract
+        
+        bot_logger.info(
+            "Executing partial exit: %s T%s - %s contracts at %s",
+            trade['symbol'], target['level'], exit_quantity, current_price
+        )
+        
+        # Exit order on the opposite side
+        return {
+            'product_id': trade['product_id'],
+            'size': exit_quantity,
+            'side': _EXIT_SIDE[trade['side']],
+            'order_type': 'market_order'
+        }
+    
+    def _finalize_partial_exit(self, trade: Dict, target: Dict, current_price: float,
+                               order: Dict, order_response: Dict, remaining_size: int,
+                               now: Optional[datetime] = None) -> Optional[Dict]:
+        """Exit action for a placed partial exit order (None if it failed)"""
         try:
-            # Calculate exit quantity
-            exit_percentage = target['exit_percentage']
-            exit_quantity = int(trade['remaining_size'] * (exit_percentage / 100))
-            exit_quantity = max(1, exit_quantity)  # At least 1 contract
-            
-            bot_logger.info(
-                f"Executing partial exit: {trade['symbol']} T{target['level']} - "
-                f"{exit_quantity} contracts at {current_price}"
-            )
-            
-            # Place exit order (opposite side)
-            exit_side = SIDE_SELL if trade['side'] == SIDE_BUY else SIDE_BUY
-            
-            order_response = await delta_client.place_order(
-                product_id=trade['product_id'],
-                size=exit_quantity,
-                side=exit_side,
-                order_type='market_order'
-            )
-            
             if order_response.get('success'):
                 # Calculate PnL for this exit
-                entry_price = trade['entry_price']
-                if trade['side'] == SIDE_BUY:
-                    pnl = (current_price - entry_price) * exit_quantity
-                else:
-                    pnl = (entry_price - current_price) * exit_quantity
+                exit_quantity = order['size']
+                pnl = (current_price - trade['entry_price']) * exit_quantity * _PNL_SIGN[trade['side']]
                 
                 return {
                     'action': 'partial_exit',
                     'target_level': target['level'],
                     'exit_price': current_price,
                     'exit_quantity': exit_quantity,
-                    'remaining_quantity': trade['remaining_size'] - exit_quantity,
+                    'remaining_quantity': remaining_size,
                     'pnl': pnl,
                     'order_id': order_response.get('result', {}).get('id'),
-                    'timestamp': datetime.utcnow()
+                    'timestamp': now or datetime.utcnow()
                 }
             
             return None
             
         except Exception as e:
-            bot_logger.error(f"Error executing partial exit: {str(e)}", exc_info=True)
+            bot_logger.error("Error executing partial exit: %s", e, exc_info=bot_logger.isEnabledFor(logging.DEBUG))
             return None
     
-    async def _execute_stop_loss_exit(self, trade: Dict, current_price: float) -> Optional[Dict]:
-        """Execute stop loss exit"""
+    async def _execute_stop_loss_exit(self, trade: Dict, current_price: float, remaining_size: int,
+                                      now: Optional[datetime] = None) -> Optional[Dict]:
+        """Execute stop loss exit for the remaining_size contracts still open"""
         try:
             bot_logger.warning(
-                f"Stop Loss Hit: {trade['symbol']} - "
-                f"Closing {trade['remaining_size']} contracts at {current_price}"
+                "Stop Loss Hit: %s - Closing %s contracts at %s",
+                trade['symbol'], remaining_size, current_price
             )
             
             # Close entire remaining position
-            exit_side = SIDE_SELL if trade['side'] == SIDE_BUY else SIDE_BUY
-            
             order_response = await delta_client.place_order(
                 product_id=trade['product_id'],
-                size=trade['remaining_size'],
-                side=exit_side,
+                size=remaining_size,
+                side=_EXIT_SIDE[trade['side']],
                 order_type='market_order'
             )
             
             if order_response.get('success'):
                 # Calculate PnL
-                entry_price = trade['entry_price']
-                if trade['side'] == SIDE_BUY:
-                    pnl = (current_price - entry_price) * trade['remaining_size']
-                else:
-                    pnl = (entry_price - current_price) * trade['remaining_size']
+                pnl = (current_price - trade['entry_price']) * remaining_size * _PNL_SIGN[trade['side']]
                 
                 bot_logger.log_trade_exit(trade['symbol'], pnl, "Stop Loss")
                 
                 return {
                     'action': 'stop_loss_exit',
                     'exit_price': current_price,
-                    'exit_quantity': trade['remaining_size'],
+                    'exit_quantity': remaining_size,
                     'remaining_quantity': 0,
                     'pnl': pnl,
                     'order_id': order_response.get('result', {}).get('id'),
-                    'timestamp': datetime.utcnow()
+                    'timestamp': now or datetime.utcnow()
                 }
             
             return None
             
         except Exception as e:
-            bot_logger.error(f"Error executing stop loss exit: {str(e)}", exc_info=True)
+            bot_logger.error("Error executing stop loss exit: %s", e, exc_info=bot_logger.isEnabledFor(logging.DEBUG))
             return None
     
     def _should_trail_stop(self, trade: Dict) -> bool:
         """Check if stop loss should be trailed"""
         # Trail after first target is hit
-        exit_details = trade.get('exit_details', [])
+        exit_details = trade.get('exit_details', ())
         return len(exit_details) > 0 and trade['remaining_size'] > 0
     
     def _calculate_trailing_stop(self, trade: Dict, current_price: float) -> Optional[float]:
@@ -197,20 +287,20 @@ class ExitEngine:
                 if current_price > entry_price and current_stop < entry_price:
                     # Move to breakeven
                     new_stop = entry_price
-                    bot_logger.info(f"Trailing stop to breakeven: {new_stop}")
+                    bot_logger.info("Trailing stop to breakeven: %s", new_stop)
                     return new_stop
             else:  # SIDE_SELL
                 # For short, trail stop down
                 if current_price < entry_price and current_stop > entry_price:
                     # Move to breakeven
                     new_stop = entry_price
-                    bot_logger.info(f"Trailing stop to breakeven: {new_stop}")
+                    bot_logger.info("Trailing stop to breakeven: %s", new_stop)
                     return new_stop
             
             return None
             
         except Exception as e:
-            bot_logger.error(f"Error calculating trailing stop: {str(e)}", exc_info=True)
+            bot_logger.error("Error calculating trailing stop: %s", e, exc_info=bot_logger.isEnabledFor(logging.DEBUG))
             return None
     
     async def close_all_positions(self, symbol: str = None) -> List[Dict]:
@@ -226,29 +316,42 @@ class ExitEngine:
         try:
             positions = await delta_client.get_positions()
             closed_positions = []
+            now = datetime.utcnow()
+            
+            targets = [
+                position for position in positions
+                if not symbol or position.get('product', {}).get('symbol') == symbol
+            ]
             
-            for position in positions:
+            # Fire all closes together so an emergency exit costs one round-trip
+            responses = await asyncio.gather(
+                *(delta_client.close_position(position.get('product_id')) for position in targets),
+                return_exceptions=True
+            )
+            
+            for position, close_response in zip(targets, responses):
                 position_symbol = position.get('product', {}).get('symbol')
                 
-                if symbol and position_symbol != symbol:
+                if isinstance(close_response, BaseException):
+                    bot_logger.error(
+                        "Error closing position %s: %s", position_symbol, close_response,
+                        exc_info=bot_logger.isEnabledFor(logging.DEBUG) and close_response
+                    )
                     continue
                 
-                product_id = position.get('product_id')
-                close_response = await delta_client.close_position(product_id)
-                
                 if close_response.get('success'):
                     closed_positions.append({
                         'symbol': position_symbol,
-                        'product_id': product_id,
+                        'product_id': position.get('product_id'),
                         'size': position.get('size'),
-                        'timestamp': datetime.utcnow()
+                        'timestamp': now
                     })
-                    bot_logger.warning(f"Emergency closed position: {position_symbol}")
+                    bot_logger.warning("Emergency closed position: %s", position_symbol)
             
             return closed_positions
             
         except Exception as e:
-            bot_logger.error(f"Error closing all positions: {str(e)}", exc_info=True)
+            bot_logger.error("Error closing all positions: %s", e, exc_info=bot_logger.isEnabledFor(logging.DEBUG))
             return []
 
 
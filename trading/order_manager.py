@@ -1,12 +1,31 @@
 """
 Order Manager - Handles order placement, modification, and tracking
 """
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime
-from api.delta_client import delta_client
+import asyncio
+import time
+from api.delta_client import delta_client, MAX_BATCH_ORDERS
 from utils.logger import bot_logger
 
 
+# Cancels in flight at once, to stay inside the exchange rate limit
+MAX_CONCURRENT_CANCELS = 10
+
+# How long an open-orders listing is reused before asking the exchange again
+ORDERS_CACHE_TTL_SECONDS = 0.5
+
+# Fixed part of the stop loss attached to entry orders
+STOP_LOSS_ORDER_TEMPLATE = {'order_type': 'stop_market_order', 'trail_amount': '0'}
+
+
+def _stop_loss_order(stop_loss: Optional[float]) -> Optional[Dict]:
+    """Stop loss order parameters for stop_loss (None if there is no stop)"""
+    if not stop_loss:
+        return None
+    return {**STOP_LOSS_ORDER_TEMPLATE, 'stop_price': str(stop_loss)}
+
+
 class OrderManager:
     """
     Manages order lifecycle - placement, modification, cancellation, and tracking
@@ -14,6 +33,10 @@ class OrderManager:
     
     def __init__(self):
         self.active_orders = {}  # Track active orders
+        self._placed_ids: Set[str] = set()  # IDs of tracked orders still 'placed'
+        # Open orders per product: (monotonic fetch time, orders), and fetches in flight
+        self._orders_cache: Dict[Optional[int], Tuple[float, List[Dict]]] = {}
+        self._orders_inflight: Dict[Optional[int], asyncio.Future] = {}
         bot_logger.info("Order Manager initialized")
     
     async def place_market_order(self, 
@@ -34,15 +57,9 @@ class OrderManager:
             Order response dictionary or None
         """
         try:
-            bot_logger.info(f"Placing market order: Product={product_id}, Side={side}, Size={size}")
-            
-            stop_loss_order = None
-            if stop_loss:
-                stop_loss_order = {
-                    'order_type': 'stop_market_order',
-                    'stop_price': str(stop_loss),
-                    'trail_amount': '0'
-                }
+            bot_logger.info("Placing market order: Product=%s, Side=%s, Size=%s", product_id, side, size)
+            
+            stop_loss_order = _stop_loss_order(stop_loss)
             
             response = await delta_client.place_order(
                 product_id=product_id,
@@ -51,6 +68,7 @@ class OrderManager:
                 order_type='market_order',
                 stop_loss_order=stop_loss_order
             )
+            self._invalidate_orders(product_id)
             
             if response.get('success'):
                 order = response.get('result', {})
@@ -65,11 +83,12 @@ class OrderManager:
                     'status': 'placed',
                     'timestamp': datetime.utcnow()
                 }
+                self._placed_ids.add(order_id)
                 
-                bot_logger.info(f"Market order placed successfully: Order ID={order_id}")
+                bot_logger.info("Market order placed successfully: Order ID=%s", order_id)
                 return response
             else:
-                bot_logger.error(f"Market order failed: {response}")
+                bot_logger.error("Market order failed: %s", response)
                 return None
                 
         except Exception as e:
@@ -97,17 +116,11 @@ class OrderManager:
         """
         try:
             bot_logger.info(
-                f"Placing limit order: Product={product_id}, Side={side}, "
-                f"Size={size}, Price={limit_price}"
+                "Placing limit order: Product=%s, Side=%s, Size=%s, Price=%s",
+                product_id, side, size, limit_price
             )
             
-            stop_loss_order = None
-            if stop_loss:
-                stop_loss_order = {
-                    'order_type': 'stop_market_order',
-                    'stop_price': str(stop_loss),
-                    'trail_amount': '0'
-                }
+            stop_loss_order = _stop_loss_order(stop_loss)
             
             response = await delta_client.place_order(
                 product_id=product_id,
@@ -117,6 +130,7 @@ class OrderManager:
                 limit_price=limit_price,
                 stop_loss_order=stop_loss_order
             )
+            self._invalidate_orders(product_id)
             
             if response.get('success'):
                 order = response.get('result', {})
@@ -131,11 +145,12 @@ class OrderManager:
                     'status': 'placed',
                     'timestamp': datetime.utcnow()
                 }
+                self._placed_ids.add(order_id)
                 
-                bot_logger.info(f"Limit order placed successfully: Order ID={order_id}")
+                bot_logger.info("Limit order placed successfully: Order ID=%s", order_id)
                 return response
             else:
-                bot_logger.error(f"Limit order failed: {response}")
+                bot_logger.error("Limit order failed: %s", response)
                 return None
                 
         except Exception as e:
@@ -153,18 +168,17 @@ class OrderManager:
             True if successful, False otherwise
         """
         try:
-            bot_logger.info(f"Cancelling order: {order_id}")
+            bot_logger.info("Cancelling order: %s", order_id)
             
             response = await delta_client.cancel_order(order_id)
             
             if response.get('success'):
-                if order_id in self.active_orders:
-                    self.active_orders[order_id]['status'] = 'cancelled'
+                self._mark_cancelled(order_id)
                 
-                bot_logger.info(f"Order cancelled successfully: {order_id}")
+                bot_logger.info("Order cancelled successfully: %s", order_id)
                 return True
             else:
-                bot_logger.error(f"Order cancellation failed: {response}")
+                bot_logger.error("Order cancellation failed: %s", response)
                 return False
                 
         except Exception as e:
@@ -182,8 +196,20 @@ class OrderManager:
             List of open orders
         """
         try:
-            orders = await delta_client.get_orders(product_id)
-            return orders
+            cached = self._orders_cache.get(product_id)
+            if cached is not None and time.monotonic() - cached[0] < ORDERS_CACHE_TTL_SECONDS:
+                return list(cached[1])
+            
+            # Concurrent callers share one request per product
+            fetch = self._orders_inflight.get(product_id)
+            if fetch is None:
+                fetch = asyncio.ensure_future(delta_client.get_orders(product_id))
+                self._orders_inflight[product_id] = fetch
+                fetch.add_done_callback(lambda done: self._store_orders(product_id, done))
+            
+            # Each caller gets its own list so none can alter what the others see
+            orders = await asyncio.shield(fetch)
+            return list(orders)
             
         except Exception as e:
             bot_logger.error(f"Error getting order status: {str(e)}", exc_info=True)
@@ -201,29 +227,99 @@ class OrderManager:
         """
         try:
             orders = await delta_client.get_orders(product_id)
-            cancelled_count = 0
             
+            # The batch endpoint takes one product per request
+            order_ids_by_product: Dict[int, List[str]] = {}
             for order in orders:
-                order_id = order.get('id')
-                if await self.cancel_order(order_id):
-                    cancelled_count += 1
+                order_ids_by_product.setdefault(order.get('product_id'), []).append(order.get('id'))
             
-            bot_logger.info(f"Cancelled {cancelled_count} orders")
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_CANCELS)
+            counts = await asyncio.gather(*(
+                self._cancel_batch(order_product_id, order_ids[start:start + MAX_BATCH_ORDERS], semaphore)
+                for order_product_id, order_ids in order_ids_by_product.items()
+                for start in range(0, len(order_ids), MAX_BATCH_ORDERS)
+            ))
+            cancelled_count = sum(counts)
+            
+            bot_logger.info("Cancelled %d orders", cancelled_count)
             return cancelled_count
             
         except Exception as e:
             bot_logger.error(f"Error cancelling all orders: {str(e)}", exc_info=True)
             return 0
     
+    async def _cancel_batch(self, product_id: int, order_ids: List[str],
+                            semaphore: asyncio.Semaphore) -> int:
+        """
+        Cancel one product's orders in a single request
+        
+        Falls back to concurrent per-order cancels if the batch request fails.
+        
+        Args:
+            product_id: Product the orders belong to
+            order_ids: Up to MAX_BATCH_ORDERS order IDs
+            semaphore: Limits requests in flight
+        
+        Returns:
+            Number of orders cancelled
+        """
+        try:
+            async with semaphore:
+                response = await delta_client.batch_cancel_orders(product_id, order_ids)
+            
+            if response.get('success'):
+                for order_id in order_ids:
+                    self._mark_cancelled(order_id)
+                return len(order_ids)
+            
+            bot_logger.warning("Batch cancel failed, cancelling individually: %s", response)
+            
+        except Exception as e:
+            bot_logger.warning("Batch cancel failed, cancelling individually: %s", e)
+        
+        async def cancel(order_id: str) -> bool:
+            async with semaphore:
+                return await self.cancel_order(order_id)
+        
+        # cancel_order logs and reports its own failures
+        results = await asyncio.gather(*(cancel(order_id) for order_id in order_ids), return_exceptions=True)
+        return sum(1 for result in results if result is True)
+    
+    def _mark_cancelled(self, order_id: str):
+        """Flag a tracked order as cancelled"""
+        order = self.active_orders.get(order_id)
+        if order is not None:
+            order['status'] = 'cancelled'
+        self._placed_ids.discard(order_id)
+        self._invalidate_orders(order['product_id'] if order is not None else None)
+    
+    def _store_orders(self, product_id: Optional[int], fetch: asyncio.Future):
+        """Cache a finished open-orders fetch unless it was invalidated meanwhile"""
+        if self._orders_inflight.get(product_id) is not fetch:
+            return
+        del self._orders_inflight[product_id]
+        if not fetch.cancelled() and fetch.exception() is None:
+            self._orders_cache[product_id] = (time.monotonic(), fetch.result())
+    
+    def _invalidate_orders(self, product_id: Optional[int] = None):
+        """Drop cached open orders for a product (None: every product)"""
+        if product_id is None:
+            self._orders_cache.clear()
+            self._orders_inflight.clear()
+        else:
+            # The all-products listing includes this product too
+            for key in (product_id, None):
+                self._orders_cache.pop(key, None)
+                self._orders_inflight.pop(key, None)
+    
     def get_active_order_count(self) -> int:
         """Get count of active orders"""
-        return len([o for o in self.active_orders.values() if o['status'] == 'placed'])
+        return len(self._placed_ids)
     
     def clear_completed_orders(self):
         """Clear completed/cancelled orders from tracking"""
         self.active_orders = {
-            k: v for k, v in self.active_orders.items() 
-            if v['status'] == 'placed'
+            order_id: self.active_orders[order_id] for order_id in self._placed_ids
         }
         bot_logger.debug("Cleared completed orders from tracking")
 
@@ -1,14 +1,27 @@
 """
 Position Manager - Tracks and manages open positions
 """
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 from datetime import datetime
+import asyncio
+from bson import ObjectId
+from pymongo import ReturnDocument
 from api.delta_client import delta_client
-from database.models import Trade
+from database.models import Trade, as_object_id
 from database.mongodb_client import mongodb_client
 from utils.logger import bot_logger
 
 
+# Fields sync_with_exchange compares against the exchange
+SYNC_PROJECTION = {'product_id': 1, 'remaining_size': 1, 'symbol': 1}
+
+# Fields get_position_summary returns for recent closed positions
+CLOSED_SUMMARY_PROJECTION = {
+    'symbol': 1, 'side': 1, 'entry_price': 1, 'position_size': 1,
+    'pnl': 1, 'entry_time': 1, 'exit_time': 1
+}
+
+
 class PositionManager:
     """
     Manages trading positions - tracking, updates, and synchronization
@@ -21,6 +34,7 @@ class PositionManager:
     async def initialize(self):
         """Initialize position manager with database connection"""
         self.positions_collection = mongodb_client.get_collection('trades')
+        await self._settle_stale_close_claims()
     
     async def create_position(self, entry_signal: Dict, order_response: Dict) -> Optional[str]:
         """
@@ -66,31 +80,34 @@ class PositionManager:
             bot_logger.error(f"Error creating position: {str(e)}", exc_info=True)
             return None
     
-    async def get_position(self, position_id: str) -> Optional[Dict]:
+    async def get_position(self, position_id: Union[str, ObjectId],
+                           projection: Optional[Dict] = None) -> Optional[Dict]:
         """
         Get position by ID
         
         Args:
             position_id: Position ID
+            projection: Fields to return (None for the whole document)
         
         Returns:
             Position dictionary or None
         """
         try:
-            from bson import ObjectId
-            position = await self.positions_collection.find_one({'_id': ObjectId(position_id)})
+            position = await self.positions_collection.find_one({'_id': as_object_id(position_id)}, projection)
             return position
             
         except Exception as e:
             bot_logger.error(f"Error getting position: {str(e)}", exc_info=True)
             return None
     
-    async def get_open_positions(self, telegram_user_id: Optional[int] = None) -> List[Dict]:
+    async def get_open_positions(self, telegram_user_id: Optional[int] = None,
+                                 projection: Optional[Dict] = None) -> List[Dict]:
         """
         Get all open positions
         
         Args:
             telegram_user_id: Filter by user ID (None for all users)
+            projection: Fields to return (None for whole documents)
         
         Returns:
             List of open positions
@@ -100,7 +117,7 @@ class PositionManager:
             if telegram_user_id:
                 query['telegram_user_id'] = telegram_user_id
             
-            cursor = self.positions_collection.find(query)
+            cursor = self.positions_collection.find(query, projection)
             positions = await cursor.to_list(length=100)
             
             return positions
@@ -109,7 +126,7 @@ class PositionManager:
             bot_logger.error(f"Error getting open positions: {str(e)}", exc_info=True)
             return []
     
-    async def update_position_exit(self, position_id: str, exit_action: Dict) -> bool:
+    async def update_position_exit(self, position_id: Union[str, ObjectId], exit_action: Dict) -> bool:
         """
         Update position with exit details
         
@@ -121,43 +138,38 @@ class PositionManager:
             True if successful
         """
         try:
-            from bson import ObjectId
-            
-            position = await self.get_position(position_id)
+            # Append the exit and apply its size and PnL in one atomic round-trip;
+            # $inc keeps concurrent exits from overwriting each other's remaining size
+            object_id = as_object_id(position_id)
+            position = await self.positions_collection.find_one_and_update(
+                {'_id': object_id},
+                {
+                    '$push': {'exit_details': exit_action},
+                    '$inc': {
+                        'remaining_size': -exit_action.get('exit_quantity', 0),
+                        'pnl': exit_action.get('pnl', 0)
+                    }
+                },
+                return_document=ReturnDocument.AFTER
+            )
             if not position:
                 return False
             
-            # Update exit details
-            exit_details = position.get('exit_details', [])
-            exit_details.append(exit_action)
-            
-            # Update remaining size
-            remaining_size = exit_action.get('remaining_quantity', 0)
+            remaining_size = position.get('remaining_size', 0)
+            status = position.get('status')
             
-            # Calculate total PnL
-            total_pnl = position.get('pnl', 0) + exit_action.get('pnl', 0)
-            
-            # Determine if position is fully closed
-            status = 'closed' if remaining_size == 0 else 'open'
-            
-            update_fields = {
-                'exit_details': exit_details,
-                'remaining_size': remaining_size,
-                'pnl': total_pnl
-            }
-            
-            if status == 'closed':
-                update_fields['status'] = 'closed'
-                update_fields['exit_time'] = datetime.utcnow()
-            
-            await self.positions_collection.update_one(
-                {'_id': ObjectId(position_id)},
-                {'$set': update_fields}
-            )
+            # Close from the stored size; the filter makes only one exit do it
+            if remaining_size <= 0:
+                await self.positions_collection.update_one(
+                    {'_id': object_id, 'remaining_size': {'$lte': 0}, 'status': {'$ne': 'closed'}},
+                    {'$set': {'remaining_size': 0, 'status': 'closed', 'exit_time': datetime.utcnow()}}
+                )
+                remaining_size = 0
+                status = 'closed'
             
             bot_logger.info(
-                f"Position updated: {position_id} - "
-                f"Remaining: {remaining_size}, PnL: {total_pnl:.2f}, Status: {status}"
+                "Position updated: %s - Remaining: %s, PnL: %.2f, Status: %s",
+                position_id, remaining_size, position.get('pnl', 0), status
             )
             
             return True
@@ -166,7 +178,7 @@ class PositionManager:
             bot_logger.error(f"Error updating position exit: {str(e)}", exc_info=True)
             return False
     
-    async def update_stop_loss(self, position_id: str, new_stop_loss: float) -> bool:
+    async def update_stop_loss(self, position_id: Union[str, ObjectId], new_stop_loss: float) -> bool:
         """
         Update position stop loss (for trailing)
         
@@ -178,10 +190,8 @@ class PositionManager:
             True if successful
         """
         try:
-            from bson import ObjectId
-            
             await self.positions_collection.update_one(
-                {'_id': ObjectId(position_id)},
+                {'_id': as_object_id(position_id)},
                 {'$set': {'stop_loss': new_stop_loss}}
             )
             
@@ -203,18 +213,34 @@ class PositionManager:
             Summary dictionary
         """
         try:
-            open_positions = await self.get_open_positions(telegram_user_id)
+            # Last 10 closed positions and their statistics in one aggregation
+            pnl = {'$ifNull': ['$pnl', 0]}
+            pipeline = [
+                {'$match': {'telegram_user_id': telegram_user_id, 'status': 'closed'}},
+                {'$sort': {'exit_time': -1}},
+                {'$limit': 10},
+                {'$project': CLOSED_SUMMARY_PROJECTION},
+                {'$group': {
+                    '_id': None,
+                    'recent': {'$push': '$$ROOT'},
+                    'total_pnl': {'$sum': pnl},
+                    'wins': {'$sum': {'$cond': [{'$gt': [pnl, 0]}, 1, 0]}},
+                    'losses': {'$sum': {'$cond': [{'$lt': [pnl, 0]}, 1, 0]}}
+                }}
+            ]
+            
+            open_positions, groups = await asyncio.gather(
+                self.get_open_positions(telegram_user_id),
+                self.positions_collection.aggregate(pipeline).to_list(length=1)
+            )
             
-            # Get closed positions (last 10)
-            closed_positions = await self.positions_collection.find({
-                'telegram_user_id': telegram_user_id,
-                'status': 'closed'
-            }).sort('exit_time', -1).limit(10).to_list(length=10)
+            stats = groups[0] if groups else {}
+            closed_positions = stats.get('recent', [])
             
             # Calculate statistics
-            total_pnl = sum(p.get('pnl', 0) for p in closed_positions)
-            winning_trades = len([p for p in closed_positions if p.get('pnl', 0) > 0])
-            losing_trades = len([p for p in closed_positions if p.get('pnl', 0) < 0])
+            total_pnl = stats.get('total_pnl', 0)
+            winning_trades = stats.get('wins', 0)
+            losing_trades = stats.get('losses', 0)
             win_rate = (winning_trades / len(closed_positions) * 100) if closed_positions else 0
             
             return {
@@ -243,43 +269,43 @@ class PositionManager:
             List of discrepancies found
         """
         try:
-            # Get positions from exchange
-            exchange_positions = await delta_client.get_positions()
+            # Fetch exchange and local positions together
+            exchange_positions, local_positions = await asyncio.gather(
+                delta_client.get_positions(),
+                self.get_open_positions(telegram_user_id, SYNC_PROJECTION)
+            )
             
-            # Get local open positions
-            local_positions = await self.get_open_positions(telegram_user_id)
+            # Exchange positions by product (first one wins, as the exchange lists them)
+            exchange_by_product = {}
+            for ex_pos in exchange_positions:
+                exchange_by_product.setdefault(ex_pos.get('product_id'), ex_pos)
             
             discrepancies = []
             
             # Check for positions that exist locally but not on exchange
             for local_pos in local_positions:
-                product_id = local_pos['product_id']
-                found = False
-                
-                for ex_pos in exchange_positions:
-                    if ex_pos.get('product_id') == product_id:
-                        found = True
-                        
-                        # Check if sizes match
-                        local_size = local_pos['remaining_size']
-                        exchange_size = abs(int(ex_pos.get('size', 0)))
-                        
-                        if local_size != exchange_size:
-                            discrepancies.append({
-                                'type': 'size_mismatch',
-                                'position_id': str(local_pos['_id']),
-                                'symbol': local_pos['symbol'],
-                                'local_size': local_size,
-                                'exchange_size': exchange_size
-                            })
-                        break
+                ex_pos = exchange_by_product.get(local_pos['product_id'])
                 
-                if not found:
+                if ex_pos is None:
                     discrepancies.append({
                         'type': 'missing_on_exchange',
                         'position_id': str(local_pos['_id']),
                         'symbol': local_pos['symbol']
                     })
+                    continue
+                
+                # Check if sizes match
+                local_size = local_pos['remaining_size']
+                exchange_size = abs(int(ex_pos.get('size', 0)))
+                
+                if local_size != exchange_size:
+                    discrepancies.append({
+                        'type': 'size_mismatch',
+                        'position_id': str(local_pos['_id']),
+                        'symbol': local_pos['symbol'],
+                        'local_size': local_size,
+                        'exchange_size': exchange_size
+                    })
             
             if discrepancies:
                 bot_logger.warning(f"Found {len(discrepancies)} position discrepancies")
@@ -290,7 +316,7 @@ class PositionManager:
             bot_logger.error(f"Error syncing with exchange: {str(e)}", exc_info=True)
             return []
     
-    async def close_position(self, position_id: str, reason: str = "Manual close") -> bool:
+    async def close_position(self, position_id: Union[str, ObjectId], reason: str = "Manual close") -> bool:
         """
         Manually close a position
         
@@ -302,37 +328,95 @@ class PositionManager:
             True if successful
         """
         try:
-            from bson import ObjectId
+            oid = as_object_id(position_id)
             
-            position = await self.get_position(position_id)
-            if not position or position['status'] != 'open':
+            # Claim the open position in one step so concurrent closes can't both proceed
+            position = await self.positions_collection.find_one_and_update(
+                {'_id': oid, 'status': 'open'},
+                {'$set': {'status': 'closing'}},
+                projection={'product_id': 1}
+            )
+            if not position:
                 bot_logger.warning(f"Position not found or already closed: {position_id}")
                 return False
             
-            # Close position on exchange
-            close_response = await delta_client.close_position(position['product_id'])
+            # Close position on exchange. A cancellation leaves the claim for the
+            # startup sweep: the request may already have reached the exchange.
+            try:
+                close_response = await delta_client.close_position(position['product_id'])
+            except Exception:
+                # Timeout or transport error: the close may still have gone through
+                await self._settle_close_claims({oid: position['product_id']})
+                raise
+            
+            if not close_response.get('success'):
+                # A definite failure, but 'Position not found' means it is already flat
+                await self._settle_close_claims({oid: position['product_id']})
+                return False
             
-            if close_response.get('success'):
-                # Update database
-                await self.positions_collection.update_one(
-                    {'_id': ObjectId(position_id)},
-                    {
-                        '$set': {
-                            'status': 'closed',
-                            'exit_time': datetime.utcnow(),
-                            'remaining_size': 0
-                        }
-                    }
-                )
-                
-                bot_logger.info(f"Position closed: {position_id} - Reason: {reason}")
-                return True
+            await self._finish_close(oid)
             
-            return False
+            bot_logger.info(f"Position closed: {position_id} - Reason: {reason}")
+            return True
             
         except Exception as e:
             bot_logger.error(f"Error closing position: {str(e)}", exc_info=True)
             return False
+    
+    async def _finish_close(self, oid: ObjectId):
+        """Mark a position claimed by close_position as closed"""
+        await self.positions_collection.update_one(
+            {'_id': oid, 'status': 'closing'},
+            {
+                '$set': {
+                    'status': 'closed',
+                    'exit_time': datetime.utcnow(),
+                    'remaining_size': 0
+                }
+            }
+        )
+    
+    async def _settle_close_claims(self, claims: Dict[ObjectId, int]):
+        """
+        Resolve 'closing' claims against the exchange
+        
+        A claim whose product still has an open exchange position goes back to
+        'open'; one whose product is flat is marked closed. If the exchange
+        can't be read, the claims stay 'closing' so nothing is revived blindly.
+        
+        Args:
+            claims: Claimed position _id -> product_id
+        """
+        try:
+            exchange_positions = await delta_client.get_positions()
+        except Exception as e:
+            bot_logger.error(f"Could not check exchange for closing positions: {str(e)}")
+            return
+        
+        open_products = {
+            position.get('product_id') for position in exchange_positions
+            if float(position.get('size', 0) or 0) != 0
+        }
+        
+        for oid, product_id in claims.items():
+            if product_id in open_products:
+                await self.positions_collection.update_one(
+                    {'_id': oid, 'status': 'closing'},
+                    {'$set': {'status': 'open'}}
+                )
+            else:
+                await self._finish_close(oid)
+    
+    async def _settle_stale_close_claims(self):
+        """Settle positions left 'closing' by a close interrupted before shutdown"""
+        try:
+            cursor = self.positions_collection.find({'status': 'closing'}, {'product_id': 1})
+            stale = await cursor.to_list(length=None)
+            if stale:
+                bot_logger.warning(f"Settling {len(stale)} positions left closing by a previous run")
+                await self._settle_close_claims({doc['_id']: doc['product_id'] for doc in stale})
+        except Exception as e:
+            bot_logger.error(f"Error settling stale close claims: {str(e)}", exc_info=True)
 
 
 # Global position manager instance
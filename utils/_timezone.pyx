@@ -0,0 +1,43 @@
+# cython: language_level=3
+"""
+Cython UTC/IST conversions
+
+Optional: utils.timezone_helper uses these when a compiled module is present
+and otherwise keeps its pure-Python functions. Build in place with:
+
+    cythonize -i -3 utils/_timezone.pyx
+"""
+from cpython.datetime cimport datetime, datetime_tzinfo, import_datetime
+
+import_datetime()
+
+# tzinfo singletons from utils.timezone_helper (identity checks rely on them)
+cdef object _utc = None
+cdef object _ist = None
+
+
+def configure(utc, ist):
+    """Bind the UTC and IST tzinfo objects the conversions use"""
+    global _utc, _ist
+    _utc = utc
+    _ist = ist
+
+
+cpdef object utc_to_ist(datetime utc_time):
+    """Convert UTC datetime to IST (IST-aware input is returned as is)"""
+    cdef object tz = datetime_tzinfo(utc_time)
+    if tz is _ist:
+        return utc_time
+    if tz is None:
+        utc_time = utc_time.replace(tzinfo=_utc)
+    return utc_time.astimezone(_ist)
+
+
+cpdef object ist_to_utc(datetime ist_time):
+    """Convert IST datetime to UTC (UTC-aware input is returned as is)"""
+    cdef object tz = datetime_tzinfo(ist_time)
+    if tz is _utc:
+        return ist_time
+    if tz is None:
+        ist_time = ist_time.replace(tzinfo=_ist)
+    return ist_time.astimezone(_utc)
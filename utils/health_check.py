@@ -1,19 +1,41 @@
 """
 Health check HTTP server for UptimeRobot monitoring
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from typing import Dict
 from datetime import datetime
+import json
+import time
 
+try:
+    import orjson  # noqa: F401  (required by ORJSONResponse)
+    from fastapi.responses import ORJSONResponse as HealthResponse
+except ImportError:
+    from fastapi.responses import JSONResponse as HealthResponse
 
-app = FastAPI(title="Delta VRZ Bot Health Check")
+
+app = FastAPI(title="Delta VRZ Bot Health Check", default_response_class=HealthResponse)
+
+# /ping never changes: serialize it once
+_PONG = json.dumps({"pong": True}, separators=(",", ":")).encode()
+
+# Last (epoch second, ISO timestamp) served, shared by the endpoints
+_iso_cache = [0, ""]
+
+
+def _iso_now() -> str:
+    """Current UTC time as an ISO string, formatted at most once per second"""
+    second = int(time.time())
+    if second != _iso_cache[0]:
+        _iso_cache[:] = [second, datetime.utcfromtimestamp(second).isoformat()]
+    return _iso_cache[1]
 
 
 class HealthCheckServer:
     """Health check endpoints for monitoring"""
     
     def __init__(self):
-        self.start_time = datetime.utcnow()
+        self.start_monotonic = time.monotonic()
         self.bot_status = "starting"
         self.delta_api_status = "unknown"
         self.mongodb_status = "unknown"
@@ -42,14 +64,14 @@ async def root_health_check() -> Dict:
     return {
         "status": "alive",
         "bot_status": health_checker.bot_status,
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": _iso_now()
     }
 
 
 @app.get("/health")
 async def detailed_health_check() -> Dict:
     """Detailed health check with component status"""
-    uptime = (datetime.utcnow() - health_checker.start_time).total_seconds()
+    uptime = time.monotonic() - health_checker.start_monotonic
     
     return {
         "status": "healthy" if health_checker.bot_status == "running" else "degraded",
@@ -62,12 +84,12 @@ async def detailed_health_check() -> Dict:
         "metrics": {
             "active_positions": health_checker.active_positions_count
         },
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": _iso_now()
     }
 
 
 @app.get("/ping")
-async def ping() -> Dict:
+async def ping() -> Response:
     """Simple ping endpoint"""
-    return {"pong": True}
+    return Response(content=_PONG, media_type="application/json")
   
@@ -1,39 +1,116 @@
 """
 Comprehensive logging system with Telegram integration
 """
+import asyncio
+import atexit
 import logging
+import queue
 import sys
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from typing import Optional
 from pathlib import Path
 
 
+# Size-based rollover for the daily log file
+LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+LOG_FILE_BACKUPS = 5
+
+# Telegram alerts: message length limit, queued records kept, pacing
+TELEGRAM_MESSAGE_CHARS = 4000
+TELEGRAM_QUEUE_SIZE = 256
+TELEGRAM_SEND_INTERVAL = 0.25
+TELEGRAM_SEND_ATTEMPTS = 4
+
+
+# Records never print thread or process details; skip collecting them
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
+# Calls go through BotLogger's wrappers, so caller lookup would only ever
+# find the wrapper; skip the per-record stack walk
+logging._srcfile = None
+
+
+class SecondCachedFormatter(logging.Formatter):
+    """Formatter that renders asctime once per second (datefmt has no sub-second fields)"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._time_cache = (None, "")
+    
+    def formatTime(self, record, datefmt=None):
+        second = int(record.created)
+        if second != self._time_cache[0]:
+            self._time_cache = (second, super().formatTime(record, datefmt))
+        return self._time_cache[1]
+
+
 class TelegramLogHandler(logging.Handler):
-    """Custom handler to send critical logs to Telegram"""
+    """
+    Custom handler to send critical logs to Telegram
+    
+    Records are queued (bounded, dropped when full) and one task per event
+    loop sends them, joining queued records into as few messages as fit.
+    """
     
     def __init__(self, bot=None, chat_id=None):
         super().__init__()
         self.bot = bot
         self.chat_id = chat_id
+        self._queue: Optional[asyncio.Queue] = None
+        self._sender: Optional[asyncio.Task] = None
     
     def emit(self, record):
         if self.bot and self.chat_id:
             try:
-                log_message = self.format(record)
-                import asyncio
+                log_message = f"🔴 {self.format(record)}"[:TELEGRAM_MESSAGE_CHARS]
+                try:
+                    asyncio.get_running_loop()
+                except RuntimeError:
+                    return  # Not on the event loop thread
+                
+                if self._sender is None or self._sender.done():
+                    self._queue = asyncio.Queue(maxsize=TELEGRAM_QUEUE_SIZE)
+                    self._sender = asyncio.create_task(self._send_queued())
+                
                 try:
-                    loop = asyncio.get_event_loop()
-                    if loop.is_running():
-                        asyncio.create_task(
-                            self.bot.send_message(
-                                chat_id=self.chat_id,
-                                text=f"🔴 {log_message[:4000]}"
-                            )
-                        )
-                except:
+                    self._queue.put_nowait(log_message)
+                except asyncio.QueueFull:
                     pass
             except:
                 pass
+    
+    async def _send_queued(self):
+        """Send queued records, batched up to one Telegram message each"""
+        carry = None
+        while True:
+            message = carry if carry is not None else await self._queue.get()
+            carry = None
+            batch = [message]
+            size = len(message)
+            
+            while not self._queue.empty():
+                message = self._queue.get_nowait()
+                if size + 1 + len(message) > TELEGRAM_MESSAGE_CHARS:
+                    carry = message
+                    break
+                batch.append(message)
+                size += 1 + len(message)
+            
+            text = "\n".join(batch)
+            backoff = TELEGRAM_SEND_INTERVAL
+            for _ in range(TELEGRAM_SEND_ATTEMPTS):
+                try:
+                    await self.bot.send_message(chat_id=self.chat_id, text=text)
+                    break
+                except Exception:
+                    # Rate limited or unreachable: back off, give up after a few tries
+                    backoff *= 2
+                    await asyncio.sleep(backoff)
+            
+            await asyncio.sleep(TELEGRAM_SEND_INTERVAL)
 
 
 class BotLogger:
@@ -51,53 +128,70 @@ class BotLogger:
         # File handler
         log_dir = Path("logs")
         log_dir.mkdir(exist_ok=True)
-        file_handler = logging.FileHandler(
-            log_dir / f"bot_{datetime.now().strftime('%Y%m%d')}.log"
+        file_handler = RotatingFileHandler(
+            log_dir / f"bot_{datetime.now().strftime('%Y%m%d')}.log",
+            maxBytes=LOG_FILE_MAX_BYTES,
+            backupCount=LOG_FILE_BACKUPS,
+            delay=True
         )
         file_handler.setLevel(logging.DEBUG)
         
-        # Formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s',
+        # Formatter, shared by both handlers on the listener thread
+        formatter = SecondCachedFormatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         
         console_handler.setFormatter(formatter)
         file_handler.setFormatter(formatter)
         
-        self.logger.addHandler(console_handler)
-        self.logger.addHandler(file_handler)
+        # Console and file writes happen on a listener thread; logging calls
+        # on the event loop only enqueue the record
+        self._queue = queue.SimpleQueue()
+        self.logger.addHandler(QueueHandler(self._queue))
+        self._listener = QueueListener(
+            self._queue, console_handler, file_handler, respect_handler_level=True
+        )
+        self._listener.start()
+        atexit.register(self._listener.stop)
         
         self.telegram_handler: Optional[TelegramLogHandler] = None
     
     def add_telegram_handler(self, bot, chat_id: str):
-        """Add Telegram logging handler"""
+        """Add Telegram logging handler (attached directly: it schedules sends on the event loop)"""
         self.telegram_handler = TelegramLogHandler(bot, chat_id)
         self.telegram_handler.setLevel(logging.WARNING)
         formatter = logging.Formatter('%(levelname)s: %(message)s')
         self.telegram_handler.setFormatter(formatter)
         self.logger.addHandler(self.telegram_handler)
     
-    def debug(self, message: str):
-        self.logger.debug(message)
+    def isEnabledFor(self, level: int) -> bool:
+        """Check whether messages at level would be emitted (guards costly formatting)"""
+        return self.logger.isEnabledFor(level)
+    
+    def debug(self, message: str, *args):
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(message, *args)
     
-    def info(self, message: str):
-        self.logger.info(message)
+    def info(self, message: str, *args):
+        self.logger.info(message, *args)
     
-    def warning(self, message: str):
-        self.logger.warning(message)
+    def warning(self, message: str, *args):
+        self.logger.warning(message, *args)
     
-    def error(self, message: str, exc_info=False):
-        self.logger.error(message, exc_info=exc_info)
+    def error(self, message: str, *args, exc_info=False):
+        self.logger.error(message, *args, exc_info=exc_info)
     
-    def critical(self, message: str, exc_info=False):
-        self.logger.critical(message, exc_info=exc_info)
+    def critical(self, message: str, *args, exc_info=False):
+        self.logger.critical(message, *args, exc_info=exc_info)
     
     def log_api_call(self, endpoint: str, method: str, params: dict, response: dict):
         """Log API calls with details"""
-        self.logger.debug(f"API Call: {method} {endpoint}")
-        self.logger.debug(f"Parameters: {params}")
-        self.logger.debug(f"Response: {response}")
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        self.logger.debug("API Call: %s %s", method, endpoint)
+        self.logger.debug("Parameters: %s", params)
+        self.logger.debug("Response: %s", response)
     
     def log_vrz_detection(self, zone_type: str, price: float, timeframe: str, symbol: str):
         """Log VRZ zone detection"""
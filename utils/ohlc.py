@@ -0,0 +1,193 @@
+"""
+Struct-of-arrays OHLC candle container
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+import numpy as np
+
+
+# Default price column dtype. float32 halves memory and doubles SIMD width
+# but only carries ~7 significant digits, so it is opt-in per frame.
+PRICE_DTYPE = np.float64
+
+
+@dataclass(frozen=True)
+class OHLCFrame:
+    """OHLC candles stored as one NumPy column per field (prices in PRICE_DTYPE)"""
+
+    time: np.ndarray
+    o: np.ndarray
+    h: np.ndarray
+    l: np.ndarray
+    c: np.ndarray
+    v: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.c)
+
+    @classmethod
+    def from_dicts(cls, candles: List[Dict], dtype=None) -> 'OHLCFrame':
+        """
+        Build a frame from candle dictionaries
+
+        Args:
+            candles: List of candles with time/open/high/low/close(/volume) keys
+            dtype: Price column dtype (defaults to PRICE_DTYPE)
+
+        Returns:
+            OHLCFrame with one row per candle
+        """
+        count = len(candles)
+        dtype = dtype or PRICE_DTYPE
+
+        def column(key: str) -> np.ndarray:
+            return np.fromiter((candle[key] for candle in candles), dtype=dtype, count=count)
+
+        return cls(
+            time=np.array([candle['time'] for candle in candles]),
+            o=column('open'),
+            h=column('high'),
+            l=column('low'),
+            c=column('close'),
+            v=np.fromiter((candle.get('volume', 0.0) for candle in candles), dtype=np.float64, count=count)
+        )
+
+    def to_dicts(self, start: int = 0, stop: Optional[int] = None) -> List[Dict]:
+        """
+        Convert back to candle dictionaries (as returned by the exchange client)
+
+        Args:
+            start: First row to convert
+            stop: Row after the last one to convert (defaults to all rows)
+
+        Returns:
+            List of candle dictionaries with Python scalar values
+        """
+        rows = slice(start, stop)
+        return [
+            {'time': t, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+            for t, o, h, l, c, v in zip(
+                self.time[rows].tolist(), self.o[rows].tolist(), self.h[rows].tolist(),
+                self.l[rows].tolist(), self.c[rows].tolist(), self.v[rows].tolist()
+            )
+        ]
+
+
+class CandleListCache:
+    """
+    Small FIFO cache of results derived from candle lists, keyed by list identity
+
+    Each entry remembers the list's length and last candle when it was stored.
+    A lookup only returns an entry for the same list object that still holds
+    that candle at that position, so a list that has since been appended to
+    can extend its cached result. Candle lists are otherwise treated as
+    immutable; replacing earlier candles in place is not detected.
+    """
+
+    def __init__(self, size: int):
+        """
+        Initialize cache
+
+        Args:
+            size: Maximum number of entries (oldest evicted first)
+        """
+        self._size = size
+        self._entries: Dict[tuple, tuple] = {}
+
+    def get(self, candles: List[Dict], key: tuple = ()) -> Optional[Tuple[int, Any]]:
+        """
+        Look up the value stored for candles
+
+        Args:
+            candles: Candle list the value was derived from
+            key: Extra key parts (e.g. parameters the value depends on)
+
+        Returns:
+            (candle count when stored, value), or None if missing or stale
+        """
+        entry = self._entries.get((id(candles),) + key)
+        if (entry is not None and entry[0] is candles and 0 < entry[1] <= len(candles)
+                and candles[entry[1] - 1] is entry[2]):
+            return entry[1], entry[3]
+        return None
+
+    def put(self, candles: List[Dict], value: Any, key: tuple = ()):
+        """Store value for the current contents of candles (empty lists are skipped)"""
+        if not candles:
+            return
+
+        entry_key = (id(candles),) + key
+        if entry_key not in self._entries and len(self._entries) >= self._size:
+            self._entries.pop(next(iter(self._entries)))
+        # Holding the list keeps its id from being recycled while cached
+        self._entries[entry_key] = (candles, len(candles), candles[-1], value)
+
+
+# Recent candle-list -> frame conversions
+_FRAME_CACHE = CandleListCache(8)
+
+
+def as_frame(candles: Union[List[Dict], OHLCFrame]) -> OHLCFrame:
+    """
+    Return candles as an OHLCFrame, converting candle lists at most once
+
+    Conversions are memoized per list so several scans over the same candles
+    (swings, patterns, zone updates) share one frame. Candle lists are treated
+    as immutable once converted; appending or replacing the last candle
+    invalidates the entry.
+
+    Args:
+        candles: List of candle dictionaries or an existing OHLCFrame
+
+    Returns:
+        OHLCFrame for the candles
+    """
+    if isinstance(candles, OHLCFrame):
+        return candles
+
+    cached = _FRAME_CACHE.get(candles)
+    if cached is not None and cached[0] == len(candles):
+        return cached[1]
+
+    frame = OHLCFrame.from_dicts(candles)
+    _FRAME_CACHE.put(candles, frame)
+
+    return frame
+
+
+def resample_candles(candles: Union[List[Dict], OHLCFrame], source_seconds: int,
+                     target_seconds: int) -> List[Dict]:
+    """
+    Aggregate candles into a higher timeframe whose length is a multiple of theirs
+
+    Bars are bucketed on epoch-aligned boundaries of target_seconds. A leading
+    bucket missing some of its source bars is dropped; the trailing bucket is
+    kept like the exchange's forming bar.
+
+    Args:
+        candles: Source candles in ascending time order
+        source_seconds: Source bar length in seconds
+        target_seconds: Target bar length (a multiple of source_seconds)
+
+    Returns:
+        List of candle dictionaries on the target timeframe
+    """
+    frame = as_frame(candles)
+    if not len(frame):
+        return []
+
+    buckets = frame.time.astype(np.int64) // target_seconds
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(frame)] - 1
+
+    if len(starts) > 1 and ends[0] - starts[0] + 1 < target_seconds // source_seconds:
+        starts, ends = starts[1:], ends[1:]
+
+    return OHLCFrame(
+        time=buckets[starts] * target_seconds,
+        o=frame.o[starts],
+        h=np.maximum.reduceat(frame.h, starts),
+        l=np.minimum.reduceat(frame.l, starts),
+        c=frame.c[ends],
+        v=np.add.reduceat(frame.v, starts)
+    ).to_dicts()
@@ -2,13 +2,21 @@
 Timeframe conversion and calculation utilities
 """
 from typing import Optional
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
 from config.constants import TIMEFRAME_MINUTES
 
 
+# Timeframes in ascending length, with their lengths for bisecting
+_TF_ASC = sorted(TIMEFRAME_MINUTES.items(), key=lambda x: x[1])
+_TF_MINUTES_ASC = [minutes for _, minutes in _TF_ASC]
+
+
 class TimeframeConverter:
     """Utilities for timeframe calculations"""
     
     @staticmethod
+    @lru_cache(maxsize=64)
     def get_higher_timeframe(base_timeframe: str, multiplier: int = 4) -> str:
         """Get a higher timeframe that is 'multiplier' times the base timeframe"""
         if base_timeframe not in TIMEFRAME_MINUTES:
@@ -17,14 +25,15 @@ class TimeframeConverter:
         base_minutes = TIMEFRAME_MINUTES[base_timeframe]
         target_minutes = base_minutes * multiplier
         
-        # Find closest matching timeframe
-        for tf, minutes in sorted(TIMEFRAME_MINUTES.items(), key=lambda x: x[1]):
-            if minutes >= target_minutes:
-                return tf
+        # Shortest timeframe at least target_minutes long
+        i = bisect_left(_TF_MINUTES_ASC, target_minutes)
+        if i < len(_TF_ASC):
+            return _TF_ASC[i][0]
         
         return "1d"
     
     @staticmethod
+    @lru_cache(maxsize=64)
     def get_lower_timeframe(base_timeframe: str, divisor: int = 4) -> str:
         """Get a lower timeframe that is 'divisor' times smaller than base timeframe"""
         if base_timeframe not in TIMEFRAME_MINUTES:
@@ -33,12 +42,12 @@ class TimeframeConverter:
         base_minutes = TIMEFRAME_MINUTES[base_timeframe]
         target_minutes = base_minutes // divisor
         
-        closest_tf = "1m"
-        for tf, minutes in sorted(TIMEFRAME_MINUTES.items(), key=lambda x: x[1], reverse=True):
-            if minutes <= target_minutes:
-                return tf
+        # Longest timeframe at most target_minutes long
+        i = bisect_right(_TF_MINUTES_ASC, target_minutes) - 1
+        if i >= 0:
+            return _TF_ASC[i][0]
         
-        return closest_tf
+        return "1m"
     
     @staticmethod
     def calculate_auto_timeframe(trading_timeframe: str) -> str:
@@ -1,60 +1,152 @@
 """
 Timezone conversion utilities for UTC and IST
+
+The conversions are plain module functions; import them directly in hot
+paths (`from utils.timezone_helper import utc_to_ist`). TimezoneHelper
+exposes the same functions for existing callers.
 """
-from datetime import datetime
-import pytz
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+import math
+import time
+import numpy as np
+
+
+# Asia/Kolkata has been a fixed +05:30 with no DST since 1945
+IST_OFFSET_SECONDS = 19800
+
+UTC = timezone.utc
+IST = timezone(timedelta(seconds=IST_OFFSET_SECONDS), 'IST')
+
+# (epoch second, UTC now, IST now) from the first now_*() call in that second;
+# replaced as a whole tuple so concurrent readers never see a mixed entry
+_now_cache = (None, None, None)
+
+
+def _format_wall(dt: datetime, suffix: str) -> str:
+    """dt's wall-clock time as 'YYYY-MM-DD HH:MM:SS suffix' (no strftime parsing)"""
+    return (f'{dt.year:04d}-{dt.month:02d}-{dt.day:02d} '
+            f'{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d} {suffix}')
+
+
+@lru_cache(maxsize=4096)
+def _format_epoch(second: int, tz: tzinfo, suffix: str) -> str:
+    """Wall-clock time of an epoch second in tz, formatted once per second"""
+    return _format_wall(datetime.fromtimestamp(second, tz=tz), suffix)
+
+
+def _epoch_second(dt: datetime) -> int:
+    """Whole epoch second of dt (naive datetimes are UTC, as stored by the bot)"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=UTC)
+    return math.floor(dt.timestamp())
+
+
+def _now() -> tuple:
+    """Current (second, UTC, IST) entry, built at most once per epoch second"""
+    global _now_cache
+    now = time.time()
+    cached = _now_cache
+    if cached[0] == int(now):
+        return cached
+    utc_time = datetime.fromtimestamp(now, tz=UTC)
+    cached = (int(now), utc_time, utc_time.astimezone(IST))
+    _now_cache = cached
+    return cached
+
+
+def utc_to_ist(utc_time: datetime) -> datetime:
+    """Convert UTC datetime to IST (IST-aware input is returned as is)"""
+    if utc_time.tzinfo is IST:
+        return utc_time
+    if utc_time.tzinfo is None:
+        utc_time = utc_time.replace(tzinfo=UTC)
+    return utc_time.astimezone(IST)
+
+
+def ist_to_utc(ist_time: datetime) -> datetime:
+    """Convert IST datetime to UTC (UTC-aware input is returned as is)"""
+    if ist_time.tzinfo is UTC:
+        return ist_time
+    if ist_time.tzinfo is None:
+        ist_time = ist_time.replace(tzinfo=IST)
+    return ist_time.astimezone(UTC)
+
+
+def now_utc() -> datetime:
+    """
+    Get current time in UTC
+
+    Calls within the same second share one datetime, so sub-second
+    precision is lost; use datetime.now(timezone.utc) where it matters.
+    """
+    return _now()[1]
+
+
+def now_ist() -> datetime:
+    """Get current time in IST (same per-second sharing as now_utc)"""
+    return _now()[2]
+
+
+def timestamp_to_utc(timestamp: int) -> datetime:
+    """Convert Unix timestamp to UTC datetime"""
+    return datetime.fromtimestamp(timestamp, tz=UTC)
+
+
+def timestamp_to_ist(timestamp: int) -> datetime:
+    """Convert Unix timestamp to IST datetime"""
+    return datetime.fromtimestamp(timestamp, tz=IST)
+
+
+def timestamps_to_ist_array(timestamps: np.ndarray) -> np.ndarray:
+    """
+    Convert many Unix timestamps to IST wall-clock times in one step
+
+    Adds the constant IST offset, so results are only correct for
+    timestamps after 1945.
+
+    Args:
+        timestamps: Epoch seconds (UTC), any integer array-like
+
+    Returns:
+        datetime64[s] array of naive IST wall-clock times
+    """
+    seconds = np.asarray(timestamps, dtype=np.int64)
+    return (seconds + IST_OFFSET_SECONDS).astype('datetime64[s]')
+
+
+def format_ist(dt: datetime) -> str:
+    """Format datetime in IST for display"""
+    return _format_epoch(_epoch_second(dt), IST, 'IST')
+
+
+def format_utc(dt: datetime) -> str:
+    """Format datetime in UTC for display"""
+    return _format_epoch(_epoch_second(dt), UTC, 'UTC')
+
+
+try:
+    # Optional Cython build of the conversions (see utils/_timezone.pyx)
+    from utils import _timezone
+    _timezone.configure(UTC, IST)
+    utc_to_ist = _timezone.utc_to_ist
+    ist_to_utc = _timezone.ist_to_utc
+except ImportError:
+    pass
 
 
 class TimezoneHelper:
-    """Helper class for timezone conversions"""
-    
-    UTC = pytz.UTC
-    IST = pytz.timezone('Asia/Kolkata')
-    
-    @staticmethod
-    def utc_to_ist(utc_time: datetime) -> datetime:
-        """Convert UTC datetime to IST"""
-        if utc_time.tzinfo is None:
-            utc_time = TimezoneHelper.UTC.localize(utc_time)
-        return utc_time.astimezone(TimezoneHelper.IST)
-    
-    @staticmethod
-    def ist_to_utc(ist_time: datetime) -> datetime:
-        """Convert IST datetime to UTC"""
-        if ist_time.tzinfo is None:
-            ist_time = TimezoneHelper.IST.localize(ist_time)
-        return ist_time.astimezone(TimezoneHelper.UTC)
-    
-    @staticmethod
-    def now_utc() -> datetime:
-        """Get current time in UTC"""
-        return datetime.now(TimezoneHelper.UTC)
-    
-    @staticmethod
-    def now_ist() -> datetime:
-        """Get current time in IST"""
-        return datetime.now(TimezoneHelper.IST)
-    
-    @staticmethod
-    def timestamp_to_utc(timestamp: int) -> datetime:
-        """Convert Unix timestamp to UTC datetime"""
-        return datetime.fromtimestamp(timestamp, tz=TimezoneHelper.UTC)
-    
-    @staticmethod
-    def timestamp_to_ist(timestamp: int) -> datetime:
-        """Convert Unix timestamp to IST datetime"""
-        utc_time = TimezoneHelper.timestamp_to_utc(timestamp)
-        return TimezoneHelper.utc_to_ist(utc_time)
-    
-    @staticmethod
-    def format_ist(dt: datetime) -> str:
-        """Format datetime in IST for display"""
-        ist_time = TimezoneHelper.utc_to_ist(dt) if dt.tzinfo == TimezoneHelper.UTC else dt
-        return ist_time.strftime('%Y-%m-%d %H:%M:%S IST')
-    
-    @staticmethod
-    def format_utc(dt: datetime) -> str:
-        """Format datetime in UTC for display"""
-        utc_time = TimezoneHelper.ist_to_utc(dt) if dt.tzinfo == TimezoneHelper.IST else dt
-        return utc_time.strftime('%Y-%m-%d %H:%M:%S UTC')
-      
+    """Helper class for timezone conversions (wraps the module functions)"""
+
+    UTC = UTC
+    IST = IST
+
+    utc_to_ist = staticmethod(utc_to_ist)
+    ist_to_utc = staticmethod(ist_to_utc)
+    now_utc = staticmethod(now_utc)
+    now_ist = staticmethod(now_ist)
+    timestamp_to_utc = staticmethod(timestamp_to_utc)
+    timestamp_to_ist = staticmethod(timestamp_to_ist)
+    timestamps_to_ist_array = staticmethod(timestamps_to_ist_array)
+    format_ist = staticmethod(format_ist)
+    format_utc = staticmethod(format_utc)